@@ -16,6 +16,10 @@ if __name__ == "__main__":
     failfast = any([True for t in sys.argv if t.startswith("--failfast")])
     keepdb = any([True for t in sys.argv if t.startswith("--keepdb")])
     skip_checks = any([True for t in sys.argv if t.startswith("--skip_checks")])
+    benchmark = any([True for t in sys.argv if t.startswith("--benchmark")])
     opts = dict(failfast=failfast, tags=tags, keepdb=keepdb, skip_checks=skip_checks)
+    if benchmark:
+        # benchmarks are not run with the tests. See tests/benchmarks.
+        opts.update(pattern="bench*.py")
     failures = DiscoverRunner(**opts).run_tests([f"{app_name}.tests"], **opts)
     sys.exit(failures)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from functools import partial
+from itertools import count
+from typing import TYPE_CHECKING, Any, Iterator
+
+from django.db import transaction
+
+if TYPE_CHECKING:
+    from .model_mixins import VisitModelMixin
+
+__all__ = [
+    "defer_appointment_status_updates",
+    "queue_appointment_status_update",
+]
+
+_local = threading.local()
+
+
+def queue_appointment_status_update(related_visit: VisitModelMixin) -> bool:
+    """Queues the appointment status update for a related visit
+    if within a `defer_appointment_status_updates` block.
+
+    Returns True if queued, otherwise False.
+
+    If queued within a savepoint opened in the block, the update is
+    added to the queue on commit so that it is dropped if the
+    savepoint is rolled back.
+    """
+    queue = getattr(_local, "queue", None)
+    if queue is None or not hasattr(related_visit, "update_appointment_status"):
+        return False
+    key = (related_visit._meta.label_lower, related_visit.appointment_id)
+    func = partial(_add_to_queue, queue, key, related_visit, next(_local.counter))
+    if len(transaction.get_connection(_local.using).savepoint_ids) > _local.savepoints:
+        _local.pending = True
+        transaction.on_commit(func, using=_local.using)
+    else:
+        func()
+    return True
+
+
+def _add_to_queue(
+    queue: dict, key: tuple[str, Any], related_visit: VisitModelMixin, index: int
+) -> None:
+    # keep the last saved instance
+    if key not in queue or queue[key][0] < index:
+        queue.update({key: (index, related_visit)})
+
+
+def _update_appointment_status(queue: dict) -> None:
+    for _, related_visit in queue.values():
+        related_visit.update_appointment_status()
+
+
+@contextmanager
+def defer_appointment_status_updates(using: str | None = None) -> Iterator[None]:
+    """Context manager to defer appointment status updates from
+    the related visit post_save signal until the transaction
+    commits.
+
+    Each appointment is updated once, from the last saved
+    instance of its related visit, regardless of how many
+    times the related visit was saved in the block. Outside
+    of a transaction the updates run on exit of the block.
+    Updates queued within a savepoint that is rolled back are
+    dropped.
+
+    Blocks may be nested. Updates are scheduled on exit of the
+    outermost block and are discarded if the block raises.
+
+    For example, for imports, data migrations or bulk
+    operations in a management command:
+
+        with transaction.atomic():
+            with defer_appointment_status_updates():
+                for obj in objs:
+                    obj.save()
+    """
+    outermost = getattr(_local, "queue", None) is None
+    if outermost:
+        _local.queue = {}
+        _local.using = using
+        _local.savepoints = len(transaction.get_connection(using).savepoint_ids)
+        _local.counter = count()
+        _local.pending = False
+    completed = False
+    try:
+        yield
+        completed = True
+    finally:
+        if outermost:
+            queue, pending, _local.queue = _local.queue, _local.pending, None
+            if completed and (queue or pending):
+                transaction.on_commit(partial(_update_appointment_status, queue), using=using)
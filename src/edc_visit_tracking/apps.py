@@ -1,6 +1,8 @@
 from django.apps import AppConfig as DjangoAppConfig
+from django.apps import apps as django_apps
 from django.core.checks.registry import register
 from django.core.management.color import color_style
+from django.db.models.signals import post_delete, post_save
 
 from .system_checks import context_processors_check
 
@@ -15,4 +17,78 @@ class AppConfig(DjangoAppConfig):
     reason_field: dict = {}
 
     def ready(self):
+        from edc_appointment.utils import get_appointment_model_cls
+
+        from .exceptions import RelatedVisitFieldError
+        from .model_mixins import SubjectVisitMissedModelMixin, VisitModelMixin
+        from .model_mixins.base import VisitMethodsModelMixin
+        from .models.signals import (
+            subject_visit_missed_on_post_delete,
+            visit_timeline_on_post_delete,
+            visit_timeline_on_post_save,
+            visit_tracking_check_in_progress_on_post_save,
+            visit_window_period_on_post_delete,
+            visit_window_period_on_post_save,
+        )
+        from .utils import get_related_visit_model_cls
+
         register(context_processors_check)
+        for model_cls in [get_appointment_model_cls(), get_related_visit_model_cls()]:
+            post_save.connect(
+                visit_timeline_on_post_save,
+                sender=model_cls,
+                weak=False,
+                dispatch_uid=f"visit_timeline_on_post_save_{model_cls._meta.label_lower}",
+            )
+            post_delete.connect(
+                visit_timeline_on_post_delete,
+                sender=model_cls,
+                weak=False,
+                dispatch_uid=f"visit_timeline_on_post_delete_{model_cls._meta.label_lower}",
+            )
+        # see settings.EDC_VISIT_TRACKING_MATERIALIZE_WINDOW_PERIODS
+        appointment_model_cls = get_appointment_model_cls()
+        post_save.connect(
+            visit_window_period_on_post_save,
+            sender=appointment_model_cls,
+            weak=False,
+            dispatch_uid=(
+                f"visit_window_period_on_post_save_{appointment_model_cls._meta.label_lower}"
+            ),
+        )
+        post_delete.connect(
+            visit_window_period_on_post_delete,
+            sender=appointment_model_cls,
+            weak=False,
+            dispatch_uid=(
+                f"visit_window_period_on_post_delete_{appointment_model_cls._meta.label_lower}"
+            ),
+        )
+        for model_cls in django_apps.get_models():
+            # bind receivers to the models they apply to instead of
+            # to every model in the project
+            if issubclass(model_cls, (VisitModelMixin,)):
+                post_save.connect(
+                    visit_tracking_check_in_progress_on_post_save,
+                    sender=model_cls,
+                    weak=False,
+                    dispatch_uid=(
+                        "visit_tracking_check_in_progress_on_post_save_"
+                        f"{model_cls._meta.label_lower}"
+                    ),
+                )
+            if issubclass(model_cls, (SubjectVisitMissedModelMixin,)):
+                post_delete.connect(
+                    subject_visit_missed_on_post_delete,
+                    sender=model_cls,
+                    weak=False,
+                    dispatch_uid=(
+                        f"subject_visit_missed_on_post_delete_{model_cls._meta.label_lower}"
+                    ),
+                )
+            # resolve the related visit FK once per CRF/Requisition model class
+            if issubclass(model_cls, (VisitMethodsModelMixin,)):
+                try:
+                    model_cls.related_visit_field_cls()
+                except RelatedVisitFieldError:
+                    pass
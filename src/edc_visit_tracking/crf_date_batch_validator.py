@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Sequence
+
+from edc_utils import get_utcnow
+
+from .crf_date_validator import get_crf_date_validator_engine, is_future_datetime
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "AFTER_ALLOWANCE",
+    "BEFORE_STUDY_START",
+    "BEFORE_VISIT",
+    "IS_FUTURE",
+    "MISSING_DATETIME",
+    "validate_crf_dates",
+]
+
+MISSING_DATETIME = "missing_datetime"
+BEFORE_STUDY_START = "before_study_start"
+IS_FUTURE = "is_future"
+BEFORE_VISIT = "before_visit"
+AFTER_ALLOWANCE = "after_allowance"
+
+
+def validate_crf_dates(
+    report_datetimes: Sequence[datetime] | pd.Series,
+    visit_report_datetimes: Sequence[datetime] | pd.Series,
+    report_datetime_allowance: int | None = None,
+    allow_report_datetime_before_visit: bool | None = None,
+) -> pd.DataFrame:
+    """Validates CRF report datetimes against visit report
+    datetimes for a whole batch at once and returns a DataFrame
+    of the rows that fail.
+
+    Applies the same rules as `CrfDateValidator`, for example, to
+    check CRFs backfilled from paper or a legacy system before
+    import.
+
+    The returned DataFrame is indexed by row position and has
+    columns `report_datetime`, `visit_report_datetime`,
+    `days_after_visit` and `error`. `error` is the first rule that
+    failed (see the module constants). Use
+    `CrfDateValidatorEngine.validate` on a single row for the
+    full message.
+
+    Requires `pandas`.
+    """
+    import numpy as np
+    import pandas as pd
+
+    engine = get_crf_date_validator_engine(
+        report_datetime_allowance=report_datetime_allowance,
+        allow_report_datetime_before_visit=allow_report_datetime_before_visit,
+    )
+    if len(report_datetimes) != len(visit_report_datetimes):
+        raise ValueError(
+            "Expected report_datetimes and visit_report_datetimes of the same length. "
+            f"Got {len(report_datetimes)} and {len(visit_report_datetimes)}."
+        )
+    df = pd.DataFrame(
+        {
+            "report_datetime": to_utc_datetimes(report_datetimes),
+            "visit_report_datetime": to_utc_datetimes(visit_report_datetimes),
+        }
+    )
+    # only rows after now are passed to edc_model's not-future validator
+    utcnow = get_utcnow()
+    after_now = df["report_datetime"] > pd.Timestamp(utcnow)
+    is_future = pd.Series(False, index=df.index)
+    if after_now.any():
+        is_future[after_now] = [
+            is_future_datetime(dt.to_pydatetime(), utcnow=utcnow)
+            for dt in df.loc[after_now, "report_datetime"]
+        ]
+    df["days_after_visit"] = (
+        df["report_datetime"].dt.normalize() - df["visit_report_datetime"].dt.normalize()
+    ).dt.days
+    conditions = [
+        df["report_datetime"].isna() | df["visit_report_datetime"].isna(),
+        df["report_datetime"] < pd.Timestamp(engine.get_study_open_datetime()),
+        is_future,
+        (
+            df["days_after_visit"] < 0
+            if not engine.allow_report_datetime_before_visit
+            else pd.Series(False, index=df.index)
+        ),
+        df["days_after_visit"] > engine.report_datetime_allowance,
+    ]
+    errors = [
+        MISSING_DATETIME,
+        BEFORE_STUDY_START,
+        IS_FUTURE,
+        BEFORE_VISIT,
+        AFTER_ALLOWANCE,
+    ]
+    df["error"] = np.select(conditions, errors, default="")
+    return df[df["error"] != ""]
+
+
+def to_utc_datetimes(values: Sequence[datetime] | pd.Series) -> pd.DatetimeIndex:
+    """Returns values as a UTC DatetimeIndex.
+
+    For a list of datetime objects, converting the list without
+    the `to_datetime` cache is much faster than converting a Series.
+    """
+    import pandas as pd
+
+    if isinstance(values, pd.Series):
+        if values.dtype != object:
+            return pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+        values = values.to_list()
+    return pd.to_datetime(values, utc=True, cache=False)
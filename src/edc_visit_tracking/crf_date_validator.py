@@ -1,13 +1,23 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Iterable
 from zoneinfo import ZoneInfo
 
-from dateutil.relativedelta import relativedelta
 from django.apps import apps as django_apps
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from edc_model.validators import datetime_not_future
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
 from edc_protocol.validators import datetime_not_before_study_start
+from edc_utils import get_utcnow
 from edc_utils.text import convert_php_dateformat
 
+utc_tz = ZoneInfo("UTC")
+
+# settings that clear the cached engines if changed
+CRF_DATE_VALIDATOR_SETTINGS = ("DEFAULT_REPORT_DATETIME_ALLOWANCE",)
+
 
 class CrfReportDateAllowanceError(Exception):
     pass
@@ -21,6 +31,155 @@ class CrfReportDateIsFuture(Exception):
     pass
 
 
+def is_future_datetime(utc_datetime: datetime, utcnow: datetime | None = None) -> bool:
+    """Returns True if edc_model's `datetime_not_future` would
+    raise for `utc_datetime`.
+
+    The validator is only called for a datetime after `utcnow`.
+    """
+    if utc_datetime <= (utcnow or get_utcnow()):
+        return False
+    try:
+        datetime_not_future(utc_datetime)
+    except ValidationError:
+        return True
+    return False
+
+
+class CrfDateValidatorEngine:
+    """Validates CRF report datetimes against the related visit
+    report datetime.
+
+    Configured once and reused. See `get_crf_date_validator_engine`.
+    Error messages are only formatted if validation fails.
+    """
+
+    def __init__(
+        self,
+        report_datetime_allowance: int = None,
+        allow_report_datetime_before_visit: bool = None,
+    ):
+        self.report_datetime_allowance = report_datetime_allowance
+        self.allow_report_datetime_before_visit = allow_report_datetime_before_visit
+        self.allowance = timedelta(days=report_datetime_allowance)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"report_datetime_allowance={self.report_datetime_allowance}, "
+            f"allow_report_datetime_before_visit={self.allow_report_datetime_before_visit})"
+        )
+
+    def validate(
+        self,
+        report_datetime: datetime,
+        visit_report_datetime: datetime,
+        study_open_datetime: datetime | None = None,
+        utcnow: datetime | None = None,
+    ) -> None:
+        """Raises if the CRF report_datetime is not valid."""
+        study_open_datetime = study_open_datetime or self.get_study_open_datetime()
+        report_datetime = report_datetime.astimezone(utc_tz)
+        visit_report_datetime = visit_report_datetime.astimezone(utc_tz)
+        if report_datetime < study_open_datetime:
+            try:
+                datetime_not_before_study_start(report_datetime)
+            except ValidationError as e:
+                message = e.message if hasattr(e, "message") else str(e)
+                raise CrfReportDateBeforeStudyStart(message)
+        if is_future_datetime(report_datetime, utcnow=utcnow):
+            raise CrfReportDateIsFuture("Cannot be a future date/time")
+        # not before the visit report_datetime
+        if (
+            not self.allow_report_datetime_before_visit
+            and report_datetime.date() < visit_report_datetime.date()
+        ):
+            raise CrfReportDateAllowanceError(
+                "Report datetime may not be before the visit report datetime. "
+                f"Visit report datetime is {self.formatted(visit_report_datetime)}. "
+            )
+        # not more than x days greater than the visit report_datetime
+        max_allowed_report_datetime = visit_report_datetime + self.allowance
+        if report_datetime.date() > max_allowed_report_datetime.date():
+            diff = (max_allowed_report_datetime.date() - visit_report_datetime.date()).days
+            raise CrfReportDateAllowanceError(
+                f"Report datetime may not be more than {self.report_datetime_allowance} "
+                f"days greater than the visit report datetime. Got {diff} days."
+                f"Visit report datetime is {self.formatted(visit_report_datetime)}. "
+                f"See also AppConfig.report_datetime_allowance."
+            )
+
+    def validate_many(
+        self, datetimes: Iterable[tuple[datetime, datetime]]
+    ) -> dict[int, Exception]:
+        """Validates an iterable of (report_datetime,
+        visit_report_datetime) and returns a dict of
+        {index: exception} for those that are not valid.
+
+        For example, when importing historical CRFs.
+        """
+        errors = {}
+        study_open_datetime = self.get_study_open_datetime()
+        utcnow = get_utcnow()
+        for index, (report_datetime, visit_report_datetime) in enumerate(datetimes):
+            try:
+                self.validate(
+                    report_datetime,
+                    visit_report_datetime,
+                    study_open_datetime=study_open_datetime,
+                    utcnow=utcnow,
+                )
+            except (
+                CrfReportDateAllowanceError,
+                CrfReportDateBeforeStudyStart,
+                CrfReportDateIsFuture,
+            ) as e:
+                errors[index] = e
+        return errors
+
+    @staticmethod
+    def get_study_open_datetime() -> datetime:
+        return ResearchProtocolConfig().study_open_datetime
+
+    @staticmethod
+    def formatted(dt: datetime) -> str:
+        return dt.strftime(convert_php_dateformat(settings.SHORT_DATE_FORMAT))
+
+
+_engines: dict[tuple[int, bool], CrfDateValidatorEngine] = {}
+
+
+def get_crf_date_validator_engine(
+    report_datetime_allowance: int | None = None,
+    allow_report_datetime_before_visit: bool | None = None,
+) -> CrfDateValidatorEngine:
+    """Returns a cached CrfDateValidatorEngine for this
+    configuration.
+
+    If report_datetime_allowance is not set, uses the current value
+    on the edc_visit_tracking AppConfig. The cache is keyed on the
+    resolved value so a changed allowance gets a new engine.
+    """
+    if not report_datetime_allowance:
+        app_config = django_apps.get_app_config("edc_visit_tracking")
+        report_datetime_allowance = app_config.report_datetime_allowance
+    key = (report_datetime_allowance, bool(allow_report_datetime_before_visit))
+    if key not in _engines:
+        _engines[key] = CrfDateValidatorEngine(
+            report_datetime_allowance=report_datetime_allowance,
+            allow_report_datetime_before_visit=key[1],
+        )
+    return _engines[key]
+
+
+def clear_crf_date_validator_engines() -> None:
+    """Clears cached CrfDateValidatorEngine instances.
+
+    See also `CRF_DATE_VALIDATOR_SETTINGS`.
+    """
+    _engines.clear()
+
+
 class CrfDateValidator:
     report_datetime_allowance = None
     allow_report_datetime_before_visit = False
@@ -35,62 +194,46 @@ class CrfDateValidator:
         modified=None,
         subject_identifier=None,
     ):
-        self.allow_report_datetime_before_visit = (
-            allow_report_datetime_before_visit or self.allow_report_datetime_before_visit
+        self.engine = get_crf_date_validator_engine(
+            report_datetime_allowance=(
+                report_datetime_allowance or self.report_datetime_allowance
+            ),
+            allow_report_datetime_before_visit=(
+                allow_report_datetime_before_visit or self.allow_report_datetime_before_visit
+            ),
         )
-        self.report_datetime_allowance = (
-            report_datetime_allowance or self.report_datetime_allowance
+        self.allow_report_datetime_before_visit = (
+            self.engine.allow_report_datetime_before_visit
         )
-        if not self.report_datetime_allowance:
-            app_config = django_apps.get_app_config("edc_visit_tracking")
-            self.report_datetime_allowance = app_config.report_datetime_allowance
-        self.report_datetime = report_datetime.astimezone(ZoneInfo("UTC"))
-        self.visit_report_datetime = visit_report_datetime.astimezone(ZoneInfo("UTC"))
+        self.report_datetime_allowance = self.engine.report_datetime_allowance
+        self.report_datetime = report_datetime.astimezone(utc_tz)
+        self.visit_report_datetime = visit_report_datetime.astimezone(utc_tz)
         self.created = created
         self.modified = modified
         self.subject_identifier = subject_identifier
         self.validate()
 
     def validate(self):
-        # datetime_not_before_study_start
-        try:
-            datetime_not_before_study_start(self.report_datetime)
-        except ValidationError as e:
-            message = e.message if hasattr(e, "message") else str(e)
-            raise CrfReportDateBeforeStudyStart(message)
-        # datetime_not_future
-        try:
-            datetime_not_future(self.report_datetime)
-        except ValidationError as e:
-            message = e.message if hasattr(e, "message") else str(e)
-            raise CrfReportDateIsFuture(message)
-
-        formatted_visit_datetime = self.visit_report_datetime.strftime(
-            convert_php_dateformat(settings.SHORT_DATE_FORMAT)
-        )
+        self.engine.validate(self.report_datetime, self.visit_report_datetime)
 
-        # not before the visit report_datetime
-        if (
-            not self.allow_report_datetime_before_visit
-            and self.report_datetime.date() < self.visit_report_datetime.date()
-        ):
-            raise CrfReportDateAllowanceError(
-                "Report datetime may not be before the visit report datetime. "
-                f"Visit report datetime is {formatted_visit_datetime}. "
-            )
+    @classmethod
+    def validate_many(
+        cls,
+        datetimes: Iterable[tuple[datetime, datetime]],
+        report_datetime_allowance: int | None = None,
+        allow_report_datetime_before_visit: bool | None = None,
+    ) -> dict[int, Exception]:
+        """Validates an iterable of (report_datetime,
+        visit_report_datetime) without instantiating the class
+        for each.
 
-        # not more than x days greater than the visit report_datetime
-        # if self.report_datetime_allowance > 0:
-        max_allowed_report_datetime = self.visit_report_datetime + relativedelta(
-            days=self.report_datetime_allowance
-        )
-        if self.report_datetime.date() > max_allowed_report_datetime.date():
-            diff = (
-                max_allowed_report_datetime.date() - self.visit_report_datetime.date()
-            ).days
-            raise CrfReportDateAllowanceError(
-                f"Report datetime may not be more than {self.report_datetime_allowance} "
-                f"days greater than the visit report datetime. Got {diff} days."
-                f"Visit report datetime is {formatted_visit_datetime}. "
-                f"See also AppConfig.report_datetime_allowance."
-            )
+        See `CrfDateValidatorEngine.validate_many`.
+        """
+        return get_crf_date_validator_engine(
+            report_datetime_allowance=(
+                report_datetime_allowance or cls.report_datetime_allowance
+            ),
+            allow_report_datetime_before_visit=(
+                allow_report_datetime_before_visit or cls.allow_report_datetime_before_visit
+            ),
+        ).validate_many(datetimes)
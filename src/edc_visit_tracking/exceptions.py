@@ -8,3 +8,7 @@ class RelatedVisitModelError(Exception):
 
 class RelatedVisitReasonError(Exception):
     pass
+
+
+class RelatedVisitLazyLoadWarning(RuntimeWarning):
+    pass
@@ -1,2 +1,3 @@
 from .visit_form_validator import VisitFormValidator
 from .visit_missed_form_validator import VisitMissedFormValidator
+from .visit_validation_context import VisitValidationContext
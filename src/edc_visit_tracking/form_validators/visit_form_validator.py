@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from copy import deepcopy
-from datetime import datetime
-from typing import TYPE_CHECKING, Any, List, Optional
+from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
 from zoneinfo import ZoneInfo
 
 from django import forms
 from django.conf import settings
+from django.db.models import Count
 from edc_appointment.constants import MISSED_APPT
 from edc_appointment.form_validator_mixins import WindowPeriodFormValidatorMixin
 from edc_appointment.form_validators import validate_appt_datetime_unique
@@ -18,14 +18,17 @@ from edc_metadata.utils import (
     get_requisition_metadata_model_cls,
 )
 from edc_utils import formatted_datetime
-from edc_visit_schedule.utils import is_baseline
 
 from ..constants import MISSED_VISIT, UNSCHEDULED
+from ..instrumentation import instrumented
 from ..utils import get_subject_visit_missed_model_cls
-from ..visit_sequence import VisitSequence, VisitSequenceError
+from ..visit_sequence import VisitSequence, mark_visit_sequence_validated
+from .visit_validation_context import VisitValidationContext
 
 if TYPE_CHECKING:
+    from django.db.models import QuerySet
     from edc_appointment.models import Appointment
+    from edc_metadata.models import CrfMetadata, RequisitionMetadata
 
 EDC_VISIT_TRACKING_ALLOW_MISSED_UNSCHEDULED = getattr(
     settings, "EDC_VISIT_TRACKING_ALLOW_MISSED_UNSCHEDULED", False
@@ -44,6 +47,11 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
     validate_unscheduled_visit_reason = True
     report_datetime_field_attr = "report_datetime"
 
+    def __init__(self, *args, **kwargs):
+        self._context: VisitValidationContext | None = None
+        super().__init__(*args, **kwargs)
+
+    @instrumented("visit_form_validator")
     def _clean(self) -> None:
         super()._clean()
         if not self.appointment:
@@ -51,10 +59,12 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
                 {"appointment": "This field is required"}, code=REQUIRED_ERROR
             )
 
+        self._context = self.get_validation_context()
+
         validate_appt_datetime_unique(
             form_validator=self,
-            appointment=self.appointment,
-            appt_datetime=self.appointment.appt_datetime,
+            appointment=self.context.appointment,
+            appt_datetime=self.context.appointment.appt_datetime,
             form_field="appointment",
         )
 
@@ -74,8 +84,29 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
 
         self.required_if(OTHER, field="info_source", field_required="info_source_other")
 
+    def get_validation_context(self) -> VisitValidationContext:
+        return VisitValidationContext.from_appointment(
+            self.appointment,
+            report_datetime=self.report_datetime,
+            visit_sequence_cls=self.visit_sequence_cls,
+        )
+
+    @property
+    def context(self) -> VisitValidationContext:
+        """Returns the appointment state for this clean.
+
+        Properties such as `subject_identifier` and
+        `appt_datetime_local` read from the context once it is
+        built in `_clean`, otherwise from the appointment.
+        """
+        if self._context is None:
+            self._context = self.get_validation_context()
+        return self._context
+
     @property
     def subject_identifier(self) -> str:
+        if self._context is not None:
+            return self._context.subject_identifier
         return self.appointment.subject_identifier
 
     @property
@@ -104,6 +135,8 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
     @property
     def report_datetime_utc(self) -> datetime | None:
         """Returns report datetime in UTC timezone"""
+        if self._context is not None:
+            return self._context.report_datetime_utc
         if self.report_datetime:
             return self.report_datetime.astimezone(ZoneInfo("UTC"))
         return None
@@ -111,39 +144,62 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
     @property
     def appt_datetime_local(self) -> datetime:
         """Returns appt datetime in local timezone"""
+        if self._context is not None:
+            return self._context.appt_datetime_local
         return self.appointment.appt_datetime.astimezone(ZoneInfo(settings.TIME_ZONE))
 
     def validate_visit_datetime_in_window_period(self, *args) -> None:
         """Asserts the report_datetime is within the visits lower and
         upper boundaries of the visit_schedule.schdule.visit.
 
+        A scheduled visit within the window bounds of the context
+        is accepted without re-calculating the window.
+
         See also `edc_visit_schedule`.
         """
         if self.report_datetime:
-            args = [self.appointment, self.report_datetime, self.report_datetime_field_attr]
+            if self.context.datetime_in_window(self.report_datetime):
+                return
+            args = [
+                self.context.appointment,
+                self.report_datetime,
+                self.report_datetime_field_attr,
+            ]
             self.datetime_in_window_or_raise(*args)
 
     def validate_visit_datetime_unique(self: Any) -> None:
-        """Assert one visit report per day"""
+        """Assert one visit report per day.
+
+        The day is the UTC date of the report_datetime. Uses a
+        range on report_datetime instead of `__date` so the
+        query can use the unique index on (subject_identifier,
+        visit_schedule_name, schedule_name, report_datetime).
+        """
         if self.report_datetime:
+            day_start = datetime.combine(
+                self.report_datetime_utc.date(), time.min, tzinfo=ZoneInfo("UTC")
+            )
             qs = self.instance.__class__.objects.filter(
                 subject_identifier=self.subject_identifier,
-                report_datetime__date=self.report_datetime_utc.date(),
                 visit_schedule_name=self.instance.visit_schedule_name,
                 schedule_name=self.instance.schedule_name,
+                report_datetime__gte=day_start,
+                report_datetime__lt=day_start + timedelta(days=1),
             )
             if getattr(self.instance, "id"):
                 qs = qs.exclude(id=self.instance.id)
-            if qs.count() > 1:
+            visits = list(qs.values_list("visit_code", "visit_code_sequence")[:2])
+            if len(visits) > 1:
                 raise self.raise_validation_error(
                     {"report_datetime": "Visit report already exist for this date (M)"},
                     INVALID_ERROR,
                 )
-            elif qs.count() == 1:
+            elif len(visits) == 1:
+                visit_code, visit_code_sequence = visits[0]
                 raise self.raise_validation_error(
                     {
                         "report_datetime": "A visit report already exists for this date. "
-                        f"See {qs[0].visit_code}.{qs[0].visit_code_sequence}"
+                        f"See {visit_code}.{visit_code_sequence}"
                     },
                     INVALID_ERROR,
                 )
@@ -173,7 +229,7 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
         """Asserts the report_datetime matches the appt_datetime
         as baseline.
         """
-        if is_baseline(instance=self.appointment):
+        if self.context.baseline:
             if report_datetime_local := self.report_datetime:
                 if report_datetime_local.date() != self.appt_datetime_local.date():
                     appt_datetime_str = formatted_datetime(
@@ -191,18 +247,21 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
                     )
 
     def validate_visits_completed_in_order(self) -> None:
-        """Asserts visits are completed in order."""
-        visit_sequence = self.visit_sequence_cls(appointment=self.appointment)
-        try:
-            visit_sequence.enforce_sequence()
-        except VisitSequenceError as e:
-            raise forms.ValidationError(e, code=INVALID_ERROR)
+        """Asserts visits are completed in order.
+
+        If passed, the instance is marked so the check is not
+        repeated on save.
+        """
+        if self.context.visit_sequence_error:
+            raise forms.ValidationError(self.context.visit_sequence_error, code=INVALID_ERROR)
+        if self.instance is not None:
+            mark_visit_sequence_validated(self.instance, self.context.appointment)
 
     def validate_visit_code_sequence_and_reason(self) -> None:
         """Asserts the `reason` makes sense relative to the
         visit_code_sequence coming from the appointment.
         """
-        appointment = self.appointment
+        appointment = self.context.appointment
         reason = self.cleaned_data.get("reason")
         if appointment:
             if not appointment.visit_code_sequence and reason == UNSCHEDULED:
@@ -220,8 +279,7 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
                     code=INVALID_ERROR,
                 )
             # raise if CRF metadata exist
-            if reason == MISSED_VISIT and self.metadata_exists_for(
-                entry_status=KEYED,
+            if reason == MISSED_VISIT and self.metadata_exists(
                 exclude_models=[get_subject_visit_missed_model_cls()._meta.label_lower],
             ):
                 raise forms.ValidationError(
@@ -232,7 +290,7 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
     def validate_visit_reason(self) -> None:
         """Asserts that reason=missed if appointment is missed"""
         if (
-            self.appointment.appt_timing == MISSED_APPT
+            self.context.appointment.appt_timing == MISSED_APPT
             and self.cleaned_data.get("reason") != MISSED_VISIT
         ):
             self.raise_validation_error(
@@ -260,29 +318,92 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
 
     def metadata_exists_for(
         self,
-        entry_status: str = None,
+        entry_status: str | Iterable[str] | None = None,
         filter_models: Optional[List[str]] = None,
         exclude_models: Optional[List[str]] = None,
     ) -> int:
-        """Returns True if metadata exists for this visit for
-        the given entry_status.
+        """Returns the number of CRF and requisition metadata for
+        this visit for the given entry_status (default KEYED) or
+        any of a list of entry_status.
+
+        Counted in a single query. See also `metadata_exists`.
+        """
+        crf_qs, requisition_qs = self.get_metadata_querysets(
+            entry_status=entry_status or KEYED,
+            filter_models=filter_models,
+            exclude_models=exclude_models,
+        )
+        return crf_qs.values("id").union(requisition_qs.values("id"), all=True).count()
+
+    def metadata_exists(
+        self,
+        entry_status: str | Iterable[str] = KEYED,
+        filter_models: Optional[List[str]] = None,
+        exclude_models: Optional[List[str]] = None,
+    ) -> bool:
+        """Returns True if any CRF or requisition metadata for this
+        visit has the given entry_status (default KEYED) or any of
+        a list of entry_status.
+
+        Checked in a single EXISTS query.
+        """
+        crf_qs, requisition_qs = self.get_metadata_querysets(
+            entry_status=entry_status,
+            filter_models=filter_models,
+            exclude_models=exclude_models,
+        )
+        return crf_qs.values("id").union(requisition_qs.values("id"), all=True).exists()
+
+    def metadata_status_counts(
+        self,
+        filter_models: Optional[List[str]] = None,
+        exclude_models: Optional[List[str]] = None,
+    ) -> dict[str, int]:
+        """Returns a dict of {entry_status: count} of CRF and
+        requisition metadata for this visit.
+
+        Counted in a single query over a UNION ALL of the grouped
+        CRF and requisition metadata.
+        """
+        crf_qs, requisition_qs = (
+            qs.values("entry_status").annotate(count=Count("id")).order_by()
+            for qs in self.get_metadata_querysets(
+                filter_models=filter_models,
+                exclude_models=exclude_models,
+                any_entry_status=True,
+            )
+        )
+        counts: dict[str, int] = {}
+        for row in crf_qs.union(requisition_qs, all=True):
+            counts[row["entry_status"]] = counts.get(row["entry_status"], 0) + row["count"]
+        return counts
+
+    def get_metadata_querysets(
+        self,
+        entry_status: str | Iterable[str] = KEYED,
+        filter_models: Optional[List[str]] = None,
+        exclude_models: Optional[List[str]] = None,
+        any_entry_status: bool | None = None,
+    ) -> tuple[QuerySet[CrfMetadata], QuerySet[RequisitionMetadata]]:
+        """Returns a tuple of the CRF and requisition metadata
+        querysets for this visit.
+
+        Filtered on `entry_status` unless `any_entry_status` is True.
         """
-        exclude_opts: dict = {}
-        filter_opts = deepcopy(self.crf_filter_options)
-        filter_opts.update(entry_status=entry_status or KEYED)
+        filter_opts = {k: v for k, v in self.crf_filter_options.items() if k != "entry_status"}
+        if not any_entry_status:
+            if isinstance(entry_status, str):
+                filter_opts.update(entry_status=entry_status)
+            else:
+                filter_opts.update(entry_status__in=list(entry_status))
         if filter_models:
             filter_opts.update(model__in=filter_models)
-        if exclude_models:
-            exclude_opts.update(model__in=exclude_models)
-        return (
-            get_crf_metadata_model_cls()
-            .objects.filter(**filter_opts)
-            .exclude(**exclude_opts)
-            .count()
-            + get_requisition_metadata_model_cls()
-            .objects.filter(**filter_opts)
-            .exclude(**exclude_opts)
-            .count()
+        return tuple(
+            model_cls.objects.filter(**filter_opts).exclude(model__in=exclude_models or [])
+            for model_cls in [
+                get_crf_metadata_model_cls(),
+                get_requisition_metadata_model_cls(),
+            ]
         )
 
     @property
@@ -290,11 +411,12 @@ class VisitFormValidator(WindowPeriodFormValidatorMixin, FormValidator):
         """Returns a dictionary of `filter` options when querying
         models CrfMetadata / RequisitionMetadata.
         """
+        appointment = self._context.appointment if self._context else self.appointment
         return dict(
-            subject_identifier=self.subject_identifier,
-            visit_code=self.appointment.visit_code,
-            visit_code_sequence=self.appointment.visit_code_sequence,
-            visit_schedule_name=self.appointment.visit_schedule_name,
-            schedule_name=self.appointment.schedule_name,
+            subject_identifier=appointment.subject_identifier,
+            visit_code=appointment.visit_code,
+            visit_code_sequence=appointment.visit_code_sequence,
+            visit_schedule_name=appointment.visit_schedule_name,
+            schedule_name=appointment.schedule_name,
             entry_status=KEYED,
         )
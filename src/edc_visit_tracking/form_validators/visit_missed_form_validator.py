@@ -1,8 +1,11 @@
 from edc_constants.constants import ALIVE, NO, OTHER, UNKNOWN, YES
 from edc_form_validators import FormValidator
 
+from ..instrumentation import instrumented
+
 
 class VisitMissedFormValidator(FormValidator):
+    @instrumented("visit_missed_form_validator")
     def clean(self) -> None:
         self.applicable_if(YES, field="contact_attempted", field_applicable="contact_made")
         self.required_if(
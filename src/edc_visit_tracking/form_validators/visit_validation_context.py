@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+from typing import TYPE_CHECKING, Type
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from edc_utils import floor_secs, to_utc
+from edc_visit_schedule.utils import is_baseline
+
+from ..visit_sequence import VisitSequence, VisitSequenceError
+from ..visit_window_table import get_window_period_bounds
+
+if TYPE_CHECKING:
+    from edc_appointment.models import Appointment
+
+__all__ = ["VisitValidationContext"]
+
+
+@dataclass(frozen=True)
+class VisitValidationContext:
+    """Appointment state for one clean of a `VisitFormValidator`.
+
+    Built once at the start of a clean and shared by the
+    `validate_*` methods. Each derived value is evaluated on first
+    access and kept for the rest of the clean.
+    """
+
+    appointment: Appointment
+    report_datetime: datetime | None = None
+    visit_sequence_cls: Type[VisitSequence] = VisitSequence
+
+    @classmethod
+    def from_appointment(
+        cls,
+        appointment: Appointment,
+        report_datetime: datetime | None = None,
+        visit_sequence_cls: Type[VisitSequence] | None = None,
+    ) -> VisitValidationContext:
+        return cls(
+            appointment=appointment,
+            report_datetime=report_datetime,
+            visit_sequence_cls=visit_sequence_cls or VisitSequence,
+        )
+
+    @property
+    def subject_identifier(self) -> str:
+        return self.appointment.subject_identifier
+
+    @cached_property
+    def report_datetime_utc(self) -> datetime | None:
+        return to_utc(self.report_datetime) if self.report_datetime else None
+
+    @cached_property
+    def appt_datetime_local(self) -> datetime:
+        return self.appointment.appt_datetime.astimezone(ZoneInfo(settings.TIME_ZONE))
+
+    @cached_property
+    def baseline(self) -> bool:
+        return is_baseline(instance=self.appointment)
+
+    @cached_property
+    def window_period(self) -> tuple[datetime | None, datetime | None]:
+        """Returns the lower and upper bounds of the window period
+        or (None, None) for an unscheduled appointment.
+        """
+        if self.appointment.visit_code_sequence != 0:
+            return None, None
+        return get_window_period_bounds(self.appointment)
+
+    @property
+    def window_lower(self) -> datetime | None:
+        return self.window_period[0]
+
+    @property
+    def window_upper(self) -> datetime | None:
+        return self.window_period[1]
+
+    @cached_property
+    def visit_sequence(self) -> VisitSequence:
+        return self.visit_sequence_cls(appointment=self.appointment)
+
+    @cached_property
+    def visit_sequence_error(self) -> VisitSequenceError | None:
+        """Returns the error if earlier visits are not complete,
+        otherwise None.
+        """
+        try:
+            self.visit_sequence.enforce_sequence()
+        except VisitSequenceError as e:
+            return e
+        return None
+
+    def datetime_in_window(self, dt: datetime) -> bool:
+        """Returns True if `dt` is within the window period of a
+        scheduled appointment, otherwise False.
+
+        False does not mean `dt` is out of window. Fall back to
+        `datetime_in_window_or_raise`.
+        """
+        if self.window_lower is None:
+            return False
+        return self.window_lower <= floor_secs(to_utc(dt)) <= self.window_upper
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+from django.db import connection
+from django.dispatch import Signal
+
+from .utils import get_instrumentation_enabled
+
+__all__ = [
+    "StageRecord",
+    "collect_stage_records",
+    "instrument",
+    "instrumented",
+    "stage_completed",
+    "summarize_stage_records",
+]
+
+logger = logging.getLogger(__name__)
+
+# sent with `record`, a StageRecord, when an instrumented stage completes
+stage_completed = Signal()
+
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class StageRecord:
+    """Wall time and query count for one call of an instrumented
+    stage.
+
+    Counts are inclusive; a stage called within another is
+    counted in both.
+    """
+
+    stage: str
+    label: str | None
+    seconds: float
+    queries: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(
+            stage=self.stage,
+            label=self.label,
+            ms=round(self.seconds * 1000, 3),
+            queries=self.queries,
+        )
+
+
+@contextmanager
+def instrument(stage: str, label: str | None = None) -> Iterator[None]:
+    """Records wall time and the number of queries executed on
+    the default connection for the enclosed block.
+
+    Does nothing unless settings.EDC_VISIT_TRACKING_INSTRUMENTATION
+    is True. The record is logged at DEBUG level, sent with the
+    `stage_completed` signal and added to the records of an
+    enclosing `collect_stage_records` block.
+    """
+    if not get_instrumentation_enabled():
+        yield
+        return
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    start = perf_counter()
+    try:
+        with connection.execute_wrapper(count_queries):
+            yield
+    finally:
+        record = StageRecord(
+            stage=stage, label=label, seconds=perf_counter() - start, queries=queries
+        )
+        for records in getattr(_local, "records", []):
+            records.append(record)
+        logger.debug("stage completed %s", record.as_dict(), extra=record.as_dict())
+        stage_completed.send(sender=StageRecord, record=record)
+
+
+def instrumented(stage: str) -> Callable:
+    """Decorator to instrument a model, form or form validator
+    method. See `instrument`.
+
+    The label is the model's label_lower, if known. For a model
+    form, the label is that of the form's model.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def inner(self, *args, **kwargs):
+            if not get_instrumentation_enabled():
+                return func(self, *args, **kwargs)
+            with instrument(stage, label=_get_label(self)):
+                return func(self, *args, **kwargs)
+
+        return inner
+
+    return decorator
+
+
+def _get_label(obj: Any) -> str | None:
+    opts = getattr(obj, "_meta", None)
+    if model := getattr(opts, "model", None) or getattr(obj, "model", None):
+        opts = getattr(model, "_meta", None)
+    return getattr(opts, "label_lower", None)
+
+
+@contextmanager
+def collect_stage_records() -> Iterator[list[StageRecord]]:
+    """Collects StageRecords for the enclosed block into a list.
+
+    For example:
+
+        with collect_stage_records() as records:
+            subject_visit.save()
+        summary = summarize_stage_records(records)
+    """
+    records: list[StageRecord] = []
+    if not hasattr(_local, "records"):
+        _local.records = []
+    _local.records.append(records)
+    try:
+        yield records
+    finally:
+        _local.records.pop()
+
+
+def summarize_stage_records(records: list[StageRecord]) -> dict[str, dict[str, Any]]:
+    """Returns calls, total ms and total queries per stage."""
+    summary: dict[str, dict[str, Any]] = {}
+    for record in records:
+        item = summary.setdefault(record.stage, dict(calls=0, ms=0.0, queries=0))
+        item["calls"] += 1
+        item["ms"] = round(item["ms"] + record.seconds * 1000, 3)
+        item["queries"] += record.queries
+    return summary
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import csv
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ...visit_sequence_audit import (
+    VISIT_SEQUENCE_AUDIT_FIELDS,
+    iter_visit_sequence_violations,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "List appointments with a visit report while an earlier, non-skipped "
+        "appointment has none; that is, visit reports keyed out of sequence."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=["csv", "json"],
+            default="csv",
+            help="Output format. Default csv.",
+        )
+
+        parser.add_argument(
+            "--output",
+            dest="output",
+            default=None,
+            help="Output file. Defaults to stdout.",
+        )
+
+        parser.add_argument(
+            "--site",
+            dest="site_ids",
+            type=int,
+            action="append",
+            default=None,
+            help="Site id. May be repeated.",
+        )
+
+        parser.add_argument(
+            "--visit-schedule",
+            dest="visit_schedule_name",
+            default=None,
+            help="Visit schedule name.",
+        )
+
+        parser.add_argument(
+            "--schedule",
+            dest="schedule_name",
+            default=None,
+            help="Schedule name.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        rows = iter_visit_sequence_violations(
+            site_ids=options["site_ids"],
+            visit_schedule_name=options["visit_schedule_name"],
+            schedule_name=options["schedule_name"],
+        )
+        if options["output"]:
+            stream = open(options["output"], "w", newline="")
+        else:
+            stream = self.stdout
+            stream.ending = ""
+        try:
+            if options["format"] == "csv":
+                writer = csv.DictWriter(stream, fieldnames=VISIT_SEQUENCE_AUDIT_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                stream.write("[")
+                for index, row in enumerate(rows):
+                    stream.write(("," if index else "") + "\n")
+                    stream.write(json.dumps(row, cls=DjangoJSONEncoder))
+                stream.write("\n]\n")
+        finally:
+            if options["output"]:
+                stream.close()
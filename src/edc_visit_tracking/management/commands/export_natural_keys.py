@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import color_style
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ...natural_key_export import get_export_queryset, iter_natural_key_chunks
+
+style = color_style()
+
+
+class Command(BaseCommand):
+    help = (
+        "Export models as JSON Lines using natural keys. Streams in chunks "
+        "and, with --checkpoint-file, resumes an interrupted export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "model_labels",
+            nargs="+",
+            help="One or more models in app_label.ModelName format.",
+        )
+
+        parser.add_argument(
+            "--output",
+            dest="output",
+            default=None,
+            help="Output file. Defaults to stdout.",
+        )
+
+        parser.add_argument(
+            "--chunk-size",
+            dest="chunk_size",
+            type=int,
+            default=2000,
+            help="Number of objects per query. Default 2000.",
+        )
+
+        parser.add_argument(
+            "--checkpoint-file",
+            dest="checkpoint_file",
+            default=None,
+            help=(
+                "JSON file to record progress after each chunk. If the file exists, "
+                "the export resumes from it and appends to --output, after removing "
+                "any rows written after the last checkpoint."
+            ),
+        )
+
+        parser.add_argument(
+            "--database",
+            dest="database",
+            default="default",
+            help="Database alias. Default 'default'.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        model_classes = []
+        for model_label in options["model_labels"]:
+            try:
+                model_classes.append(django_apps.get_model(model_label))
+            except (LookupError, ValueError) as e:
+                raise CommandError(f"Unknown model. Got {model_label}. {e}")
+        checkpoint_file = options["checkpoint_file"]
+        checkpoints = {}
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            with open(checkpoint_file) as f:
+                checkpoints = json.load(f)
+        if options["output"]:
+            if checkpoints:
+                self.truncate_output(options["output"], checkpoints)
+            stream = open(options["output"], "a" if checkpoints else "w")
+        else:
+            stream = self.stdout
+        try:
+            for model_cls in model_classes:
+                label_lower = model_cls._meta.label_lower
+                if checkpoints.get(label_lower, {}).get("complete"):
+                    continue
+                count = self.export_model(model_cls, stream, checkpoints, **options)
+                checkpoints[label_lower] = {
+                    **checkpoints.get(label_lower, {}),
+                    "complete": True,
+                }
+                self.write_checkpoints(checkpoint_file, checkpoints)
+                self.stderr.write(style.SUCCESS(f"Exported {count} {label_lower}.\n"))
+        finally:
+            if options["output"]:
+                stream.close()
+
+    def export_model(self, model_cls, stream, checkpoints: dict, **options) -> int:
+        """Writes the model's rows from its checkpoint, if any,
+        recording a checkpoint after each chunk, and returns the
+        number of rows written.
+        """
+        label_lower = model_cls._meta.label_lower
+        count = 0
+        for chunk in iter_natural_key_chunks(
+            queryset=get_export_queryset(model_cls, using=options["database"]),
+            chunk_size=options["chunk_size"],
+            checkpoint=checkpoints.get(label_lower, {}).get("checkpoint"),
+        ):
+            for obj in chunk.objects:
+                stream.write(json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n")
+            stream.flush()
+            count += len(chunk.objects)
+            checkpoints[label_lower] = {"checkpoint": chunk.checkpoint}
+            if options["output"]:
+                # rows are on disk before the checkpoint that covers them
+                os.fsync(stream.fileno())
+                checkpoints[label_lower].update(offset=stream.tell())
+            self.write_checkpoints(options["checkpoint_file"], checkpoints)
+        return count
+
+    @staticmethod
+    def truncate_output(output: str, checkpoints: dict) -> None:
+        """Truncates the output to the offset recorded with the
+        last checkpoint so that rows written after it are not
+        exported twice.
+        """
+        offsets = [value["offset"] for value in checkpoints.values() if "offset" in value]
+        if offsets and os.path.exists(output):
+            with open(output, "r+b") as f:
+                f.truncate(max(offsets))
+
+    @staticmethod
+    def write_checkpoints(checkpoint_file: str | None, checkpoints: dict) -> None:
+        if checkpoint_file:
+            with open(f"{checkpoint_file}.tmp", "w") as f:
+                json.dump(checkpoints, f)
+            os.replace(f"{checkpoint_file}.tmp", checkpoint_file)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.core.management.color import color_style
+from edc_appointment.utils import get_appointment_model_cls
+
+from ...visit_window_table import (
+    get_visit_window_period_model_cls,
+    rebuild_visit_window_periods,
+)
+
+style = color_style()
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the VisitWindowPeriod table from appointments and the visit schedule. "
+        "See settings.EDC_VISIT_TRACKING_MATERIALIZE_WINDOW_PERIODS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--subject-identifier",
+            dest="subject_identifiers",
+            action="append",
+            default=None,
+            help="Rebuild for this subject only. May be repeated.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        qs = get_appointment_model_cls().objects.filter(visit_code_sequence=0)
+        window_qs = get_visit_window_period_model_cls().objects.all()
+        if options["subject_identifiers"]:
+            qs = qs.filter(subject_identifier__in=options["subject_identifiers"])
+            window_qs = window_qs.filter(subject_identifier__in=options["subject_identifiers"])
+        # remove rows for appointments that no longer exist
+        window_qs.delete()
+        count = rebuild_visit_window_periods(qs.iterator(), batch_size=1000)
+        self.stdout.write(style.SUCCESS(f"Rebuilt window periods for {count} appointments."))
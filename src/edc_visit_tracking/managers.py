@@ -1,20 +1,111 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 from django.contrib.sites.managers import CurrentSiteManager as DjangoCurrentSiteManager
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import IntegrityError, models, transaction
-from edc_constants.constants import INCOMPLETE, NOT_APPLICABLE, OTHER
+from django.db.models import Q
+from django.db.models.query import ModelIterable
+from django.db.models.signals import post_save, pre_save
+from django_audit_fields.models.audit_model_mixin import update_device_fields
+from edc_appointment.constants import MISSED_APPT
+from edc_consent.exceptions import ConsentDefinitionDoesNotExist, NotConsentedError
+from edc_constants.constants import INCOMPLETE, NO, NOT_APPLICABLE, OTHER
+from edc_offstudy.exceptions import OffstudyError
+from edc_utils import get_utcnow
 
+from .appointment_status_updates import defer_appointment_status_updates
 from .constants import MISSED_VISIT
 from .exceptions import RelatedVisitReasonError
+from .visit_timeline import get_visit_timeline, visit_timeline_cache
 
 if TYPE_CHECKING:
+    from uuid import UUID
+
     from edc_appointment.models import Appointment
 
+    from .model_mixins import VisitModelMixin
+
+
+@dataclass
+class BulkMissedVisitResult:
+    """Result of `VisitModelManager.bulk_create_missed_from_appointments`.
+
+    `conflicts` is a dict of {appointment.id: message} for appointments
+    that could not be reported as missed.
+    """
+
+    created: list[VisitModelMixin] = field(default_factory=list)
+    skipped: list[VisitModelMixin] = field(default_factory=list)
+    conflicts: dict[UUID, str] = field(default_factory=dict)
+
+
+# visit model natural key fields, see VisitModelMixin.natural_key
+VISIT_NATURAL_KEY_FIELDS = (
+    "subject_identifier",
+    "visit_schedule_name",
+    "schedule_name",
+    "visit_code",
+    "visit_code_sequence",
+)
+
+# natural keys are OR'ed per batch; SQLite limits the depth of an
+# expression tree to 1000
+NATURAL_KEYS_BATCH_SIZE = 250
+
+_local = threading.local()
+
+
+def natural_keys_q(natural_keys: Iterable[tuple], prefix: str | None = None) -> Q:
+    """Returns a Q object matching any of the visit natural keys."""
+    prefix = f"{prefix}__" if prefix else ""
+    q = Q()
+    for natural_key in natural_keys:
+        q |= Q(
+            **{
+                f"{prefix}{field_name}": value
+                for field_name, value in zip(VISIT_NATURAL_KEY_FIELDS, natural_key)
+            }
+        )
+    return q
+
+
+class CrfModelIterable(ModelIterable):
+    """Yields CRF instances, marking each instance after the first
+    as loaded in bulk.
+
+    See `VisitMethodsModelMixin.related_visit`.
+    """
+
+    def __iter__(self):
+        for index, obj in enumerate(super().__iter__()):
+            if index:
+                obj._loaded_in_bulk = True
+            yield obj
 
-class CrfModelManager(models.Manager):
+
+class CrfQuerySet(models.QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._iterable_class = CrfModelIterable
+
+    def with_visit(self) -> CrfQuerySet:
+        """Returns the queryset with the related visit and its
+        appointment selected.
+
+        Accessing `related_visit`, `visit_code` or
+        `subject_identifier` on each instance then needs no
+        further queries.
+        """
+        attr = self.model.related_visit_model_attr()
+        return self.select_related(attr, f"{attr}__appointment")
+
+
+class CrfModelManager(models.Manager.from_queryset(CrfQuerySet)):
     """A manager class for Crf models, models that have an FK to
     the visit model.
     """
@@ -29,14 +120,115 @@ class CrfModelManager(models.Manager):
         visit_code,
         visit_code_sequence,
     ):
-        instance = self.model.visit_model_cls().objects.get_by_natural_key(
+        """Returns the instance in a single query joining the
+        related visit.
+
+        Within a `primed_natural_keys` block, keys known not to
+        exist raise DoesNotExist without a query and known keys
+        are fetched by pk.
+        """
+        natural_key = (
             subject_identifier,
             visit_schedule_name,
             schedule_name,
             visit_code,
-            visit_code_sequence,
+            int(visit_code_sequence),
         )
-        return self.get(**{self.model.related_visit_model_attr(): instance})
+        primed = getattr(_local, "natural_keys", {}).get(self.model._meta.label_lower)
+        if primed is not None and natural_key in primed:
+            if (pk := primed[natural_key]) is None:
+                raise self.model.DoesNotExist(
+                    f"{self.model._meta.object_name} matching natural key "
+                    f"{natural_key} does not exist."
+                )
+            return self.get(pk=pk)
+        return self.get(
+            **{
+                f"{self.model.related_visit_model_attr()}__{field_name}": value
+                for field_name, value in zip(VISIT_NATURAL_KEY_FIELDS, natural_key)
+            }
+        )
+
+    def get_many_by_natural_keys(
+        self, natural_keys: Iterable[tuple], batch_size: int | None = None
+    ) -> dict[tuple, models.Model]:
+        """Returns a dict of {natural_key: instance} for the
+        natural keys that exist.
+
+        Runs one query per `batch_size` natural keys (default
+        NATURAL_KEYS_BATCH_SIZE).
+        """
+        batch_size = batch_size or NATURAL_KEYS_BATCH_SIZE
+        attr = self.model.related_visit_model_attr()
+        natural_keys = list({(*k[:4], int(k[4])) for k in natural_keys})
+        instances = {}
+        for index in range(0, len(natural_keys), batch_size):
+            batch = natural_keys[index : index + batch_size]
+            qs = self.filter(natural_keys_q(batch, prefix=attr)).select_related(attr)
+            instances.update({obj.natural_key(): obj for obj in qs})
+        return instances
+
+    @contextmanager
+    def primed_natural_keys(
+        self, natural_keys: Iterable[tuple], batch_size: int | None = None
+    ) -> Iterator[None]:
+        """Context manager to resolve natural keys to pks in
+        batches before, for example, deserializing a large
+        CRF fixture.
+
+        Within the block, `get_by_natural_key` fetches primed keys
+        by pk and raises DoesNotExist for primed keys that do not
+        exist without a query. Instances created for a primed key
+        within the block are added to the map.
+
+        Nested blocks for the same model share one map. Keys primed
+        by a nested block are dropped when it exits.
+        """
+        natural_keys = {(*k[:4], int(k[4])) for k in natural_keys}
+        label_lower = self.model._meta.label_lower
+        if not hasattr(_local, "natural_keys"):
+            _local.natural_keys = {}
+        outermost = label_lower not in _local.natural_keys
+        pks = _local.natural_keys.setdefault(label_lower, {})
+        added = natural_keys - set(pks)
+        pks.update({k: None for k in added})
+        pks.update(
+            {
+                k: obj.pk
+                for k, obj in self.get_many_by_natural_keys(
+                    natural_keys, batch_size=batch_size
+                ).items()
+            }
+        )
+        dispatch_uid = f"primed_natural_keys_{label_lower}"
+        if outermost:
+            attr = self.model.related_visit_model_attr()
+            visit_field_attname = self.model.related_visit_field_cls().attname
+            # {visit pk: visit natural key}, filled as CRFs are created
+            visit_natural_keys = {}
+
+            def update_natural_keys(sender, instance, created, **kwargs):
+                if created:
+                    visit_pk = getattr(instance, visit_field_attname)
+                    if visit_pk not in visit_natural_keys:
+                        visit_natural_keys[visit_pk] = tuple(
+                            getattr(instance, attr).natural_key()
+                        )
+                    if visit_natural_keys[visit_pk] in pks:
+                        pks[visit_natural_keys[visit_pk]] = instance.pk
+
+            post_save.connect(
+                update_natural_keys, sender=self.model, weak=False, dispatch_uid=dispatch_uid
+            )
+        try:
+            yield
+        finally:
+            if outermost:
+                post_save.disconnect(sender=self.model, dispatch_uid=dispatch_uid)
+                del _local.natural_keys[label_lower]
+            else:
+                for natural_key in added:
+                    pks.pop(natural_key, None)
 
 
 class VisitModelManager(models.Manager):
@@ -60,6 +252,25 @@ class VisitModelManager(models.Manager):
             visit_code_sequence=visit_code_sequence,
         )
 
+    def get_many_by_natural_keys(
+        self, natural_keys: Iterable[tuple], batch_size: int | None = None
+    ) -> dict[tuple, VisitModelMixin]:
+        """Returns a dict of {natural_key: instance} for the
+        natural keys that exist.
+
+        Runs one query per `batch_size` natural keys (default
+        NATURAL_KEYS_BATCH_SIZE).
+        """
+        batch_size = batch_size or NATURAL_KEYS_BATCH_SIZE
+        natural_keys = list({(*k[:4], int(k[4])) for k in natural_keys})
+        instances = {}
+        for index in range(0, len(natural_keys), batch_size):
+            batch = natural_keys[index : index + batch_size]
+            instances.update(
+                {obj.natural_key(): obj for obj in self.filter(natural_keys_q(batch))}
+            )
+        return instances
+
     def create_missed_extras(self) -> dict:
         """Extra options to use when auto-creating a visit
         model instance with reason=missed.
@@ -83,22 +294,7 @@ class VisitModelManager(models.Manager):
         try:
             subject_visit = self.get(appointment=appointment)
         except ObjectDoesNotExist:
-            opts = dict(
-                appointment=appointment,
-                comments="[auto-created]",
-                info_source=NOT_APPLICABLE,
-                reason=MISSED_VISIT,
-                reason_missed=reason_missed or OTHER,
-                reason_missed_other=reason_missed_other or "[auto-created]",
-                report_datetime=appointment.appt_datetime,
-                schedule_name=appointment.schedule_name,
-                subject_identifier=appointment.subject_identifier,
-                survival_status=NOT_APPLICABLE,
-                visit_code=appointment.visit_code,
-                visit_code_sequence=appointment.visit_code_sequence,
-                visit_schedule_name=appointment.visit_schedule_name,
-            )
-            opts.update(**self.create_missed_extras())
+            opts = self.get_missed_options(appointment, reason_missed, reason_missed_other)
             try:
                 with transaction.atomic():
                     obj = self.create(**opts)
@@ -112,6 +308,151 @@ class VisitModelManager(models.Manager):
                     f"Subject visit already exists. Reason=`{subject_visit.reason}`"
                 )
 
+    def get_missed_options(
+        self,
+        appointment: Appointment,
+        reason_missed: str | None = None,
+        reason_missed_other: str | None = None,
+    ) -> dict:
+        """Returns a dict of options to create a visit model
+        instance with reason=missed.
+        """
+        opts = dict(
+            appointment=appointment,
+            comments="[auto-created]",
+            info_source=NOT_APPLICABLE,
+            reason=MISSED_VISIT,
+            reason_missed=reason_missed or OTHER,
+            reason_missed_other=reason_missed_other or "[auto-created]",
+            report_datetime=appointment.appt_datetime,
+            schedule_name=appointment.schedule_name,
+            subject_identifier=appointment.subject_identifier,
+            survival_status=NOT_APPLICABLE,
+            visit_code=appointment.visit_code,
+            visit_code_sequence=appointment.visit_code_sequence,
+            visit_schedule_name=appointment.visit_schedule_name,
+        )
+        opts.update(**self.create_missed_extras())
+        return opts
+
+    def bulk_create_missed_from_appointments(
+        self,
+        appointments: Iterable[Appointment],
+        reason_missed: str | None = None,
+        reason_missed_other: str | None = None,
+        batch_size: int | None = None,
+    ) -> BulkMissedVisitResult:
+        """Creates subject visit model instances, in batches, for
+        missed appointments (appt_timing=missed).
+
+        Same as `create_missed_from_appointment` except that an
+        appointment that cannot be reported as missed is added
+        to `conflicts` instead of raising. Existing visits with
+        reason=missed are skipped.
+
+        Only the INSERT is batched. `save()` is not called; the
+        audit fields it sets are set here. `pre_save` and
+        `post_save` are still sent one instance at a time so that
+        consent, metadata, history and appointment status are
+        updated as usual. Receivers, such as those in edc_metadata,
+        therefore still do their work per instance. The appointment
+        status updates queued by this app's receiver run once per
+        appointment after each batch commits (see
+        `defer_appointment_status_updates`).
+        """
+        result = BulkMissedVisitResult()
+        appointments = sorted(
+            appointments,
+            key=lambda x: (x.subject_identifier, x.timepoint, x.visit_code_sequence),
+        )
+        existing = {
+            obj.appointment_id: obj
+            for obj in self.filter(appointment__in=[obj.id for obj in appointments])
+        }
+        pending = {obj.id for obj in appointments if obj.id not in existing}
+        objs = []
+        with visit_timeline_cache():
+            for appointment in appointments:
+                if subject_visit := existing.get(appointment.id):
+                    if subject_visit.reason != MISSED_VISIT:
+                        result.conflicts.update(
+                            {
+                                appointment.id: (
+                                    "Subject visit already exists. "
+                                    f"Reason=`{subject_visit.reason}`"
+                                )
+                            }
+                        )
+                    else:
+                        result.skipped.append(subject_visit)
+                    continue
+                obj = self.model(
+                    document_status=INCOMPLETE,
+                    require_crfs=NO,
+                    **self.get_missed_options(appointment, reason_missed, reason_missed_other),
+                )
+                # as in AuditModelMixin.save(), which bulk_create does not call;
+                # before the pk is set so device_created is set
+                obj.created = obj.modified = get_utcnow()
+                obj.device_created, obj.device_modified = update_device_fields(obj)
+                # the pk (UUIDAutoField) is otherwise only set in save()
+                self.model._meta.pk.pre_save(obj, True)
+                if message := self.get_missed_conflict(obj, pending):
+                    result.conflicts.update({appointment.id: message})
+                    pending.discard(appointment.id)
+                else:
+                    objs.append(obj)
+            batch_size = batch_size or len(objs) or 1
+            for index in range(0, len(objs), batch_size):
+                with (
+                    transaction.atomic(using=self.db),
+                    defer_appointment_status_updates(using=self.db),
+                ):
+                    created = self.bulk_create(objs[index : index + batch_size])
+                    for obj in created:
+                        post_save.send(
+                            sender=self.model,
+                            instance=obj,
+                            created=True,
+                            update_fields=None,
+                            raw=False,
+                            using=self.db,
+                        )
+                result.created.extend(created)
+        return result
+
+    def get_missed_conflict(self, obj: VisitModelMixin, pending: set[UUID]) -> str | None:
+        """Returns a message if the unsaved visit model instance
+        cannot be reported as missed, otherwise None.
+
+        Appointments in `pending` are about to be reported as
+        missed and are not counted as missing a visit report.
+
+        Sends `pre_save` for the instance.
+        """
+        appointment = obj.appointment
+        if appointment.appt_timing != MISSED_APPT:
+            return (
+                "Invalid. Appointment is not missed. "
+                f"Got appt_timing=`{appointment.appt_timing}`"
+            )
+        if missing := [
+            appt.visit_code
+            for appt in get_visit_timeline(appointment).missing_related_visits(appointment)
+            if appt.id not in pending
+        ]:
+            return f"Previous visit report required. Missing {', '.join(missing)}."
+        if site_id := getattr(appointment, "site_id", None):
+            obj.site_id = site_id
+        try:
+            obj.raise_if_offstudy()
+            pre_save.send(
+                sender=self.model, instance=obj, raw=False, using=self.db, update_fields=None
+            )
+        except (ConsentDefinitionDoesNotExist, NotConsentedError, OffstudyError) as e:
+            return str(e)
+        return None
+
 
 class VisitCurrentSiteManager(DjangoCurrentSiteManager, VisitModelManager):
     use_in_migrations = True
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Callable
+
+from .instrumentation import collect_stage_records, summarize_stage_records
+from .utils import get_instrumentation_enabled
+from .visit_timeline import visit_timeline_cache
+
+if TYPE_CHECKING:
+    from django.core.handlers.wsgi import WSGIRequest
+    from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+class VisitTimelineMiddleware:
+    """Caches VisitTimeline instances for the duration of a
+    request.
+
+    Add to settings.MIDDLEWARE:
+
+        "edc_visit_tracking.middleware.VisitTimelineMiddleware",
+    """
+
+    def __init__(self, get_response: Callable[[WSGIRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: WSGIRequest) -> HttpResponse:
+        with visit_timeline_cache():
+            return self.get_response(request)
+
+
+class InstrumentationMiddleware:
+    """Logs a per-stage summary of timing and query counts for
+    instrumented visit and CRF operations in a request.
+
+    Does nothing unless settings.EDC_VISIT_TRACKING_INSTRUMENTATION
+    is True. See `instrumentation`.
+
+    Add to settings.MIDDLEWARE:
+
+        "edc_visit_tracking.middleware.InstrumentationMiddleware",
+    """
+
+    def __init__(self, get_response: Callable[[WSGIRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: WSGIRequest) -> HttpResponse:
+        if not get_instrumentation_enabled():
+            return self.get_response(request)
+        with collect_stage_records() as records:
+            response = self.get_response(request)
+        if records:
+            summary = summarize_stage_records(records)
+            logger.info(
+                "%s %s stages %s",
+                request.method,
+                request.path,
+                summary,
+                extra=dict(method=request.method, path=request.path, stages=summary),
+            )
+        return response
@@ -0,0 +1,163 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:43
+
+import _socket
+import django_audit_fields.fields.hostname_modification_field
+import django_audit_fields.fields.userfield
+import django_audit_fields.fields.uuid_auto_field
+import django_audit_fields.models.audit_model_mixin
+import django_revision.revision_field
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("edc_visit_tracking", "0007_alter_historicalsubjectvisit_consent_model_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VisitWindowPeriod",
+            fields=[
+                (
+                    "revision",
+                    django_revision.revision_field.RevisionField(
+                        blank=True,
+                        editable=False,
+                        help_text="System field. Git repository tag:branch:commit.",
+                        max_length=75,
+                        null=True,
+                        verbose_name="Revision",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        blank=True, default=django_audit_fields.models.audit_model_mixin.utcnow
+                    ),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(
+                        blank=True, default=django_audit_fields.models.audit_model_mixin.utcnow
+                    ),
+                ),
+                (
+                    "user_created",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user created",
+                    ),
+                ),
+                (
+                    "user_modified",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user modified",
+                    ),
+                ),
+                (
+                    "hostname_created",
+                    models.CharField(
+                        blank=True,
+                        default=_socket.gethostname,
+                        help_text="System field. (modified on create only)",
+                        max_length=60,
+                        verbose_name="Hostname created",
+                    ),
+                ),
+                (
+                    "hostname_modified",
+                    django_audit_fields.fields.hostname_modification_field.HostnameModificationField(
+                        blank=True,
+                        help_text="System field. (modified on every save)",
+                        max_length=50,
+                        verbose_name="Hostname modified",
+                    ),
+                ),
+                (
+                    "device_created",
+                    models.CharField(blank=True, max_length=10, verbose_name="Device created"),
+                ),
+                (
+                    "device_modified",
+                    models.CharField(
+                        blank=True, max_length=10, verbose_name="Device modified"
+                    ),
+                ),
+                (
+                    "locale_created",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale created",
+                    ),
+                ),
+                (
+                    "locale_modified",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale modified",
+                    ),
+                ),
+                (
+                    "id",
+                    django_audit_fields.fields.uuid_auto_field.UUIDAutoField(
+                        blank=True,
+                        editable=False,
+                        help_text="System auto field. UUID primary key.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("subject_identifier", models.CharField(max_length=50)),
+                ("site_id", models.IntegerField(null=True)),
+                ("visit_schedule_name", models.CharField(max_length=25)),
+                ("schedule_name", models.CharField(max_length=25)),
+                ("appointment_id", models.UUIDField(unique=True)),
+                ("visit_code", models.CharField(max_length=25)),
+                ("timepoint", models.DecimalField(decimal_places=1, max_digits=6)),
+                (
+                    "timepoint_datetime",
+                    models.DateTimeField(
+                        help_text="Timepoint datetime of the appointment when the bounds were calculated"
+                    ),
+                ),
+                ("lower_datetime", models.DateTimeField()),
+                ("upper_datetime", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Visit Window Period",
+                "verbose_name_plural": "Visit Window Periods",
+                "abstract": False,
+                "default_permissions": ("add", "change", "delete", "view", "export", "import"),
+                "default_manager_name": "objects",
+                "indexes": [
+                    models.Index(
+                        fields=["modified", "created"], name="edc_visit_t_modifie_4d60b5_idx"
+                    ),
+                    models.Index(
+                        fields=["user_modified", "user_created"],
+                        name="edc_visit_t_user_mo_386446_idx",
+                    ),
+                    models.Index(
+                        fields=["subject_identifier", "visit_schedule_name", "schedule_name"],
+                        name="edc_visit_t_subject_1aa4b5_idx",
+                    ),
+                    models.Index(
+                        fields=["visit_schedule_name", "schedule_name", "visit_code"],
+                        name="edc_visit_t_visit_s_248958_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator
+
+from django.apps import apps as django_apps
+from django.db import models, transaction
+from django.db.models import Case, Exists, OuterRef, Value, When
+from edc_appointment.constants import ONTIME_APPT
+from edc_constants.constants import NOT_APPLICABLE, PATIENT
+from edc_metadata import REQUIRED
+from edc_metadata.metadata import CrfMetadataGetter
+from edc_pharmacy.constants import IN_PROGRESS_APPT
+
+from .constants import SCHEDULED
+from .model_mixins.utils import get_related_visit_model_attr
+from .visit_timeline import clear_visit_timelines
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+    from .model_mixins import SubjectVisitMissedModelMixin
+
+__all__ = ["bulk_revert_missed_visits", "is_reverted_in_bulk"]
+
+_local = threading.local()
+
+
+def is_reverted_in_bulk(instance: SubjectVisitMissedModelMixin) -> bool:
+    """Returns True if the missed visit report is being deleted
+    by `bulk_revert_missed_visits`.
+    """
+    return instance.pk in getattr(_local, "pks", ())
+
+
+@contextmanager
+def _reverting_in_bulk(pks: set) -> Iterator[None]:
+    previous = getattr(_local, "pks", set())
+    _local.pks = previous | pks
+    try:
+        yield
+    finally:
+        _local.pks = previous
+
+
+def _modified_from(model_cls: Any, rows: list[dict], key: str) -> dict[str, Case]:
+    """Returns `modified` and `user_modified` update expressions
+    taking the values from the missed visit report of each row.
+
+    A blank `user_modified` falls back to the OS user, as in
+    `UserField.pre_save`.
+    """
+    os_username = model_cls._meta.get_field("user_modified").get_os_username()
+    return dict(
+        modified=Case(
+            *[When(pk=row[key], then=Value(row["modified"])) for row in rows],
+            output_field=models.DateTimeField(),
+        ),
+        user_modified=Case(
+            *[
+                When(pk=row[key], then=Value(row["user_modified"] or os_username))
+                for row in rows
+            ],
+            output_field=models.CharField(),
+        ),
+    )
+
+
+def bulk_revert_missed_visits(queryset: QuerySet, batch_size: int | None = None) -> int:
+    """Deletes the missed visit reports in `queryset` and reverts
+    the metadata, appointments and related visits in batches.
+
+    Same end state as deleting each report (see signal
+    `subject_visit_missed_on_post_delete`) except that, per batch,
+    the metadata, appointments and related visits are reverted
+    with one UPDATE each. `save()` is not called and `post_save`
+    is not sent for appointments and related visits; there are no
+    history records for these changes.
+
+    Returns the number of missed visit reports reverted.
+    """
+    model_cls = queryset.model
+    using = queryset.db
+    attr = get_related_visit_model_attr(model_cls)
+    related_visit_model_cls = model_cls._meta.get_field(attr).related_model
+    appointment_model_cls = related_visit_model_cls._meta.get_field(
+        "appointment"
+    ).related_model
+    metadata_model_cls = django_apps.get_model(CrfMetadataGetter.metadata_model)
+    rows = list(
+        queryset.values(
+            "pk",
+            "modified",
+            "user_modified",
+            related_visit_id=models.F(f"{attr}_id"),
+            appointment_id=models.F(f"{attr}__appointment_id"),
+            visit_code_sequence=models.F(f"{attr}__visit_code_sequence"),
+            subject_identifier=models.F(f"{attr}__subject_identifier"),
+        )
+    )
+    batch_size = batch_size or len(rows) or 1
+    for index in range(0, len(rows), batch_size):
+        batch = rows[index : index + batch_size]
+        pks = {row["pk"] for row in batch}
+        with transaction.atomic(using=using), _reverting_in_bulk(pks):
+            model_cls._base_manager.using(using).filter(pk__in=pks).delete()
+            _revert(
+                batch,
+                label_lower=model_cls._meta.label_lower,
+                using=using,
+                metadata_model_cls=metadata_model_cls,
+                appointment_model_cls=appointment_model_cls,
+                related_visit_model_cls=related_visit_model_cls,
+            )
+        for subject_identifier in {row["subject_identifier"] for row in batch}:
+            clear_visit_timelines(subject_identifier)
+    return len(rows)
+
+
+def _revert(
+    rows: list[dict],
+    label_lower: str = None,
+    using: str = None,
+    metadata_model_cls: Any = None,
+    appointment_model_cls: Any = None,
+    related_visit_model_cls: Any = None,
+) -> None:
+    related_visit_ids = [row["related_visit_id"] for row in rows]
+    related_visits = related_visit_model_cls._base_manager.using(using).filter(
+        pk__in=related_visit_ids,
+        subject_identifier=OuterRef("subject_identifier"),
+        visit_schedule_name=OuterRef("visit_schedule_name"),
+        schedule_name=OuterRef("schedule_name"),
+        visit_code=OuterRef("visit_code"),
+        visit_code_sequence=OuterRef("visit_code_sequence"),
+    )
+    metadata_model_cls.objects.using(using).filter(
+        Exists(related_visits), model=label_lower
+    ).update(entry_status=REQUIRED)
+    appointment_model_cls._base_manager.using(using).filter(
+        pk__in=[row["appointment_id"] for row in rows]
+    ).update(
+        appt_status=IN_PROGRESS_APPT,
+        appt_timing=ONTIME_APPT,
+        **_modified_from(appointment_model_cls, rows, "appointment_id"),
+    )
+    # visit code sequence should always be 0
+    if rows := [row for row in rows if row["visit_code_sequence"] == 0]:
+        related_visit_model_cls._base_manager.using(using).filter(
+            pk__in=[row["related_visit_id"] for row in rows]
+        ).update(
+            reason=SCHEDULED,
+            reason_unscheduled=NOT_APPLICABLE,
+            info_source=PATIENT,
+            **_modified_from(related_visit_model_cls, rows, "related_visit_id"),
+        )
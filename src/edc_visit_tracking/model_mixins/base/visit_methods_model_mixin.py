@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import warnings
 from typing import TYPE_CHECKING, Type
 
 from django.conf import settings
@@ -7,13 +8,32 @@ from django.contrib.admin.utils import NotRelationField, get_model_from_relation
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
 from django.db import models
 
-from ...exceptions import RelatedVisitFieldError
+from ...exceptions import RelatedVisitFieldError, RelatedVisitLazyLoadWarning
+from ...instrumentation import instrumented
 from ..visit_model_mixin import VisitModelMixin
 
 if TYPE_CHECKING:
     from django.db.models import OneToOneField
 
 
+def resolve_related_visit_field_cls(model_cls) -> OneToOneField:
+    """Returns the field class on `model_cls` related to a visit
+    model or raises.
+
+    Walks all fields of the model. Called once per model class
+    by `VisitMethodsModelMixin.related_visit_field_cls`.
+    """
+    for field in model_cls._meta.get_fields():
+        try:
+            related_model = get_model_from_relation(field)
+        except NotRelationField:
+            continue
+        else:
+            if issubclass(related_model, (VisitModelMixin,)):
+                return field
+    raise RelatedVisitFieldError(f"Related visit field class not found. See {model_cls}.")
+
+
 class VisitMethodsModelMixin(models.Model):
     """A model mixin for CRFs and Requisitions to add methods to
     access the related visit model and its attributes.
@@ -24,6 +44,10 @@ class VisitMethodsModelMixin(models.Model):
     def __str__(self) -> str:
         return str(self.related_visit)
 
+    @instrumented("crf_save")
+    def save(self, *args, **kwargs) -> None:
+        super().save(*args, **kwargs)
+
     def natural_key(self) -> tuple:
         return tuple(getattr(self, self.related_visit_model_attr()).natural_key())
 
@@ -41,38 +65,21 @@ class VisitMethodsModelMixin(models.Model):
     def related_visit_field_cls(cls) -> OneToOneField | None:
         """Returns the 'field' class of the related visit foreign
         key attribute.
+
+        Resolved once per model class. See also AppConfig.ready.
         """
-        related_visit_field_cls = None
-        for field in cls._meta.get_fields():
-            try:
-                related_model = get_model_from_relation(field)
-            except NotRelationField:
-                continue
-            else:
-                if issubclass(related_model, (VisitModelMixin,)):
-                    related_visit_field_cls = field
-                    break
-        if not related_visit_field_cls:
-            raise RelatedVisitFieldError(f"Related visit field class not found. See {cls}.")
-        return related_visit_field_cls
+        try:
+            return cls.__dict__["_related_visit_field_cls"]
+        except KeyError:
+            cls._related_visit_field_cls = resolve_related_visit_field_cls(cls)
+        return cls._related_visit_field_cls
 
     @classmethod
     def related_visit_model_cls(cls) -> Type[VisitModelMixin]:
         """Returns the 'model' class of the related visit foreign
         key attribute.
         """
-        related_model = None
-        for field in cls._meta.get_fields():
-            try:
-                related_model = get_model_from_relation(field)
-            except NotRelationField:
-                continue
-            else:
-                if issubclass(related_model, (VisitModelMixin,)):
-                    break
-        if not related_model:
-            raise RelatedVisitFieldError(f"Related visit field class not found. See {cls}.")
-        return related_model
+        return cls.related_visit_field_cls().related_model
 
     @classmethod
     def related_visit_model(cls) -> str:
@@ -91,30 +98,39 @@ class VisitMethodsModelMixin(models.Model):
 
     @property
     def related_visit(self) -> VisitModelMixin:
-        """Returns the instance of the related_visit FK."""
-        related_model = None
-        related_visit = None
-        for field in self._meta.get_fields():
-            try:
-                related_model = get_model_from_relation(field)
-            except NotRelationField:
-                continue
-            else:
-                if issubclass(related_model, (VisitModelMixin,)):
-                    try:
-                        related_visit = getattr(self, field.name)
-                    except ObjectDoesNotExist:
-                        raise RelatedVisitFieldError(
-                            f"Related visit cannot be None. See {self.__class__}. "
-                            "Perhaps catch this in the form."
-                        )
-                    break
-                else:
-                    related_model = None
-        if not related_model:
+        """Returns the instance of the related_visit FK.
+
+        If settings.DEBUG, warns if the instance was one of many
+        iterated from a `CrfQuerySet` without its related visit.
+        See `CrfQuerySet.with_visit`.
+        """
+        try:
+            field = self.related_visit_field_cls()
+        except RelatedVisitFieldError:
             raise ImproperlyConfigured(
                 f"Model is missing a FK to a related visit model. See {self.__class__}."
             )
+        field_name = field.name
+        if (
+            settings.DEBUG
+            and getattr(self, "_loaded_in_bulk", False)
+            and getattr(self, field.attname) is not None
+            and not field.is_cached(self)
+        ):
+            warnings.warn(
+                f"Related visit not loaded with {self._meta.label_lower} instance. "
+                "Expect a query per instance. Use `with_visit()` or "
+                f"`select_related('{field_name}')` on the queryset.",
+                RelatedVisitLazyLoadWarning,
+                stacklevel=2,
+            )
+        try:
+            related_visit = getattr(self, field_name)
+        except ObjectDoesNotExist:
+            raise RelatedVisitFieldError(
+                f"Related visit cannot be None. See {self.__class__}. "
+                "Perhaps catch this in the form."
+            )
         return related_visit
 
     class Meta:
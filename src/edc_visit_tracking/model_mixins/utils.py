@@ -1,6 +1,8 @@
 from ..exceptions import RelatedVisitFieldError
 from ..utils import get_related_visit_model_cls
 
+_related_visit_model_attrs: dict = {}
+
 
 def get_related_visit_model_attr(model_cls) -> str:
     """Returns the field name for the visit model foreign key
@@ -15,7 +17,14 @@ def get_related_visit_model_attr(model_cls) -> str:
     in the field class, otherwise raise an exception.
 
     If more than one is found, raise an exception.
+
+    Resolved once per model class. See
+    `clear_related_visit_model_attr_cache`.
     """
+    try:
+        return _related_visit_model_attrs[model_cls]
+    except KeyError:
+        pass
     attrs = []
     related_visit_model_cls = get_related_visit_model_cls()
     if related_visit_model_cls._meta.proxy is True:
@@ -37,4 +46,13 @@ def get_related_visit_model_attr(model_cls) -> str:
             f"Expected the related visit model to be an instance "
             "of `VisitModelMixin`."
         )
+    _related_visit_model_attrs[model_cls] = attrs[0]
     return attrs[0]
+
+
+def clear_related_visit_model_attr_cache() -> None:
+    """Clears the cache used by `get_related_visit_model_attr`.
+
+    Called when settings change in tests. See signals.
+    """
+    _related_visit_model_attrs.clear()
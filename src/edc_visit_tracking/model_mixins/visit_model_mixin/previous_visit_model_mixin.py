@@ -4,7 +4,12 @@ from typing import TYPE_CHECKING, Any, Self, Type
 
 from django.db import models
 
-from ...visit_sequence import VisitSequence, VisitSequenceError
+from ...instrumentation import instrumented
+from ...visit_sequence import (
+    VisitSequence,
+    VisitSequenceError,
+    pop_visit_sequence_validated,
+)
 
 if TYPE_CHECKING:
     from edc_appointment.models import Appointment
@@ -31,6 +36,7 @@ class PreviousVisitModelMixin(models.Model):
         self.validate_visit_sequence()
         super().save(*args, **kwargs)
 
+    @instrumented("validate_visit_sequence")
     def validate_visit_sequence(self: Appointment | RelatedVisitProtocol | Self) -> None:
         try:
             appointment = self.related_visit.appointment
@@ -38,6 +44,9 @@ class PreviousVisitModelMixin(models.Model):
             if "related_visit" not in str(e):
                 raise
             appointment = self.appointment
+        if pop_visit_sequence_validated(self, appointment):
+            # already checked in form clean
+            return
         visit_sequence = self.visit_sequence_cls(appointment=appointment)
         try:
             visit_sequence.enforce_sequence()
@@ -14,6 +14,7 @@ from edc_visit_schedule.model_mixins import VisitScheduleModelMixin
 
 from ...constants import MISSED_VISIT, NO_FOLLOW_UP_REASONS
 from ...exceptions import RelatedVisitReasonError
+from ...instrumentation import instrumented
 from ...managers import VisitModelManager
 from .previous_visit_model_mixin import PreviousVisitModelMixin
 from .visit_model_fields_mixin import VisitModelFieldsMixin
@@ -49,6 +50,7 @@ class VisitModelMixin(
     def __str__(self) -> str:
         return f"{self.subject_identifier} {self.visit_code}.{self.visit_code_sequence}"
 
+    @instrumented("visit_save")
     def save(self: Any, *args, **kwargs):
         self.subject_identifier = self.appointment.subject_identifier
         self.visit_schedule_name = self.appointment.visit_schedule_name
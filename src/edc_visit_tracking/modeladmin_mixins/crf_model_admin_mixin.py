@@ -8,6 +8,7 @@ from edc_constants.constants import UUID_PATTERN
 
 if TYPE_CHECKING:
     from django.core.handlers.wsgi import WSGIRequest
+    from django.db.models import QuerySet
     from edc_crf.model_mixins import CrfModelMixin
 
     from ..model_mixins import VisitModelMixin
@@ -21,6 +22,20 @@ class CrfModelAdminMixin:
     date_hierarchy: str = "report_datetime"
     report_datetime_field_attr: str = "report_datetime"
 
+    def get_queryset(self, request: WSGIRequest) -> QuerySet:
+        """Returns the queryset with the related visit and its
+        appointment selected so changelist columns do not
+        query per row.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .select_related(
+                self.related_visit_model_attr,
+                f"{self.related_visit_model_attr}__appointment",
+            )
+        )
+
     def visit_reason(self, obj: CrfModelMixin | None = None) -> str:
         return getattr(obj, self.related_visit_model_attr).reason
 
@@ -4,9 +4,10 @@ from typing import TYPE_CHECKING
 
 from django.contrib import admin
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import router
 from django_audit_fields.admin import audit_fieldset_tuple
 from edc_appointment.utils import get_appointment_model_cls
-from edc_constants.constants import OTHER
+from edc_constants.constants import OTHER, UUID_PATTERN
 from edc_document_status.fieldsets import document_status_fieldset_tuple
 from edc_document_status.modeladmin_mixins import DocumentStatusModelAdminMixin
 from edc_visit_schedule.fieldsets import (
@@ -18,6 +19,8 @@ from ..constants import SCHEDULED, UNSCHEDULED
 
 if TYPE_CHECKING:
     from django.core.handlers.wsgi import WSGIRequest
+    from django.db.models import QuerySet
+    from edc_appointment.models import Appointment
 
 
 class VisitModelAdminMixin(DocumentStatusModelAdminMixin):
@@ -33,6 +36,10 @@ class VisitModelAdminMixin(DocumentStatusModelAdminMixin):
 
     date_hierarchy = "report_datetime"
 
+    # name of the request attribute used by `get_appointment` to cache
+    # appointments for this request; a dict keyed on (using, appointment_id)
+    request_appointments_attr = "visit_tracking_appointments"
+
     fieldsets = (
         (
             None,
@@ -72,7 +79,7 @@ class VisitModelAdminMixin(DocumentStatusModelAdminMixin):
 
     @staticmethod
     def subject_identifier(obj=None) -> str:
-        return obj.appointment.subject_identifier
+        return obj.subject_identifier
 
     @staticmethod
     def visit_reason(obj=None) -> str:
@@ -93,11 +100,46 @@ class VisitModelAdminMixin(DocumentStatusModelAdminMixin):
     def scheduled_data(obj=None) -> str:
         return obj.get_require_crfs_display()
 
+    def get_queryset(self, request: WSGIRequest) -> QuerySet:
+        return super().get_queryset(request).select_related("appointment")
+
+    def get_appointment(
+        self, request: WSGIRequest, using: str | None = None
+    ) -> Appointment | None:
+        """Returns the appointment for the `appointment` GET
+        parameter or None.
+
+        The appointment is fetched once per request and database
+        alias and shared by `get_changeform_initial_data` and
+        `formfield_for_foreignkey`. See `request_appointments_attr`.
+        """
+        appointment_model_cls = get_appointment_model_cls()
+        using = using or router.db_for_read(appointment_model_cls)
+        appointment_id = request.GET.get("appointment")
+        appointments = getattr(request, self.request_appointments_attr, None)
+        if appointments is None:
+            appointments = {}
+            setattr(request, self.request_appointments_attr, appointments)
+        key = (using, appointment_id)
+        if key not in appointments:
+            appointment = None
+            if appointment_id and UUID_PATTERN.match(appointment_id):
+                try:
+                    appointment = appointment_model_cls.objects.using(using).get(
+                        id=appointment_id
+                    )
+                except ObjectDoesNotExist:
+                    pass
+            appointments[key] = appointment
+        return appointments[key]
+
     def formfield_for_foreignkey(self, db_field, request: WSGIRequest, **kwargs):
         db = kwargs.get("using")
-        if db_field.name == "appointment" and request.GET.get("appointment"):
+        if db_field.name == "appointment" and (
+            appointment := self.get_appointment(request, using=db)
+        ):
             kwargs["queryset"] = db_field.related_model._default_manager.using(db).filter(
-                pk=request.GET.get("appointment")
+                pk=appointment.pk
             )
         else:
             kwargs["queryset"] = db_field.related_model._default_manager.none()
@@ -139,17 +181,14 @@ class VisitModelAdminMixin(DocumentStatusModelAdminMixin):
         and reason from the appointment.visit_code_sequence.
         """
         initial_data = super().get_changeform_initial_data(request)
-        appointment_id = request.GET.get("appointment")
-        try:
-            appointment = get_appointment_model_cls().objects.get(id=appointment_id)
-        except ObjectDoesNotExist:
+        if appointment := self.get_appointment(request):
             initial_data.update(
-                report_datetime=None,
-                reason=None,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED if appointment.visit_code_sequence == 0 else UNSCHEDULED,
             )
         else:
             initial_data.update(
-                report_datetime=appointment.appt_datetime,
-                reason=SCHEDULED if appointment.visit_code_sequence == 0 else UNSCHEDULED,
+                report_datetime=None,
+                reason=None,
             )
         return initial_data
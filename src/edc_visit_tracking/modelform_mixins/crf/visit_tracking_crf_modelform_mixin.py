@@ -12,7 +12,12 @@ from ...crf_date_validator import (
     CrfReportDateBeforeStudyStart,
     CrfReportDateIsFuture,
 )
-from ...visit_sequence import VisitSequence, VisitSequenceError
+from ...instrumentation import instrumented
+from ...visit_sequence import (
+    VisitSequence,
+    VisitSequenceError,
+    mark_visit_sequence_validated,
+)
 from ..utils import get_related_visit
 
 if TYPE_CHECKING:
@@ -34,6 +39,7 @@ class VisitTrackingCrfModelFormMixin:
     report_datetime_allowance = getattr(settings, "DEFAULT_REPORT_DATETIME_ALLOWANCE", 0)
     visit_sequence_cls = VisitSequence
 
+    @instrumented("crf_form_clean")
     def clean(self: Any) -> dict:
         """Triggers a validation error if subject visit is None.
 
@@ -92,10 +98,17 @@ class VisitTrackingCrfModelFormMixin:
             ) as e:
                 raise forms.ValidationError({self.report_datetime_field_attr: str(e)})
 
+    @instrumented("crf_validate_visits_completed_in_order")
     def validate_visits_completed_in_order(self) -> None:
-        """Asserts visits are completed in order."""
-        visit_sequence = self.visit_sequence_cls(appointment=self.related_visit.appointment)
+        """Asserts visits are completed in order.
+
+        If passed, the instance is marked so the check is not
+        repeated on save.
+        """
+        appointment = self.related_visit.appointment
+        visit_sequence = self.visit_sequence_cls(appointment=appointment)
         try:
             visit_sequence.enforce_sequence(document_type="CRF")
         except VisitSequenceError as e:
             raise forms.ValidationError(e, code=INVALID_ERROR)
+        mark_visit_sequence_validated(self.instance, appointment)
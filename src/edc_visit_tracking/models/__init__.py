@@ -6,3 +6,4 @@ from .subject_visit import SubjectVisit
 from .subject_visit_missed import SubjectVisitMissed
 from .subject_visit_missed_reasons import SubjectVisitMissedReasons
 from .visit_reasons import VisitReasons
+from .visit_window_period import VisitWindowPeriod
@@ -1,4 +1,4 @@
-from django.db.models.signals import post_delete, post_save
+from django.core.signals import setting_changed
 from django.dispatch import receiver
 from edc_appointment.constants import ONTIME_APPT
 from edc_constants.constants import NOT_APPLICABLE, PATIENT
@@ -6,60 +6,145 @@ from edc_metadata import REQUIRED
 from edc_metadata.metadata import CrfMetadataGetter
 from edc_pharmacy.constants import IN_PROGRESS_APPT
 
+from ..appointment_status_updates import queue_appointment_status_update
 from ..constants import SCHEDULED
-from ..model_mixins import SubjectVisitMissedModelMixin
+from ..crf_date_validator import (
+    CRF_DATE_VALIDATOR_SETTINGS,
+    clear_crf_date_validator_engines,
+)
+from ..instrumentation import instrument
+from ..missed_visit_reverts import is_reverted_in_bulk
+from ..model_mixins.utils import clear_related_visit_model_attr_cache
+from ..utils import clear_related_visit_model_cls_cache, get_materialize_window_periods
+from ..visit_timeline import clear_visit_timelines
+from ..visit_window_table import (
+    WINDOW_PERIOD_FIELDS,
+    get_visit_window_period_model_cls,
+    update_visit_window_period,
+)
 
 
-@receiver(post_save, weak=False, dispatch_uid="visit_tracking_check_in_progress_on_post_save")
 def visit_tracking_check_in_progress_on_post_save(
     sender, instance, raw, created, using, update_fields, **kwargs  # noqa
 ):
-    """Calls method on the visit tracking instance"""
+    """Calls method on the visit tracking instance.
+
+    The call is deferred if within a `defer_appointment_status_updates`
+    block.
+
+    Connected in AppConfig.ready to each VisitModelMixin model.
+    """
     if not raw and not update_fields:
-        try:
-            instance.appointment
-        except AttributeError:
-            pass
-        else:
-            try:
+        with instrument("post_save", label=instance._meta.label_lower):
+            if not queue_appointment_status_update(instance):
                 instance.update_appointment_status()
-            except AttributeError as e:
-                if "update_appointment_status" not in str(e):
-                    raise
 
 
-@receiver(post_delete, weak=False, dispatch_uid="subject_visit_missed_on_post_delete")
 def subject_visit_missed_on_post_delete(sender, instance, using, **kwargs) -> None:
-    if isinstance(instance, (SubjectVisitMissedModelMixin,)):
-        appointment = instance.related_visit.appointment
-        # need to remove references and missed visit metadata manually
-        getter = CrfMetadataGetter(appointment)
-        getter.metadata_objects.filter(model=instance._meta.label_lower).update(
-            entry_status=REQUIRED
-        )
-        # update appointment
-        appointment.appt_status = IN_PROGRESS_APPT
-        appointment.appt_timing = ONTIME_APPT
-        appointment.modified = instance.modified
-        appointment.user_modified = instance.user_modified
-        appointment.save_base(
-            update_fields=["appt_status", "appt_timing", "modified", "user_modified"]
+    """Reverts the related visit, appointment and metadata when a
+    missed visit report is deleted.
+
+    Connected in AppConfig.ready to each SubjectVisitMissedModelMixin
+    model. Skipped if deleted by `bulk_revert_missed_visits`.
+    """
+    if is_reverted_in_bulk(instance):
+        return
+    appointment = instance.related_visit.appointment
+    # need to remove references and missed visit metadata manually
+    getter = CrfMetadataGetter(appointment)
+    getter.metadata_objects.filter(model=instance._meta.label_lower).update(
+        entry_status=REQUIRED
+    )
+    # update appointment
+    appointment.appt_status = IN_PROGRESS_APPT
+    appointment.appt_timing = ONTIME_APPT
+    appointment.modified = instance.modified
+    appointment.user_modified = instance.user_modified
+    appointment.save_base(
+        update_fields=["appt_status", "appt_timing", "modified", "user_modified"]
+    )
+    if appointment.visit_code_sequence == 0:
+        # update related visit. Visit code sequence should always be 0
+        instance.related_visit.reason = SCHEDULED
+        instance.related_visit.reason_unscheduled = NOT_APPLICABLE
+        instance.related_visit.info_source = PATIENT
+        instance.related_visit.info_source_other = None
+        instance.related_visit.comment = None
+        instance.related_visit.modified = instance.modified
+        instance.related_visit.user_modified = instance.user_modified
+        instance.related_visit.save_base(
+            update_fields=[
+                "reason",
+                "reason_unscheduled",
+                "info_source",
+                "modified",
+                "user_modified",
+            ]
         )
-        if appointment.visit_code_sequence == 0:
-            # update related visit. Visit code sequence should always be 0
-            instance.related_visit.reason = SCHEDULED
-            instance.related_visit.reason_unscheduled = NOT_APPLICABLE
-            instance.related_visit.info_source = PATIENT
-            instance.related_visit.info_source_other = None
-            instance.related_visit.comment = None
-            instance.related_visit.modified = instance.modified
-            instance.related_visit.user_modified = instance.user_modified
-            instance.related_visit.save_base(
-                update_fields=[
-                    "reason",
-                    "reason_unscheduled",
-                    "info_source",
-                    "modified",
-                    "user_modified",
-                ]
-            )
+
+
+def visit_timeline_on_post_save(sender, instance, raw, **kwargs) -> None:
+    """Invalidates cached VisitTimelines for the subject.
+
+    Connected in AppConfig.ready to the appointment and related
+    visit models.
+    """
+    if not raw:
+        clear_visit_timelines(instance.subject_identifier)
+
+
+def visit_timeline_on_post_delete(sender, instance, using, **kwargs) -> None:
+    """Invalidates cached VisitTimelines for the subject.
+
+    Connected in AppConfig.ready to the appointment and related
+    visit models.
+    """
+    clear_visit_timelines(instance.subject_identifier)
+
+
+def visit_window_period_on_post_save(
+    sender, instance, raw, using, update_fields, **kwargs
+) -> None:
+    """Replaces the VisitWindowPeriod row for the appointment, if
+    enabled.
+
+    Connected in AppConfig.ready to the appointment model.
+    """
+    if (
+        not raw
+        and get_materialize_window_periods()
+        and (not update_fields or set(update_fields).intersection(WINDOW_PERIOD_FIELDS))
+    ):
+        update_visit_window_period(instance, using=using)
+
+
+def visit_window_period_on_post_delete(sender, instance, using, **kwargs) -> None:
+    """Deletes the VisitWindowPeriod row for the appointment, if
+    enabled.
+
+    Connected in AppConfig.ready to the appointment model.
+    """
+    if get_materialize_window_periods():
+        get_visit_window_period_model_cls().objects.using(using).filter(
+            appointment_id=instance.id
+        ).delete()
+
+
+@receiver(setting_changed, weak=False, dispatch_uid="related_visit_model_on_setting_changed")
+def related_visit_model_on_setting_changed(sender, setting, **kwargs) -> None:
+    """Clears cached related visit model classes and attrs if the
+    related visit model setting changes; for example, in tests
+    using `override_settings`.
+    """
+    if setting == "SUBJECT_VISIT_MODEL":
+        clear_related_visit_model_cls_cache()
+        clear_related_visit_model_attr_cache()
+
+
+@receiver(setting_changed, weak=False, dispatch_uid="crf_date_validator_on_setting_changed")
+def crf_date_validator_on_setting_changed(sender, setting, **kwargs) -> None:
+    """Clears cached CRF date validator engines if a report
+    datetime allowance setting changes.
+    """
+    if setting in CRF_DATE_VALIDATOR_SETTINGS:
+        clear_crf_date_validator_engines()
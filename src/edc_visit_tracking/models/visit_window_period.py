@@ -0,0 +1,49 @@
+from django.db import models
+from edc_model.models import BaseUuidModel
+
+
+class VisitWindowPeriod(BaseUuidModel):
+    """The window period of each scheduled appointment.
+
+    One row per appointment with visit_code_sequence=0. Optional,
+    see settings.EDC_VISIT_TRACKING_MATERIALIZE_WINDOW_PERIODS and
+    module `visit_window_table`.
+
+    For reporting only. Form and model validation always calculate
+    the window period from the visit schedule.
+
+    Bounds are in UTC, floored to the minute, as compared by
+    `Schedule.datetime_in_window`.
+    """
+
+    subject_identifier = models.CharField(max_length=50)
+
+    site_id = models.IntegerField(null=True)
+
+    visit_schedule_name = models.CharField(max_length=25)
+
+    schedule_name = models.CharField(max_length=25)
+
+    appointment_id = models.UUIDField(unique=True)
+
+    visit_code = models.CharField(max_length=25)
+
+    timepoint = models.DecimalField(max_digits=6, decimal_places=1)
+
+    timepoint_datetime = models.DateTimeField(
+        help_text="Timepoint datetime of the appointment when the bounds were calculated"
+    )
+
+    lower_datetime = models.DateTimeField()
+
+    upper_datetime = models.DateTimeField()
+
+    class Meta(BaseUuidModel.Meta):
+        verbose_name = "Visit Window Period"
+        verbose_name_plural = "Visit Window Periods"
+        indexes = BaseUuidModel.Meta.indexes + [
+            models.Index(
+                fields=["subject_identifier", "visit_schedule_name", "schedule_name"]
+            ),
+            models.Index(fields=["visit_schedule_name", "schedule_name", "visit_code"]),
+        ]
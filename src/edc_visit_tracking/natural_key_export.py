@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Type
+
+from django.core import serializers
+
+if TYPE_CHECKING:
+    from django.db import models
+    from django.db.models import QuerySet
+
+__all__ = [
+    "ExportChunk",
+    "get_export_queryset",
+    "iter_natural_key_chunks",
+]
+
+
+@dataclass(frozen=True)
+class ExportChunk:
+    """A chunk of serialized objects from `iter_natural_key_chunks`.
+
+    `objects` are in the format of Django's "python" serializer.
+    `checkpoint` is the pk of the last object in the chunk. Pass it
+    back to `iter_natural_key_chunks` to resume after this chunk.
+    """
+
+    model: str
+    objects: list[dict]
+    checkpoint: str
+
+
+def get_export_queryset(model_cls: Type[models.Model], using: str | None = None) -> QuerySet:
+    """Returns a queryset, ordered by pk, that joins each FK to a
+    model with a natural key and prefetches M2M fields.
+
+    Natural keys of related objects, for example, the related visit
+    of a CRF or the appointment of a visit, are then computed from
+    joined columns instead of a query per row.
+    """
+    select_related = [
+        fld.name
+        for fld in model_cls._meta.concrete_fields
+        if (fld.many_to_one or fld.one_to_one) and hasattr(fld.related_model, "natural_key")
+    ]
+    prefetch_related = [
+        fld.name
+        for fld in model_cls._meta.many_to_many
+        if fld.remote_field.through._meta.auto_created
+    ]
+    return (
+        model_cls._default_manager.using(using)
+        .select_related(*select_related)
+        .prefetch_related(*prefetch_related)
+        .order_by("pk")
+    )
+
+
+def iter_natural_key_chunks(
+    model_cls: Type[models.Model] = None,
+    chunk_size: int | None = None,
+    checkpoint: str | None = None,
+    queryset: QuerySet | None = None,
+    use_natural_foreign_keys: bool | None = None,
+    use_natural_primary_keys: bool | None = None,
+) -> Iterator[ExportChunk]:
+    """Yields serialized objects in chunks of `chunk_size`
+    (default 2000) using natural keys.
+
+    One query per chunk (plus one per prefetched M2M field). Only
+    one chunk is held in memory at a time. Pages by pk so the
+    export may be resumed from the `checkpoint` of the last chunk
+    written.
+
+    If `queryset` is not provided, uses `get_export_queryset`.
+    """
+    if model_cls is None and queryset is None:
+        raise ValueError("Expected `model_cls` or `queryset`. Got neither.")
+    chunk_size = chunk_size or 2000
+    use_natural_foreign_keys = (
+        True if use_natural_foreign_keys is None else use_natural_foreign_keys
+    )
+    use_natural_primary_keys = (
+        True if use_natural_primary_keys is None else use_natural_primary_keys
+    )
+    queryset = get_export_queryset(model_cls) if queryset is None else queryset.order_by("pk")
+    while True:
+        qs = queryset if checkpoint is None else queryset.filter(pk__gt=checkpoint)
+        objs = list(qs[:chunk_size])
+        if not objs:
+            break
+        checkpoint = str(objs[-1].pk)
+        yield ExportChunk(
+            model=queryset.model._meta.label_lower,
+            objects=serializers.serialize(
+                "python",
+                objs,
+                use_natural_foreign_keys=use_natural_foreign_keys,
+                use_natural_primary_keys=use_natural_primary_keys,
+            ),
+            checkpoint=checkpoint,
+        )
+        if len(objs) < chunk_size:
+            break
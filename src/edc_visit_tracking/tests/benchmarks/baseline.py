@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+__all__ = ["BASELINE_PATH", "Measurement", "BenchmarkResults"]
+
+BASELINE_PATH = Path(
+    os.environ.get("EDC_BENCHMARK_BASELINE", Path(__file__).parent / "baseline.json")
+)
+
+
+@dataclass
+class Measurement:
+    """Accumulated wall time and query count for one operation."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    queries: int = 0
+
+    @property
+    def ms_per_call(self) -> float:
+        return (self.seconds * 1000 / self.calls) if self.calls else 0.0
+
+    @property
+    def queries_per_call(self) -> float:
+        return (self.queries / self.calls) if self.calls else 0.0
+
+
+@dataclass
+class BenchmarkResults:
+    """Measures named operations and compares them to a baseline file.
+
+    Query counts are compared, wall times are only reported; wall
+    times depend on the machine and database backend.
+    """
+
+    measurements: dict[str, Measurement] = field(default_factory=dict)
+
+    def measure(self, name: str, func: Callable[[], Any]) -> Any:
+        measurement = self.measurements.setdefault(name, Measurement())
+        with CaptureQueriesContext(connection) as ctx:
+            start = perf_counter()
+            value = func()
+            measurement.seconds += perf_counter() - start
+        measurement.calls += 1
+        measurement.queries += len(ctx.captured_queries)
+        return value
+
+    def as_dict(self) -> dict[str, dict]:
+        return {
+            name: dict(
+                calls=m.calls,
+                ms_per_call=round(m.ms_per_call, 3),
+                queries_per_call=round(m.queries_per_call, 2),
+            )
+            for name, m in sorted(self.measurements.items())
+        }
+
+    def write_baseline(self, path: Path | None = None, **context) -> None:
+        data = dict(context=context, results=self.as_dict())
+        (path or BASELINE_PATH).write_text(json.dumps(data, indent=2) + "\n")
+
+    @staticmethod
+    def read_baseline(path: Path | None = None) -> dict[str, dict]:
+        try:
+            return json.loads((path or BASELINE_PATH).read_text())["results"]
+        except FileNotFoundError:
+            return {}
+
+    def compare(self, baseline: dict[str, dict]) -> tuple[str, list[str]]:
+        """Returns a report and a list of operations with more
+        queries per call than the baseline.
+        """
+        regressions = []
+        lines = [
+            f"{'operation':<36}{'calls':>7}{'ms/call':>10}{'base':>10}"
+            f"{'queries':>9}{'base':>7}"
+        ]
+        for name, result in self.as_dict().items():
+            base = baseline.get(name, {})
+            base_ms = base.get("ms_per_call", "-")
+            base_queries = base.get("queries_per_call", "-")
+            lines.append(
+                f"{name:<36}{result['calls']:>7}{result['ms_per_call']:>10.2f}"
+                f"{base_ms:>10}{result['queries_per_call']:>9.2f}{base_queries:>7}"
+            )
+            if base and result["queries_per_call"] > base_queries:
+                regressions.append(name)
+        return "\n".join(lines), regressions
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from time import perf_counter
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.test import TestCase, tag
+
+from edc_visit_tracking.crf_date_batch_validator import validate_crf_dates
+from edc_visit_tracking.crf_date_validator import CrfDateValidator
+
+ROWS = 500_000
+
+utc_tz = ZoneInfo("UTC")
+
+
+@tag("benchmark")
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+class BenchCrfDateBatchValidator(TestCase):
+    """Vectorized vs row-by-row CRF date validation.
+
+    Run with `python runtests.py --benchmark`.
+    """
+
+    def test_validate_crf_dates(self):
+        start = datetime(2018, 1, 1, 8, 0, tzinfo=utc_tz)
+        visit_report_datetimes = [
+            start + timedelta(hours=index % 8000) for index in range(ROWS)
+        ]
+        report_datetimes = [
+            dt + timedelta(days=index % 40 - 2)
+            for index, dt in enumerate(visit_report_datetimes)
+        ]
+        started = perf_counter()
+        errors = CrfDateValidator.validate_many(zip(report_datetimes, visit_report_datetimes))
+        row_by_row = perf_counter() - started
+        started = perf_counter()
+        df = validate_crf_dates(report_datetimes, visit_report_datetimes)
+        vectorized = perf_counter() - started
+        print(f"\nvalidate_many, {ROWS} rows: {row_by_row:.2f}s")
+        print(f"validate_crf_dates, {ROWS} rows: {vectorized:.2f}s")
+        self.assertEqual(len(errors), len(df))
+        self.assertLess(vectorized, row_by_row)
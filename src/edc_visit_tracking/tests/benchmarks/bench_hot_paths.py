@@ -0,0 +1,179 @@
+import os
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.contrib import admin
+from django.contrib.admin.templatetags.admin_list import result_list
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.template.loader import get_template
+from django.test import RequestFactory, TestCase, override_settings, tag
+from edc_appointment.constants import INCOMPLETE_APPT, MISSED_APPT
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_constants.constants import ALIVE, YES
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.models import CrfFive, CrfFour, CrfOne, CrfThree, CrfTwo
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.admin_site import edc_visit_tracking_admin
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.form_validators import VisitFormValidator
+from edc_visit_tracking.modeladmin_mixins import CrfModelAdminMixin
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.visit_sequence import VisitSequence
+
+from ..helper import Helper
+from .baseline import BenchmarkResults
+
+SUBJECTS = int(os.environ.get("EDC_BENCHMARK_STUDY_SUBJECTS", 10))
+# visit_schedule1 has 4 visits; the last is reported as missed
+VISITS = min(int(os.environ.get("EDC_BENCHMARK_STUDY_VISITS", 3)), 3)
+CRFS = min(int(os.environ.get("EDC_BENCHMARK_STUDY_CRFS", 3)), 5)
+WRITE_BASELINE = os.environ.get("EDC_BENCHMARK_WRITE_BASELINE", "") == "1"
+
+utc_tz = ZoneInfo("UTC")
+
+
+class CrfOneAdmin(CrfModelAdminMixin, admin.ModelAdmin):
+    pass
+
+
+model_admins = {
+    SubjectVisit: edc_visit_tracking_admin._registry[SubjectVisit],
+    CrfOne: CrfOneAdmin(CrfOne, admin.AdminSite(name="bench_hot_paths")),
+}
+
+
+@tag("benchmark")
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+class BenchHotPaths(TestCase):
+    """Wall time and query counts for the visit tracking hot paths
+    in a synthetic study of N subjects x M visits x K CRFs.
+
+    Query counts per call are compared to `baseline.json`; the
+    benchmark fails if any operation needs more queries than the
+    baseline. Wall times are reported only.
+
+    Run with `python runtests.py --benchmark`. Set
+    EDC_BENCHMARK_STUDY_SUBJECTS, EDC_BENCHMARK_STUDY_VISITS (max 3)
+    and EDC_BENCHMARK_STUDY_CRFS (max 5) to change the size of the
+    study. Set EDC_BENCHMARK_WRITE_BASELINE=1 to write a new
+    baseline, EDC_BENCHMARK_BASELINE to use another file. Point
+    DATABASES in the test settings at PostgreSQL to measure there.
+    """
+
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        for index in range(0, SUBJECTS):
+            self.helper_cls(subject_identifier=f"S{index:05d}").consent_and_put_on_schedule(
+                visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+            )
+        self.user = get_user_model().objects.create_superuser("bench", "", "pass")
+        self.user.userprofile.sites.add(Site.objects.get(id=1))
+
+    def render_changelist(self, model_cls) -> str:
+        """Returns the rendered changelist results table.
+
+        The page template is not rendered; it needs the context
+        processors of a full EDC project.
+        """
+        model_admin = model_admins[model_cls]
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.site = Site.objects.get_current()
+        changelist = model_admin.get_changelist_instance(request)
+        changelist.formset = None
+        return get_template("admin/change_list_results.html").render(result_list(changelist))
+
+    def test_hot_paths(self):
+        results = BenchmarkResults()
+        crf_model_classes = [CrfOne, CrfTwo, CrfThree, CrfFour, CrfFive][:CRFS]
+        subject_visits = []
+        for subject_identifier in (
+            Appointment.objects.values_list("subject_identifier", flat=True)
+            .distinct()
+            .order_by("subject_identifier")
+        ):
+            appointments = Appointment.objects.filter(
+                subject_identifier=subject_identifier, visit_code_sequence=0
+            ).order_by("timepoint")
+            for appointment in appointments[0:VISITS]:
+                subject_visit = results.measure(
+                    "visit_save",
+                    lambda: SubjectVisit.objects.create(
+                        appointment=appointment,
+                        report_datetime=appointment.appt_datetime,
+                        reason=SCHEDULED,
+                    ),
+                )
+                subject_visits.append(subject_visit)
+                for model_cls in crf_model_classes:
+                    results.measure(
+                        "crf_save",
+                        lambda: model_cls.objects.create(
+                            subject_visit=subject_visit,
+                            report_datetime=subject_visit.report_datetime,
+                        ),
+                    )
+                appointment.appt_status = INCOMPLETE_APPT
+                appointment.save()
+
+        for subject_visit in subject_visits:
+            cleaned_data = dict(
+                appointment=subject_visit.appointment,
+                report_datetime=subject_visit.report_datetime,
+                reason=SCHEDULED,
+                is_present=YES,
+                survival_status=ALIVE,
+                last_alive_date=subject_visit.report_datetime.date(),
+            )
+            results.measure(
+                "visit_form_validator_clean",
+                lambda: VisitFormValidator(
+                    cleaned_data=cleaned_data, instance=subject_visit, model=SubjectVisit
+                ).validate(),
+            )
+            appointment = Appointment.objects.get(id=subject_visit.appointment_id)
+            results.measure(
+                "visit_sequence_previous_visit",
+                lambda: VisitSequence(appointment=appointment).previous_visit,
+            )
+
+        for model_cls in [SubjectVisit, CrfOne]:
+            results.measure(
+                f"admin_changelist_{model_cls._meta.model_name}",
+                lambda: self.render_changelist(model_cls),
+            )
+
+        # queryset update; the appointment post_save would create the missed visit
+        missed_appointments = Appointment.objects.filter(
+            visit_code_sequence=0, timepoint=VISITS
+        ).order_by("subject_identifier")
+        missed_appointments.update(appt_timing=MISSED_APPT)
+        for appointment in missed_appointments:
+            results.measure(
+                "missed_visit_create",
+                lambda: SubjectVisit.objects.create_missed_from_appointment(appointment),
+            )
+
+        self.assertEqual(SubjectVisit.objects.count(), SUBJECTS * (VISITS + 1))
+        report, regressions = results.compare(BenchmarkResults.read_baseline())
+        print(f"\n{SUBJECTS} subjects x {VISITS} visits x {CRFS} CRFs\n{report}")
+        if WRITE_BASELINE:
+            results.write_baseline(subjects=SUBJECTS, visits=VISITS, crfs=CRFS)
+        else:
+            self.assertEqual(regressions, [], "More queries per call than the baseline.")
@@ -0,0 +1,72 @@
+from timeit import timeit
+
+from django.test import TestCase, tag
+from edc_appointment.models import Appointment
+from edc_visit_tracking_app.models import CrfOne
+
+from edc_visit_tracking.model_mixins.base.visit_methods_model_mixin import (
+    resolve_related_visit_field_cls,
+)
+from edc_visit_tracking.model_mixins.utils import (
+    clear_related_visit_model_attr_cache,
+    get_related_visit_model_attr,
+)
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.utils import (
+    clear_related_visit_model_cls_cache,
+    get_related_visit_model_cls,
+)
+
+NUMBER = 10000
+
+
+@tag("benchmark")
+class BenchRelatedVisit(TestCase):
+    """Per-access cost of resolving the related visit FK.
+
+    Run with `python runtests.py --benchmark`.
+    """
+
+    def report(self, name: str, seconds: float) -> None:
+        print(f"\n{name}: {seconds / NUMBER * 1_000_000:.2f} us per access")
+
+    def test_related_visit_field_cls(self):
+        uncached = timeit(lambda: resolve_related_visit_field_cls(CrfOne), number=NUMBER)
+        cached = timeit(lambda: CrfOne.related_visit_field_cls(), number=NUMBER)
+        self.report("related_visit_field_cls (uncached)", uncached)
+        self.report("related_visit_field_cls (cached)", cached)
+        self.assertLess(cached, uncached)
+
+    def test_related_visit(self):
+        crf_one = CrfOne(subject_visit=SubjectVisit())
+        uncached = timeit(
+            lambda: getattr(crf_one, resolve_related_visit_field_cls(CrfOne).name),
+            number=NUMBER,
+        )
+        cached = timeit(lambda: crf_one.related_visit, number=NUMBER)
+        self.report("related_visit (uncached)", uncached)
+        self.report("related_visit (cached)", cached)
+        self.assertLess(cached, uncached)
+
+    def test_get_related_visit_model_cls(self):
+        def uncached():
+            clear_related_visit_model_cls_cache()
+            return get_related_visit_model_cls()
+
+        uncached = timeit(uncached, number=NUMBER)
+        cached = timeit(get_related_visit_model_cls, number=NUMBER)
+        self.report("get_related_visit_model_cls (uncached)", uncached)
+        self.report("get_related_visit_model_cls (cached)", cached)
+        self.assertLess(cached, uncached)
+
+    def test_get_related_visit_model_attr(self):
+        def uncached():
+            clear_related_visit_model_cls_cache()
+            clear_related_visit_model_attr_cache()
+            return get_related_visit_model_attr(Appointment)
+
+        uncached = timeit(uncached, number=NUMBER)
+        cached = timeit(lambda: get_related_visit_model_attr(Appointment), number=NUMBER)
+        self.report("get_related_visit_model_attr (uncached)", uncached)
+        self.report("get_related_visit_model_attr (cached)", cached)
+        self.assertLess(cached, uncached)
@@ -0,0 +1,127 @@
+import os
+from datetime import datetime, timedelta
+from timeit import timeit
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+from django import forms
+from django.db import connection
+from django.test import TestCase, tag
+from edc_appointment.constants import SCHEDULED_APPT
+from edc_appointment.models import Appointment
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.form_validators import VisitFormValidator
+from edc_visit_tracking.models import SubjectVisit
+
+VISITS = int(os.environ.get("EDC_BENCHMARK_VISITS", 1_000_000))
+VISITS_PER_SUBJECT = 10
+BATCH_SIZE = 10_000
+NUMBER = 1000
+
+utc_tz = ZoneInfo("UTC")
+
+
+@tag("benchmark")
+class BenchVisitDatetimeUnique(TestCase):
+    """Cost of the one-visit-per-day check against a large visit
+    table.
+
+    Appointments and visits are bulk inserted without signals.
+
+    Run with `python runtests.py --benchmark`. Set
+    EDC_BENCHMARK_VISITS to change the number of visits.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime(2019, 1, 1, 8, 0, tzinfo=utc_tz)
+        appointments, visits = [], []
+        for index in range(0, VISITS):
+            opts = dict(
+                subject_identifier=f"S{index // VISITS_PER_SUBJECT:07d}",
+                visit_schedule_name="visit_schedule1",
+                schedule_name="schedule1",
+                visit_code=f"{index % VISITS_PER_SUBJECT + 1}000",
+                visit_code_sequence=0,
+            )
+            report_datetime = start + timedelta(days=index % VISITS_PER_SUBJECT * 7)
+            appointment = Appointment(
+                id=uuid4(),
+                appt_datetime=report_datetime,
+                appt_reason=SCHEDULED_APPT,
+                facility_name="5-day-clinic",
+                timepoint=index % VISITS_PER_SUBJECT,
+                **opts,
+            )
+            appointments.append(appointment)
+            visits.append(
+                SubjectVisit(
+                    id=uuid4(),
+                    appointment_id=appointment.id,
+                    report_datetime=report_datetime,
+                    reason=SCHEDULED,
+                    **opts,
+                )
+            )
+            if len(visits) == BATCH_SIZE:
+                Appointment.objects.bulk_create(appointments)
+                SubjectVisit.objects.bulk_create(visits)
+                appointments, visits = [], []
+        Appointment.objects.bulk_create(appointments)
+        SubjectVisit.objects.bulk_create(visits)
+
+    def setUp(self):
+        report_datetime = datetime(2019, 1, 15, 12, 0, tzinfo=utc_tz)
+        self.opts = dict(
+            subject_identifier=f"S{VISITS // VISITS_PER_SUBJECT // 2:07d}",
+            visit_schedule_name="visit_schedule1",
+            schedule_name="schedule1",
+        )
+        self.form_validator = VisitFormValidator(
+            cleaned_data=dict(
+                appointment=Appointment(**self.opts), report_datetime=report_datetime
+            ),
+            instance=SubjectVisit(**self.opts),
+        )
+        self.date_qs = SubjectVisit.objects.filter(
+            report_datetime__date=report_datetime.date(), **self.opts
+        )
+
+    def date_lookup(self):
+        """Previous implementation."""
+        if self.date_qs.count() > 1:
+            pass
+        elif self.date_qs.count() == 1:
+            self.date_qs[0]
+
+    def range_lookup(self):
+        self.form_validator._errors = {}
+        try:
+            self.form_validator.validate_visit_datetime_unique()
+        except forms.ValidationError:
+            pass
+
+    def explain(self, name, qs):
+        with connection.cursor() as cursor:
+            sql, params = qs.query.sql_with_params()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            print(f"\n{name}: {[row[-1] for row in cursor.fetchall()]}")
+
+    def test_visit_datetime_unique(self):
+        self.assertEqual(SubjectVisit.objects.count(), VISITS)
+        range_qs = SubjectVisit.objects.filter(
+            report_datetime__gte=datetime(2019, 1, 15, tzinfo=utc_tz),
+            report_datetime__lt=datetime(2019, 1, 16, tzinfo=utc_tz),
+            **self.opts,
+        )
+        if connection.vendor == "sqlite":
+            self.explain("__date plan", self.date_qs)
+            self.explain("range plan", range_qs)
+        with self.assertNumQueries(1):
+            self.range_lookup()
+        date_lookup = timeit(self.date_lookup, number=NUMBER)
+        range_lookup = timeit(self.range_lookup, number=NUMBER)
+        print(f"\n__date, count x2, [0]: {date_lookup / NUMBER * 1000:.3f} ms per check")
+        print(f"range, one query: {range_lookup / NUMBER * 1000:.3f} ms per check")
+        self.assertLess(range_lookup, date_lookup)
@@ -0,0 +1,83 @@
+import os
+from datetime import datetime, timedelta
+from time import perf_counter
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+from django.test import TestCase, tag
+from edc_appointment.constants import SCHEDULED_APPT
+from edc_appointment.models import Appointment
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.visit_sequence_audit import iter_visit_sequence_violations
+
+SUBJECTS = int(os.environ.get("EDC_BENCHMARK_SUBJECTS", 50_000))
+APPOINTMENTS_PER_SUBJECT = 4
+BATCH_SIZE = 10_000
+
+utc_tz = ZoneInfo("UTC")
+
+
+@tag("benchmark")
+class BenchVisitSequenceAudit(TestCase):
+    """Time to audit visit sequence for a whole cohort.
+
+    Every tenth subject has no visit report for the second
+    appointment but has one for the third and fourth.
+
+    Run with `python runtests.py --benchmark`. Set
+    EDC_BENCHMARK_SUBJECTS to change the number of subjects.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime(2019, 1, 1, 8, 0, tzinfo=utc_tz)
+        appointments, visits = [], []
+        for subject in range(0, SUBJECTS):
+            for index in range(0, APPOINTMENTS_PER_SUBJECT):
+                opts = dict(
+                    subject_identifier=f"S{subject:07d}",
+                    visit_schedule_name="visit_schedule1",
+                    schedule_name="schedule1",
+                    visit_code=f"{index + 1}000",
+                    visit_code_sequence=0,
+                )
+                report_datetime = start + timedelta(days=index * 7)
+                appointment = Appointment(
+                    id=uuid4(),
+                    appt_datetime=report_datetime,
+                    appt_reason=SCHEDULED_APPT,
+                    facility_name="5-day-clinic",
+                    timepoint=index,
+                    **opts,
+                )
+                appointments.append(appointment)
+                if not (subject % 10 == 0 and index == 1):
+                    visits.append(
+                        SubjectVisit(
+                            id=uuid4(),
+                            appointment_id=appointment.id,
+                            report_datetime=report_datetime,
+                            reason=SCHEDULED,
+                            **opts,
+                        )
+                    )
+            if len(appointments) >= BATCH_SIZE:
+                Appointment.objects.bulk_create(appointments)
+                SubjectVisit.objects.bulk_create(visits)
+                appointments, visits = [], []
+        Appointment.objects.bulk_create(appointments)
+        SubjectVisit.objects.bulk_create(visits)
+
+    def test_visit_sequence_audit(self):
+        start = perf_counter()
+        with self.assertNumQueries(1):
+            count = sum(1 for _ in iter_visit_sequence_violations())
+        elapsed = perf_counter() - start
+        print(
+            f"\n{SUBJECTS} subjects, {SUBJECTS * APPOINTMENTS_PER_SUBJECT} appointments: "
+            f"{count} out of sequence in {elapsed:.2f}s"
+        )
+        self.assertEqual(count, len(range(0, SUBJECTS, 10)) * 2)
+        self.assertLess(elapsed, 60)
@@ -0,0 +1,111 @@
+from datetime import datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.db import transaction
+from django.test import TestCase, override_settings
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.appointment_status_updates import (
+    defer_appointment_status_updates,
+)
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+@patch.object(SubjectVisit, "update_appointment_status")
+class TestAppointmentStatusUpdates(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.helper = self.helper_cls(subject_identifier="12345")
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        self.appointment = Appointment.objects.all().order_by("timepoint")[0]
+
+    def create_and_save_subject_visit(self):
+        subject_visit = SubjectVisit.objects.create(
+            appointment=self.appointment,
+            report_datetime=self.appointment.appt_datetime,
+            reason=SCHEDULED,
+        )
+        subject_visit.save()
+        return subject_visit
+
+    def test_not_deferred(self, mock_update):
+        self.create_and_save_subject_visit()
+        self.assertEqual(mock_update.call_count, 2)
+
+    def test_deferred_once_per_appointment(self, mock_update):
+        with self.captureOnCommitCallbacks(execute=True):
+            with defer_appointment_status_updates():
+                self.create_and_save_subject_visit().save()
+                self.assertEqual(mock_update.call_count, 0)
+        self.assertEqual(mock_update.call_count, 1)
+
+    def test_deferred_until_commit(self, mock_update):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                with defer_appointment_status_updates():
+                    with defer_appointment_status_updates():
+                        self.create_and_save_subject_visit()
+                self.assertEqual(mock_update.call_count, 0)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(mock_update.call_count, 1)
+
+    def test_discarded_if_raises(self, mock_update):
+        with self.assertRaises(ValueError):
+            with defer_appointment_status_updates():
+                self.create_and_save_subject_visit()
+                raise ValueError
+        self.assertEqual(mock_update.call_count, 0)
+
+    def test_reset_if_base_exception(self, mock_update):
+        with self.assertRaises(KeyboardInterrupt):
+            with defer_appointment_status_updates():
+                subject_visit = self.create_and_save_subject_visit()
+                raise KeyboardInterrupt
+        self.assertEqual(mock_update.call_count, 0)
+        subject_visit.save()
+        self.assertEqual(mock_update.call_count, 1)
+
+    def test_discarded_if_savepoint_rolled_back(self, mock_update):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                with defer_appointment_status_updates():
+                    with self.assertRaises(ValueError):
+                        with transaction.atomic():
+                            self.create_and_save_subject_visit()
+                            raise ValueError
+        self.assertEqual(mock_update.call_count, 0)
+
+    def test_kept_if_savepoint_released(self, mock_update):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                with defer_appointment_status_updates():
+                    with transaction.atomic():
+                        subject_visit = self.create_and_save_subject_visit()
+                    subject_visit.save()
+                self.assertEqual(mock_update.call_count, 0)
+        self.assertEqual(mock_update.call_count, 1)
@@ -0,0 +1,131 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.test import TestCase, override_settings
+from edc_appointment.constants import MISSED_APPT
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_constants.constants import INCOMPLETE
+from edc_facility.import_holidays import import_holidays
+from edc_utils import get_utcnow
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import MISSED_VISIT, SCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+class TestBulkMissedVisit(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.helper = self.helper_cls(subject_identifier="12345")
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        self.appointments = list(
+            Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        )
+        SubjectVisit.objects.create(
+            appointment=self.appointments[0],
+            report_datetime=self.appointments[0].appt_datetime,
+            reason=SCHEDULED,
+        )
+        # as if imported, queryset.update() does not auto-create the visit
+        Appointment.objects.filter(id__in=[obj.id for obj in self.appointments[1:]]).update(
+            appt_timing=MISSED_APPT
+        )
+        self.appointments = list(
+            Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        )
+
+    def test_bulk_create(self):
+        result = SubjectVisit.objects.bulk_create_missed_from_appointments(
+            reversed(self.appointments[1:]), batch_size=2
+        )
+        self.assertEqual(len(result.created), 3)
+        self.assertEqual(result.conflicts, {})
+        for appointment in self.appointments[1:]:
+            subject_visit = SubjectVisit.objects.get(appointment=appointment)
+            self.assertEqual(subject_visit.reason, MISSED_VISIT)
+            self.assertEqual(subject_visit.document_status, INCOMPLETE)
+            self.assertEqual(subject_visit.site_id, appointment.site_id)
+            # post_save was sent
+            self.assertTrue(SubjectVisit.history.filter(id=subject_visit.id).exists())
+
+    def test_existing_missed_visit_skipped(self):
+        SubjectVisit.objects.bulk_create_missed_from_appointments(self.appointments[1:2])
+        result = SubjectVisit.objects.bulk_create_missed_from_appointments(
+            self.appointments[1:]
+        )
+        self.assertEqual(len(result.created), 2)
+        self.assertEqual(
+            [obj.appointment_id for obj in result.skipped], [self.appointments[1].id]
+        )
+
+    def test_conflicts(self):
+        result = SubjectVisit.objects.bulk_create_missed_from_appointments(
+            [self.appointments[0], self.appointments[2]]
+        )
+        self.assertEqual(result.created, [])
+        self.assertIn(
+            "Subject visit already exists", result.conflicts[self.appointments[0].id]
+        )
+        self.assertIn(
+            "Previous visit report required", result.conflicts[self.appointments[2].id]
+        )
+        self.assertFalse(
+            SubjectVisit.objects.filter(appointment=self.appointments[2]).exists()
+        )
+
+    def test_not_missed_is_conflict_and_blocks_later(self):
+        Appointment.objects.filter(id=self.appointments[1].id).update(appt_timing="OK")
+        self.appointments[1].refresh_from_db()
+        result = SubjectVisit.objects.bulk_create_missed_from_appointments(
+            self.appointments[1:]
+        )
+        self.assertEqual(result.created, [])
+        self.assertIn("not missed", result.conflicts[self.appointments[1].id])
+        self.assertIn(
+            "Previous visit report required", result.conflicts[self.appointments[2].id]
+        )
+
+    def test_audit_fields_match_create_missed(self):
+        SubjectVisit.objects.create_missed_from_appointment(self.appointments[1])
+        subject_visit = SubjectVisit.objects.get(appointment=self.appointments[1])
+        result = SubjectVisit.objects.bulk_create_missed_from_appointments(
+            self.appointments[2:]
+        )
+        self.assertEqual(len(result.created), 2)
+        for obj in SubjectVisit.objects.filter(appointment__in=self.appointments[2:]):
+            for field_name in [
+                "device_created",
+                "device_modified",
+                "hostname_created",
+                "hostname_modified",
+                "user_created",
+                "revision",
+            ]:
+                with self.subTest(field_name=field_name):
+                    self.assertEqual(
+                        getattr(obj, field_name), getattr(subject_visit, field_name)
+                    )
+            self.assertTrue(obj.device_created)
+            self.assertEqual(obj.created, obj.modified)
+            self.assertEqual(obj.created.date(), get_utcnow().date())
@@ -0,0 +1,97 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from edc_utils import get_utcnow
+
+from edc_visit_tracking.crf_date_batch_validator import (
+    AFTER_ALLOWANCE,
+    BEFORE_STUDY_START,
+    BEFORE_VISIT,
+    IS_FUTURE,
+    MISSING_DATETIME,
+    validate_crf_dates,
+)
+from edc_visit_tracking.crf_date_validator import CrfDateValidator
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+class TestCrfDateBatchValidator(TestCase):
+    def setUp(self):
+        visit_report_datetime = get_utcnow() - relativedelta(days=10)
+        self.visit_report_datetimes = [visit_report_datetime] * 7
+        self.report_datetimes = [
+            visit_report_datetime,
+            visit_report_datetime - relativedelta(days=1),
+            visit_report_datetime + relativedelta(days=3, hours=15),
+            visit_report_datetime + relativedelta(days=4),
+            visit_report_datetime + relativedelta(years=10),
+            visit_report_datetime - relativedelta(years=10),
+            None,
+        ]
+
+    def test_errors(self):
+        df = validate_crf_dates(
+            self.report_datetimes, self.visit_report_datetimes, report_datetime_allowance=3
+        )
+        self.assertEqual(
+            df["error"].to_dict(),
+            {
+                1: BEFORE_VISIT,
+                3: AFTER_ALLOWANCE,
+                4: IS_FUTURE,
+                5: BEFORE_STUDY_START,
+                6: MISSING_DATETIME,
+            },
+        )
+
+    def test_matches_validate_many(self):
+        errors = CrfDateValidator.validate_many(
+            zip(self.report_datetimes[:-1], self.visit_report_datetimes[:-1]),
+            report_datetime_allowance=3,
+        )
+        df = validate_crf_dates(
+            self.report_datetimes[:-1],
+            self.visit_report_datetimes[:-1],
+            report_datetime_allowance=3,
+        )
+        self.assertEqual(list(errors), list(df.index))
+
+    def test_allow_before_visit(self):
+        df = validate_crf_dates(
+            self.report_datetimes,
+            self.visit_report_datetimes,
+            report_datetime_allowance=3,
+            allow_report_datetime_before_visit=True,
+        )
+        self.assertNotIn(1, df.index)
+
+    def test_length_mismatch_raises(self):
+        self.assertRaises(
+            ValueError,
+            validate_crf_dates,
+            self.report_datetimes,
+            self.visit_report_datetimes[:-1],
+        )
+
+    def test_series(self):
+        import pandas as pd
+
+        df = validate_crf_dates(
+            pd.Series(self.report_datetimes[:-1], index=range(100, 106)),
+            pd.Series(self.visit_report_datetimes[:-1], index=range(200, 206)),
+            report_datetime_allowance=3,
+        )
+        self.assertEqual(list(df.index), [1, 3, 4, 5])
+
+    def test_none_in_future(self):
+        df = validate_crf_dates(
+            self.report_datetimes[:2],
+            self.visit_report_datetimes[:2],
+            report_datetime_allowance=3,
+        )
+        self.assertEqual(df["error"].to_dict(), {1: BEFORE_VISIT})
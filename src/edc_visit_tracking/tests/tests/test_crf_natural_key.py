@@ -0,0 +1,154 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.models import CrfOne
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.managers import CrfModelManager
+from edc_visit_tracking.models import SubjectVisit
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+def get_manager() -> CrfModelManager:
+    manager = CrfModelManager()
+    manager.model = CrfOne
+    return manager
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+class TestCrfNaturalKey(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.helper = self.helper_cls(subject_identifier="12345")
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        self.subject_visits = []
+        for appointment in Appointment.objects.all().order_by("timepoint")[0:2]:
+            self.subject_visits.append(
+                SubjectVisit.objects.create(
+                    appointment=appointment,
+                    report_datetime=appointment.appt_datetime,
+                    reason=SCHEDULED,
+                )
+            )
+        self.crf_one = CrfOne.objects.create(subject_visit=self.subject_visits[0])
+        self.manager = get_manager()
+
+    def test_get_by_natural_key_single_query(self):
+        natural_key = self.crf_one.natural_key()
+        with self.assertNumQueries(1):
+            obj = self.manager.get_by_natural_key(*natural_key)
+        self.assertEqual(obj.pk, self.crf_one.pk)
+        self.assertRaises(
+            CrfOne.DoesNotExist,
+            self.manager.get_by_natural_key,
+            *self.subject_visits[1].natural_key(),
+        )
+
+    def test_get_many_by_natural_keys(self):
+        crf_two = CrfOne.objects.create(subject_visit=self.subject_visits[1])
+        natural_keys = [
+            self.crf_one.natural_key(),
+            crf_two.natural_key(),
+            ("12345", visit_schedule1.name, "schedule1", "9999", 0),
+        ]
+        with self.assertNumQueries(1):
+            instances = self.manager.get_many_by_natural_keys(natural_keys)
+        self.assertEqual(
+            {k: obj.pk for k, obj in instances.items()},
+            {self.crf_one.natural_key(): self.crf_one.pk, crf_two.natural_key(): crf_two.pk},
+        )
+        with self.assertNumQueries(3):
+            instances = self.manager.get_many_by_natural_keys(natural_keys, batch_size=1)
+        self.assertEqual(len(instances), 2)
+
+    def test_primed_natural_keys(self):
+        existing = self.crf_one.natural_key()
+        missing = self.subject_visits[1].natural_key()
+        with self.manager.primed_natural_keys([existing, missing]):
+            with self.assertNumQueries(0):
+                self.assertRaises(
+                    CrfOne.DoesNotExist, self.manager.get_by_natural_key, *missing
+                )
+            with self.assertNumQueries(1):
+                self.assertEqual(
+                    self.manager.get_by_natural_key(*existing).pk, self.crf_one.pk
+                )
+            # created within the block, added to the map
+            crf_two = CrfOne.objects.create(subject_visit=self.subject_visits[1])
+            with self.assertNumQueries(1):
+                self.assertEqual(self.manager.get_by_natural_key(*missing).pk, crf_two.pk)
+        # map discarded on exit
+        with self.assertNumQueries(1):
+            self.assertEqual(self.manager.get_by_natural_key(*missing).pk, crf_two.pk)
+
+    def test_primed_natural_keys_visit_created_in_block(self):
+        appointment = Appointment.objects.all().order_by("timepoint")[2]
+        natural_key = (
+            "12345",
+            appointment.visit_schedule_name,
+            appointment.schedule_name,
+            appointment.visit_code,
+            0,
+        )
+        with self.manager.primed_natural_keys([natural_key]):
+            subject_visit = SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            )
+            crf = CrfOne.objects.create(subject_visit=subject_visit)
+            self.assertEqual(self.manager.get_by_natural_key(*natural_key).pk, crf.pk)
+
+    def test_primed_natural_keys_nested(self):
+        outer = self.subject_visits[1].natural_key()
+        inner = self.crf_one.natural_key()
+        with self.manager.primed_natural_keys([outer]):
+            with self.manager.primed_natural_keys([inner]):
+                crf_two = CrfOne.objects.create(subject_visit=self.subject_visits[1])
+                with self.assertNumQueries(1):
+                    self.assertEqual(self.manager.get_by_natural_key(*outer).pk, crf_two.pk)
+                with self.assertNumQueries(1):
+                    self.assertEqual(
+                        self.manager.get_by_natural_key(*inner).pk, self.crf_one.pk
+                    )
+            with self.assertNumQueries(1):
+                self.assertEqual(self.manager.get_by_natural_key(*outer).pk, crf_two.pk)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.manager.get_by_natural_key(*inner).pk, self.crf_one.pk)
+
+    def test_get_many_by_natural_keys_filters_on_each_key(self):
+        crf_two = CrfOne.objects.create(subject_visit=self.subject_visits[1])
+        # visit_code of one key with the visit_code_sequence of the other
+        natural_key = (*self.crf_one.natural_key()[:4], 1)
+        with self.assertNumQueries(1):
+            instances = self.manager.get_many_by_natural_keys(
+                [natural_key, crf_two.natural_key()]
+            )
+        self.assertEqual(list(instances), [crf_two.natural_key()])
+        with CaptureQueriesContext(connection) as ctx:
+            self.manager.get_many_by_natural_keys([self.crf_one.natural_key()])
+        self.assertNotIn(" IN (", ctx.captured_queries[0]["sql"])
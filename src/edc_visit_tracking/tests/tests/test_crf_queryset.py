@@ -0,0 +1,88 @@
+import warnings
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.test import TestCase, override_settings
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.models import CrfOne
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.exceptions import RelatedVisitLazyLoadWarning
+from edc_visit_tracking.managers import CrfQuerySet
+from edc_visit_tracking.models import SubjectVisit
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+class TestCrfQuerySet(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.helper = self.helper_cls(subject_identifier="12345")
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        for appointment in Appointment.objects.all().order_by("timepoint")[0:2]:
+            subject_visit = SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            )
+            CrfOne.objects.create(subject_visit=subject_visit)
+        # models in the test app do not declare a CrfModelManager
+        self.queryset = CrfQuerySet(model=CrfOne)
+
+    def test_with_visit_single_query(self):
+        with self.assertNumQueries(1):
+            values = [
+                (obj.subject_identifier, obj.visit_code, obj.related_visit.appointment.id)
+                for obj in self.queryset.with_visit().order_by("subject_visit__visit_code")
+            ]
+        self.assertEqual([v[1] for v in values], ["1000", "2000"])
+        self.assertEqual({v[0] for v in values}, {"12345"})
+
+    def test_with_visit_chained(self):
+        qs = self.queryset.filter(subject_visit__visit_code="2000").with_visit()
+        self.assertEqual([obj.visit_code for obj in qs], ["2000"])
+
+    @override_settings(DEBUG=True)
+    def test_lazy_related_visit_warns_in_debug(self):
+        objs = list(self.queryset.order_by("subject_visit__visit_code"))
+        with self.assertWarns(RelatedVisitLazyLoadWarning):
+            objs[1].related_visit
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RelatedVisitLazyLoadWarning)
+            for obj in self.queryset.with_visit():
+                obj.related_visit
+
+    @override_settings(DEBUG=True)
+    def test_single_instance_does_not_warn_in_debug(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RelatedVisitLazyLoadWarning)
+            self.queryset.get(subject_visit__visit_code="1000").related_visit
+            self.queryset.all()[0].related_visit
+            CrfOne.objects.all()[1].related_visit
+            list(self.queryset.all())[0].related_visit
+
+    def test_lazy_related_visit_does_not_warn(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RelatedVisitLazyLoadWarning)
+            for obj in self.queryset.all():
+                obj.related_visit
@@ -1,3 +1,4 @@
+from dataclasses import FrozenInstanceError
 from datetime import datetime
 from unittest.mock import patch
 from zoneinfo import ZoneInfo
@@ -11,13 +12,18 @@ from edc_consent import site_consents
 from edc_constants.constants import ALIVE, OTHER, YES
 from edc_facility.import_holidays import import_holidays
 from edc_form_validators import APPLICABLE_ERROR, REQUIRED_ERROR
+from edc_metadata.constants import KEYED, REQUIRED
+from edc_metadata.models import CrfMetadata, RequisitionMetadata
 from edc_utils import get_utcnow
 from edc_visit_schedule.site_visit_schedules import site_visit_schedules
 from edc_visit_tracking_app.consents import consent_v1
 from edc_visit_tracking_app.visit_schedule import visit_schedule1, visit_schedule2
 
 from edc_visit_tracking.constants import MISSED_VISIT, SCHEDULED, UNSCHEDULED
-from edc_visit_tracking.form_validators import VisitFormValidator
+from edc_visit_tracking.form_validators import (
+    VisitFormValidator,
+    VisitValidationContext,
+)
 from edc_visit_tracking.models import SubjectVisit
 
 from ..helper import Helper
@@ -210,3 +216,181 @@ class TestSubjectVisitFormValidator(TestCase):
             pass
         self.assertIn("info_source_other", form_validator._errors)
         self.assertIn(REQUIRED_ERROR, form_validator._error_codes)
+
+    def test_metadata_exists_for(self):
+        subject_visit = SubjectVisit.objects.create(
+            appointment=self.appointment, reason=SCHEDULED
+        )
+        form_validator = VisitFormValidator(
+            cleaned_data=dict(appointment=self.appointment), instance=subject_visit
+        )
+        crf_metadata = CrfMetadata.objects.filter(visit_code=self.appointment.visit_code)
+        requisition_metadata = RequisitionMetadata.objects.filter(
+            visit_code=self.appointment.visit_code
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(form_validator.metadata_exists_for(entry_status=KEYED), 0)
+        expected = (
+            crf_metadata.filter(entry_status__in=[KEYED, REQUIRED]).count()
+            + requisition_metadata.filter(entry_status__in=[KEYED, REQUIRED]).count()
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                form_validator.metadata_exists_for(entry_status=[KEYED, REQUIRED]), expected
+            )
+        self.assertGreater(expected, 0)
+        self.assertEqual(
+            sum(
+                qs.count()
+                for qs in form_validator.get_metadata_querysets(any_entry_status=True)
+            ),
+            crf_metadata.count() + requisition_metadata.count(),
+        )
+        with self.assertNumQueries(1):
+            self.assertFalse(form_validator.metadata_exists())
+        with self.assertNumQueries(1):
+            self.assertTrue(form_validator.metadata_exists(entry_status=[KEYED, REQUIRED]))
+        obj = crf_metadata[0]
+        obj.entry_status = KEYED
+        obj.save()
+        self.assertEqual(form_validator.metadata_exists_for(), 1)
+        self.assertTrue(form_validator.metadata_exists())
+        self.assertFalse(form_validator.metadata_exists(exclude_models=[obj.model]))
+        self.assertFalse(
+            form_validator.metadata_exists(entry_status=REQUIRED, filter_models=[obj.model])
+        )
+
+    def test_metadata_status_counts(self):
+        subject_visit = SubjectVisit.objects.create(
+            appointment=self.appointment, reason=SCHEDULED
+        )
+        form_validator = VisitFormValidator(
+            cleaned_data=dict(appointment=self.appointment), instance=subject_visit
+        )
+        obj = CrfMetadata.objects.filter(visit_code=self.appointment.visit_code)[0]
+        obj.entry_status = KEYED
+        obj.save()
+        expected = {}
+        for model_cls in [CrfMetadata, RequisitionMetadata]:
+            for entry_status in model_cls.objects.filter(
+                visit_code=self.appointment.visit_code
+            ).values_list("entry_status", flat=True):
+                expected[entry_status] = expected.get(entry_status, 0) + 1
+        with self.assertNumQueries(1):
+            counts = form_validator.metadata_status_counts()
+        self.assertEqual(counts, expected)
+        self.assertEqual(counts[KEYED], 1)
+        self.assertNotIn(
+            KEYED, form_validator.metadata_status_counts(exclude_models=[obj.model])
+        )
+
+    def test_visit_datetime_unique(self):
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        SubjectVisit.objects.create(
+            appointment=appointments[0],
+            report_datetime=appointments[0].appt_datetime,
+            reason=SCHEDULED,
+        )
+        for report_datetime, visit_exists in [
+            (appointments[0].appt_datetime.replace(hour=0, minute=0), True),
+            (appointments[0].appt_datetime.replace(hour=23, minute=59), True),
+            (appointments[0].appt_datetime.replace(hour=0) + relativedelta(days=1), False),
+        ]:
+            with self.subTest(report_datetime=report_datetime):
+                form_validator = VisitFormValidator(
+                    cleaned_data=dict(
+                        appointment=appointments[1], report_datetime=report_datetime
+                    ),
+                    instance=SubjectVisit(
+                        appointment=appointments[1],
+                        visit_schedule_name=appointments[1].visit_schedule_name,
+                        schedule_name=appointments[1].schedule_name,
+                    ),
+                )
+                with self.assertNumQueries(1):
+                    try:
+                        form_validator.validate_visit_datetime_unique()
+                    except forms.ValidationError:
+                        pass
+                if visit_exists:
+                    self.assertIn("See 1000.0", str(form_validator._errors))
+                else:
+                    self.assertEqual({}, form_validator._errors)
+
+    def test_visit_datetime_unique_does_not_build_context(self):
+        opts = dict(
+            subject_identifier=self.subject_identifier,
+            visit_schedule_name="visit_schedule1",
+            schedule_name="schedule1",
+        )
+        form_validator = VisitFormValidator(
+            cleaned_data=dict(appointment=Appointment(**opts), report_datetime=get_utcnow()),
+            instance=SubjectVisit(**opts),
+        )
+        with self.assertNumQueries(1):
+            form_validator.validate_visit_datetime_unique()
+        self.assertIsNone(form_validator._context)
+
+    def test_validation_context_built_once_per_clean(self):
+        appointment = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")[0]
+        subject_visit = SubjectVisit.objects.create(appointment=appointment, reason=SCHEDULED)
+        cleaned_data = dict(
+            appointment=appointment,
+            report_datetime=appointment.appt_datetime,
+            reason=SCHEDULED,
+            is_present=YES,
+            survival_status=ALIVE,
+            last_alive_date=get_utcnow().date(),
+        )
+        form_validator = VisitFormValidator(cleaned_data=cleaned_data, instance=subject_visit)
+        with (
+            patch.object(
+                VisitValidationContext,
+                "from_appointment",
+                wraps=VisitValidationContext.from_appointment,
+            ) as mock_from_appointment,
+            patch(
+                "edc_visit_tracking.form_validators.visit_validation_context.is_baseline",
+                return_value=True,
+            ) as mock_is_baseline,
+        ):
+            form_validator.validate()
+        self.assertEqual(mock_from_appointment.call_count, 1)
+        self.assertEqual(mock_is_baseline.call_count, 1)
+        context = form_validator.context
+        self.assertTrue(context.baseline)
+        self.assertIsNone(context.visit_sequence_error)
+        self.assertTrue(context.datetime_in_window(appointment.appt_datetime))
+        self.assertRaises(FrozenInstanceError, setattr, context, "baseline", False)
+        self.assertIs(form_validator.appt_datetime_local, context.appt_datetime_local)
+        self.assertIs(form_validator.report_datetime_utc, context.report_datetime_utc)
+        self.assertEqual(form_validator.subject_identifier, appointment.subject_identifier)
+
+    def test_properties_without_context(self):
+        appointment = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")[0]
+        form_validator = VisitFormValidator(
+            cleaned_data=dict(
+                appointment=appointment, report_datetime=appointment.appt_datetime
+            ),
+            instance=SubjectVisit(appointment=appointment),
+        )
+        self.assertEqual(form_validator.appt_datetime_local, appointment.appt_datetime)
+        self.assertEqual(form_validator.report_datetime_utc, appointment.appt_datetime)
+        self.assertEqual(form_validator.subject_identifier, appointment.subject_identifier)
+        self.assertIsNone(form_validator._context)
+
+    def test_validation_context_sequence_error(self):
+        appointment = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")[1]
+        form_validator = VisitFormValidator(
+            cleaned_data=dict(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            ),
+            instance=SubjectVisit(appointment=appointment),
+        )
+        self.assertIsNotNone(form_validator.context.window_lower)
+        self.assertIsNotNone(form_validator.context.visit_sequence_error)
+        self.assertRaises(
+            forms.ValidationError, form_validator.validate_visits_completed_in_order
+        )
@@ -0,0 +1,163 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django import forms
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_constants.constants import ALIVE, YES
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.models import CrfOne
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.form_validators import (
+    VisitFormValidator,
+    VisitMissedFormValidator,
+)
+from edc_visit_tracking.instrumentation import (
+    collect_stage_records,
+    stage_completed,
+    summarize_stage_records,
+)
+from edc_visit_tracking.middleware import InstrumentationMiddleware
+from edc_visit_tracking.modelform_mixins import VisitTrackingCrfModelFormMixin
+from edc_visit_tracking.models import SubjectVisit
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+class CrfOneForm(VisitTrackingCrfModelFormMixin, forms.ModelForm):
+    report_datetime_field_attr = "report_datetime"
+
+    class Meta:
+        model = CrfOne
+        fields = ["subject_visit", "report_datetime", "f1"]
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+class TestInstrumentation(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper_cls(subject_identifier="12345").consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        self.appointment = Appointment.objects.all().order_by("timepoint")[0]
+
+    def create_subject_visit(self):
+        return SubjectVisit.objects.create(
+            appointment=self.appointment,
+            report_datetime=self.appointment.appt_datetime,
+            reason=SCHEDULED,
+        )
+
+    def test_disabled_by_default(self):
+        with collect_stage_records() as records:
+            self.create_subject_visit()
+        self.assertEqual(records, [])
+
+    @override_settings(EDC_VISIT_TRACKING_INSTRUMENTATION=True)
+    def test_visit_save_stages(self):
+        sent = []
+
+        def receiver(sender, record, **kwargs):
+            sent.append(record)
+
+        stage_completed.connect(receiver, weak=False, dispatch_uid="test_instrumentation")
+        try:
+            with collect_stage_records() as records:
+                self.create_subject_visit()
+        finally:
+            stage_completed.disconnect(dispatch_uid="test_instrumentation")
+        self.assertEqual(sent, records)
+        summary = summarize_stage_records(records)
+        self.assertEqual(
+            sorted(summary), ["post_save", "validate_visit_sequence", "visit_save"]
+        )
+        self.assertEqual(summary["visit_save"]["calls"], 1)
+        visit_save = [r for r in records if r.stage == "visit_save"][0]
+        self.assertEqual(visit_save.label, "edc_visit_tracking.subjectvisit")
+        # counts are inclusive
+        self.assertGreater(
+            visit_save.queries,
+            summary["validate_visit_sequence"]["queries"] + summary["post_save"]["queries"],
+        )
+
+    @override_settings(EDC_VISIT_TRACKING_INSTRUMENTATION=True)
+    def test_form_validator_stage(self):
+        subject_visit = self.create_subject_visit()
+        cleaned_data = dict(
+            appointment=self.appointment,
+            report_datetime=subject_visit.report_datetime,
+            reason=SCHEDULED,
+            is_present=YES,
+            survival_status=ALIVE,
+            last_alive_date=subject_visit.report_datetime.date(),
+        )
+        with collect_stage_records() as records:
+            VisitFormValidator(
+                cleaned_data=cleaned_data, instance=subject_visit, model=SubjectVisit
+            ).validate()
+        self.assertEqual([r.stage for r in records], ["visit_form_validator"])
+        self.assertGreater(records[0].queries, 0)
+
+    @override_settings(EDC_VISIT_TRACKING_INSTRUMENTATION=True)
+    def test_visit_missed_form_validator_stage(self):
+        with collect_stage_records() as records:
+            VisitMissedFormValidator(cleaned_data={}).validate()
+        self.assertEqual([r.stage for r in records], ["visit_missed_form_validator"])
+
+    @override_settings(EDC_VISIT_TRACKING_INSTRUMENTATION=True)
+    def test_crf_stages(self):
+        subject_visit = self.create_subject_visit()
+        form = CrfOneForm(
+            data=dict(
+                subject_visit=subject_visit.pk,
+                report_datetime=subject_visit.report_datetime,
+                f1="1",
+            )
+        )
+        with collect_stage_records() as records:
+            self.assertTrue(form.is_valid())
+        summary = summarize_stage_records(records)
+        self.assertEqual(
+            sorted(summary), ["crf_form_clean", "crf_validate_visits_completed_in_order"]
+        )
+        self.assertEqual(
+            {r.label for r in records if r.stage == "crf_form_clean"},
+            {"edc_visit_tracking_app.crfone"},
+        )
+        with collect_stage_records() as records:
+            form.save()
+        self.assertIn("crf_save", [r.stage for r in records])
+        crf_save = [r for r in records if r.stage == "crf_save"][0]
+        self.assertEqual(crf_save.label, "edc_visit_tracking_app.crfone")
+        self.assertGreater(crf_save.queries, 0)
+
+    @override_settings(EDC_VISIT_TRACKING_INSTRUMENTATION=True)
+    def test_middleware(self):
+        def get_response(request):
+            self.create_subject_visit()
+            return HttpResponse()
+
+        middleware = InstrumentationMiddleware(get_response)
+        with self.assertLogs("edc_visit_tracking.middleware", level="INFO") as cm:
+            middleware(RequestFactory().get("/subject/"))
+        self.assertIn("GET /subject/", cm.output[0])
+        self.assertEqual(cm.records[0].stages["visit_save"]["calls"], 1)
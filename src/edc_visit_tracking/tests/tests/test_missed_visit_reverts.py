@@ -0,0 +1,183 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from edc_appointment.constants import MISSED_APPT, ONTIME_APPT
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_constants.constants import ALIVE, NO, YES
+from edc_facility.import_holidays import import_holidays
+from edc_list_data import load_list_data
+from edc_metadata.models import CrfMetadata
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_schedule.visit import Crf, CrfCollection, Visit
+from edc_visit_schedule.visit_schedule import VisitSchedule
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.models import list_data
+
+from edc_visit_tracking.constants import MISSED_VISIT, SCHEDULED
+from edc_visit_tracking.missed_visit_reverts import bulk_revert_missed_visits
+from edc_visit_tracking.models import SubjectVisit, SubjectVisitMissed
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_MISSED_VISIT_REASONS_MODEL="edc_visit_tracking.subjectvisitmissed")
+class TestMissedVisitReverts(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        load_list_data(
+            list_data=list_data,
+            model_name="edc_visit_tracking.subjectvisitmissedreasons",
+        )
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        visit_schedule = VisitSchedule(
+            name="visit_schedule1",
+            offstudy_model="edc_visit_tracking_app.subjectoffstudy",
+            death_report_model="edc_visit_tracking_app.deathreport",
+            locator_model="edc_locator.subjectlocator",
+        )
+        schedule = Schedule(
+            name="schedule1",
+            onschedule_model="edc_visit_tracking_app.onscheduleone",
+            offschedule_model="edc_visit_tracking_app.offscheduleone",
+            consent_definitions=[consent_v1],
+        )
+        for index in range(0, 4):
+            schedule.add_visit(
+                Visit(
+                    code=f"{index + 1}000",
+                    title=f"Day {index + 1}",
+                    timepoint=index,
+                    rbase=relativedelta(days=index),
+                    rlower=relativedelta(days=0),
+                    rupper=relativedelta(days=6),
+                    requisitions=None,
+                    crfs=CrfCollection(
+                        Crf(show_order=1, model="edc_visit_tracking_app.crfone", required=True)
+                    ),
+                    crfs_missed=CrfCollection(
+                        Crf(
+                            show_order=1,
+                            model="edc_visit_tracking.subjectvisitmissed",
+                            required=True,
+                        )
+                    ),
+                )
+            )
+        visit_schedule.add_schedule(schedule)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule)
+        for subject_identifier in ["12345", "67890"]:
+            self.helper_cls(subject_identifier=subject_identifier).consent_and_put_on_schedule(
+                visit_schedule_name="visit_schedule1", schedule_name="schedule1"
+            )
+            appointments = Appointment.objects.filter(
+                subject_identifier=subject_identifier
+            ).order_by("timepoint")
+            SubjectVisit.objects.create(
+                appointment=appointments[0],
+                report_datetime=appointments[0].appt_datetime,
+                reason=SCHEDULED,
+            )
+            for appointment in appointments[1:3]:
+                appointment.appt_timing = MISSED_APPT
+                appointment.save()
+                subject_visit = SubjectVisit.objects.get(appointment=appointment)
+                SubjectVisitMissed.objects.create(
+                    subject_visit=subject_visit,
+                    report_datetime=subject_visit.report_datetime,
+                    survival_status=ALIVE,
+                    contact_attempted=YES,
+                    contact_attempts_count=1,
+                    contact_made=YES,
+                    ltfu=NO,
+                )
+
+    @staticmethod
+    def get_state(subject_identifier: str) -> list:
+        return [
+            list(
+                Appointment.objects.filter(subject_identifier=subject_identifier)
+                .order_by("timepoint")
+                .values_list("appt_status", "appt_timing", "user_modified")
+            ),
+            list(
+                SubjectVisit.objects.filter(subject_identifier=subject_identifier)
+                .order_by("visit_code")
+                .values_list(
+                    "reason",
+                    "reason_unscheduled",
+                    "info_source",
+                    "user_modified",
+                )
+            ),
+            list(
+                CrfMetadata.objects.filter(subject_identifier=subject_identifier)
+                .order_by("visit_code", "model")
+                .values_list("visit_code", "model", "entry_status")
+            ),
+        ]
+
+    def test_bulk_revert_same_as_delete(self):
+        self.assertEqual(SubjectVisit.objects.filter(reason=MISSED_VISIT).count(), 4)
+        modified = {
+            obj.subject_visit_id: obj.modified
+            for obj in SubjectVisitMissed.objects.filter(
+                subject_visit__subject_identifier="67890"
+            )
+        }
+        for obj in SubjectVisitMissed.objects.filter(
+            subject_visit__subject_identifier="12345"
+        ):
+            obj.delete()
+        count = bulk_revert_missed_visits(
+            SubjectVisitMissed.objects.filter(subject_visit__subject_identifier="67890"),
+            batch_size=1,
+        )
+        self.assertEqual(count, 2)
+        self.assertFalse(SubjectVisitMissed.objects.exists())
+        self.assertEqual(SubjectVisit.objects.filter(reason=MISSED_VISIT).count(), 0)
+        self.assertEqual(
+            list(
+                Appointment.objects.filter(timepoint__in=[1, 2])
+                .values_list("appt_timing", flat=True)
+                .distinct()
+            ),
+            [ONTIME_APPT],
+        )
+        self.assertEqual(self.get_state("12345"), self.get_state("67890"))
+        for subject_visit in SubjectVisit.objects.filter(id__in=modified):
+            self.assertEqual(subject_visit.modified, modified[subject_visit.id])
+            self.assertEqual(subject_visit.appointment.modified, modified[subject_visit.id])
+
+    def test_bulk_revert_updates_once_per_batch(self):
+        with CaptureQueriesContext(connection) as ctx:
+            count = bulk_revert_missed_visits(SubjectVisitMissed.objects.all())
+        self.assertEqual(count, 4)
+        self.assertFalse(SubjectVisitMissed.objects.exists())
+        for model_cls in [Appointment, SubjectVisit]:
+            self.assertEqual(
+                len(
+                    [
+                        query
+                        for query in ctx.captured_queries
+                        if query["sql"].startswith(f'UPDATE "{model_cls._meta.db_table}"')
+                    ]
+                ),
+                1,
+            )
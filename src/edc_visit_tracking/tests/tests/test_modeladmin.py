@@ -6,6 +6,7 @@ from django.contrib import admin
 from django.test import TestCase
 from django.test.client import RequestFactory
 from django_audit_fields.admin import ModelAdminAuditFieldsMixin, audit_fields
+from edc_appointment.constants import INCOMPLETE_APPT
 from edc_appointment.models import Appointment
 from edc_consent import site_consents
 from edc_facility.import_holidays import import_holidays
@@ -17,7 +18,10 @@ from edc_visit_tracking_app.visit_schedule import visit_schedule1, visit_schedul
 
 from edc_visit_tracking.admin_site import edc_visit_tracking_admin
 from edc_visit_tracking.constants import SCHEDULED
-from edc_visit_tracking.modeladmin_mixins import CrfModelAdminMixin
+from edc_visit_tracking.modeladmin_mixins import (
+    CrfModelAdminMixin,
+    VisitModelAdminMixin,
+)
 from edc_visit_tracking.models import SubjectVisit
 
 from ..helper import Helper
@@ -31,6 +35,10 @@ class CrfOneModelAdmin(CrfModelAdminMixin, ModelAdminAuditFieldsMixin, admin.Mod
         return CrfOne.objects.all()
 
 
+class SubjectVisitModelAdmin(VisitModelAdminMixin, admin.ModelAdmin):
+    pass
+
+
 @time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
 class TestModelAdmin(TestCase):
     helper_cls = Helper
@@ -89,6 +97,35 @@ class TestModelAdmin(TestCase):
             modeladmin.get_search_fields(request),
         )
 
+    def test_changelist_query_count_is_constant(self):
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name="visit_schedule1",
+            schedule_name="schedule1",
+        )
+        request = RequestFactory().get("/")
+        modeladmin = edc_visit_tracking_admin._registry.get(CrfOne)
+        list_display = [
+            "subject_identifier",
+            "visit_code",
+            "visit_code_sequence",
+            "visit_reason",
+        ]
+        for appointment in Appointment.objects.all().order_by("timepoint_datetime"):
+            subject_visit = SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            )
+            CrfOne.objects.create(subject_visit=subject_visit)
+            appointment.appt_status = INCOMPLETE_APPT
+            appointment.save()
+            with self.assertNumQueries(1):
+                for obj in modeladmin.get_queryset(request):
+                    for attr in list_display:
+                        getattr(modeladmin, attr)(obj)
+                    obj.subject_visit.appointment.visit_code  # noqa: B018
+        self.assertEqual(CrfOne.objects.count(), 4)
+
     def test_extends_fk_none(self):
         factory = RequestFactory()
         request = factory.get(
@@ -161,6 +198,55 @@ class TestModelAdmin(TestCase):
         kwargs = modeladmin.formfield_for_foreignkey(db_field, request)
         self.assertGreater(kwargs["queryset"].count(), 0)
 
+    def test_visit_changelist_query_count_is_constant(self):
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name="visit_schedule1",
+            schedule_name="schedule1",
+        )
+        request = RequestFactory().get("/")
+        modeladmin = SubjectVisitModelAdmin(SubjectVisit, admin.site)
+        for appointment in Appointment.objects.all().order_by("timepoint_datetime"):
+            SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            )
+            appointment.appt_status = INCOMPLETE_APPT
+            appointment.save()
+            with self.assertNumQueries(1):
+                for obj in modeladmin.get_queryset(request):
+                    for attr in ["subject_identifier", "visit_reason", "status"]:
+                        getattr(modeladmin, attr)(obj)
+                    obj.appointment.appt_datetime  # noqa: B018
+
+    def test_visit_add_form_fetches_appointment_once(self):
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name="visit_schedule1",
+            schedule_name="schedule1",
+        )
+        appointment = Appointment.objects.all().order_by("timepoint_datetime")[0]
+        request = RequestFactory().get(f"/?appointment={str(appointment.id)}")
+        modeladmin = edc_visit_tracking_admin._registry.get(SubjectVisit)
+
+        class Fld:
+            name = "appointment"
+
+            related_model = Appointment
+
+            def formfield(self, **kwargs):
+                return kwargs
+
+        with self.assertNumQueries(1):
+            initial_data = modeladmin.get_changeform_initial_data(request)
+            kwargs = modeladmin.formfield_for_foreignkey(Fld(), request)
+        self.assertEqual(initial_data.get("report_datetime"), appointment.appt_datetime)
+        self.assertEqual(initial_data.get("reason"), SCHEDULED)
+        self.assertEqual([obj.id for obj in kwargs["queryset"]], [appointment.id])
+        self.assertEqual(
+            request.visit_tracking_appointments,
+            {("default", str(appointment.id)): appointment},
+        )
+
     def test_crf_readonly(self):
         self.helper.consent_and_put_on_schedule(
             visit_schedule_name="visit_schedule1",
@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.core.management import call_command
+from django.test import TestCase
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.models import CrfOne
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.natural_key_export import iter_natural_key_chunks
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+class TestNaturalKeyExport(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.helper = self.helper_cls(subject_identifier="12345")
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        for appointment in Appointment.objects.all().order_by("timepoint")[0:3]:
+            subject_visit = SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            )
+            CrfOne.objects.create(subject_visit=subject_visit, f1=appointment.visit_code)
+
+    def test_one_query_per_chunk(self):
+        with self.assertNumQueries(2):
+            chunks = list(iter_natural_key_chunks(CrfOne, chunk_size=2))
+        self.assertEqual([len(chunk.objects) for chunk in chunks], [2, 1])
+        natural_keys = [obj.natural_key() for obj in CrfOne.objects.all().order_by("pk")]
+        self.assertEqual(
+            [
+                tuple(obj["fields"]["subject_visit"])
+                for chunk in chunks
+                for obj in chunk.objects
+            ],
+            natural_keys,
+        )
+        # natural primary key, pk not exported
+        self.assertNotIn("pk", chunks[0].objects[0])
+
+    def test_resume_from_checkpoint(self):
+        chunks = list(iter_natural_key_chunks(CrfOne, chunk_size=2))
+        resumed = list(
+            iter_natural_key_chunks(CrfOne, chunk_size=2, checkpoint=chunks[0].checkpoint)
+        )
+        self.assertEqual(len(resumed), 1)
+        self.assertEqual(resumed[0].objects, chunks[1].objects)
+        self.assertEqual(
+            list(iter_natural_key_chunks(CrfOne, checkpoint=chunks[-1].checkpoint)), []
+        )
+
+    def test_visit_natural_keys_from_joined_columns(self):
+        with self.assertNumQueries(1):
+            chunks = list(iter_natural_key_chunks(SubjectVisit))
+        self.assertEqual(
+            [tuple(obj["fields"]["appointment"]) for obj in chunks[0].objects],
+            [
+                obj.appointment.natural_key()
+                for obj in SubjectVisit.objects.all().order_by("pk")
+            ],
+        )
+
+    def test_command_resumes_from_checkpoint_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, "export.jsonl")
+            checkpoint_file = os.path.join(folder, "checkpoint.json")
+            first = CrfOne.objects.all().order_by("pk")[0]
+            with open(checkpoint_file, "w") as f:
+                json.dump({"edc_visit_tracking_app.crfone": {"checkpoint": str(first.pk)}}, f)
+            with open(output, "w") as f:
+                f.write(json.dumps({"model": "edc_visit_tracking_app.crfone"}) + "\n")
+            call_command(
+                "export_natural_keys",
+                "edc_visit_tracking_app.crfone",
+                "edc_visit_tracking.subjectvisit",
+                output=output,
+                checkpoint_file=checkpoint_file,
+                chunk_size=1,
+                stderr=StringIO(),
+            )
+            with open(output) as f:
+                rows = [json.loads(line) for line in f]
+            with open(checkpoint_file) as f:
+                checkpoints = json.load(f)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(
+            [row["model"] for row in rows],
+            ["edc_visit_tracking_app.crfone"] * 3 + ["edc_visit_tracking.subjectvisit"] * 3,
+        )
+        self.assertTrue(checkpoints["edc_visit_tracking_app.crfone"]["complete"])
+        self.assertTrue(checkpoints["edc_visit_tracking.subjectvisit"]["complete"])
+
+    def test_requires_model_cls_or_queryset(self):
+        self.assertRaises(ValueError, list, iter_natural_key_chunks())
+
+    def test_command_resume_drops_rows_after_checkpoint(self):
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, "export.jsonl")
+            checkpoint_file = os.path.join(folder, "checkpoint.json")
+            call_command(
+                "export_natural_keys",
+                "edc_visit_tracking_app.crfone",
+                output=output,
+                checkpoint_file=checkpoint_file,
+                chunk_size=1,
+                stderr=StringIO(),
+            )
+            with open(output) as f:
+                expected = f.readlines()
+            # as if interrupted after writing the second row but before
+            # recording its checkpoint
+            with open(output, "w") as f:
+                f.writelines(expected[:2])
+            first = CrfOne.objects.all().order_by("pk")[0]
+            with open(checkpoint_file, "w") as f:
+                json.dump(
+                    {
+                        "edc_visit_tracking_app.crfone": {
+                            "checkpoint": str(first.pk),
+                            "offset": len(expected[0].encode()),
+                        }
+                    },
+                    f,
+                )
+            call_command(
+                "export_natural_keys",
+                "edc_visit_tracking_app.crfone",
+                output=output,
+                checkpoint_file=checkpoint_file,
+                chunk_size=1,
+                stderr=StringIO(),
+            )
+            with open(output) as f:
+                self.assertEqual(f.readlines(), expected)
+            with open(checkpoint_file) as f:
+                self.assertEqual(
+                    json.load(f)["edc_visit_tracking_app.crfone"]["offset"],
+                    os.path.getsize(output),
+                )
@@ -0,0 +1,92 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.test import TestCase, override_settings
+from edc_appointment.constants import IN_PROGRESS_APPT, INCOMPLETE_APPT
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.view_utils import (
+    PrecomputedRelatedVisitButton,
+    RelatedVisitButton,
+    get_related_visit_buttons,
+)
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+class TestRelatedVisitButton(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper_cls(subject_identifier="12345").consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        for appointment in Appointment.objects.all().order_by("timepoint")[0:2]:
+            SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            )
+            appointment.appt_status = INCOMPLETE_APPT
+            appointment.save()
+        Appointment.objects.filter(visit_code="3000").update(appt_status=IN_PROGRESS_APPT)
+        self.current_site = Site.objects.get_current()
+        self.user = get_user_model().objects.create_superuser("erik", "", "pass")
+        self.user.userprofile.sites.add(self.current_site)
+
+    def test_buttons_match_related_visit_button(self):
+        appointments = Appointment.objects.all().order_by("timepoint")
+        buttons = get_related_visit_buttons(
+            appointments, user=self.user, current_site=self.current_site
+        )
+        self.assertEqual(list(buttons), [obj.id for obj in appointments])
+        for appointment in appointments:
+            button = buttons[appointment.id]
+            self.assertIsInstance(button, PrecomputedRelatedVisitButton)
+            expected = RelatedVisitButton(
+                model_obj=SubjectVisit.objects.filter(appointment=appointment).first(),
+                model_cls=SubjectVisit,
+                appointment=appointment,
+                user=self.user,
+                current_site=self.current_site,
+            )
+            self.assertEqual(button.color(), expected.color())
+            self.assertEqual(button.label, expected.label)
+            self.assertEqual(button.disabled, expected.disabled)
+            self.assertEqual(button.title, expected.title)
+        self.assertEqual(buttons[appointments[2].id].disabled, "")
+        self.assertEqual(buttons[appointments[3].id].disabled, "disabled")
+
+    def test_buttons_precomputed(self):
+        appointments = Appointment.objects.all().order_by("timepoint")
+        # appointments, related visits and one permissions lookup
+        with self.assertNumQueries(6):
+            buttons = get_related_visit_buttons(
+                appointments, user=self.user, current_site=self.current_site
+            )
+        with self.assertNumQueries(0):
+            for button in buttons.values():
+                button.color(), button.label, button.disabled, button.title
+        self.assertEqual(len({id(button.perms) for button in buttons.values()}), 1)
@@ -0,0 +1,98 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings
+from edc_appointment.constants import INCOMPLETE_APPT
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_utils import get_utcnow
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED, UNSCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.utils import (
+    get_next_related_visit,
+    get_next_related_visits,
+    get_previous_related_visit,
+    get_previous_related_visits,
+)
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+class TestRelatedVisits(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        for subject_identifier in ["12345", "67890"]:
+            self.helper = self.helper_cls(subject_identifier=subject_identifier)
+            self.helper.consent_and_put_on_schedule(
+                visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+            )
+            self.add_visits_with_unscheduled(subject_identifier)
+
+    def add_visits_with_unscheduled(self, subject_identifier):
+        appointments = Appointment.objects.filter(
+            subject_identifier=subject_identifier
+        ).order_by("timepoint", "visit_code_sequence")
+        for index, appointment in enumerate(appointments[0:3]):
+            for _ in range(0, 2):
+                SubjectVisit.objects.create(
+                    appointment=appointment,
+                    report_datetime=get_utcnow() - relativedelta(months=10 - index),
+                    reason=SCHEDULED if appointment.visit_code_sequence == 0 else UNSCHEDULED,
+                )
+                appointment.appt_status = INCOMPLETE_APPT
+                appointment.save()
+                if appointment.visit_code_sequence == 0:
+                    appointment = self.helper.create_unscheduled(appointment)
+
+    def test_matches_single_visit_funcs(self):
+        related_visits = SubjectVisit.objects.all()
+        for include_interim in [True, False]:
+            with self.subTest(include_interim=include_interim):
+                with self.assertNumQueries(3):
+                    previous_visits = get_previous_related_visits(
+                        related_visits, include_interim=include_interim
+                    )
+                with self.assertNumQueries(3):
+                    next_visits = get_next_related_visits(
+                        related_visits, include_interim=include_interim
+                    )
+                for obj in related_visits:
+                    self.assertEqual(
+                        previous_visits[obj.id],
+                        get_previous_related_visit(obj, include_interim=include_interim),
+                    )
+                    self.assertEqual(
+                        next_visits[obj.id],
+                        get_next_related_visit(obj, include_interim=include_interim),
+                    )
+
+    def test_list_of_related_visits(self):
+        related_visits = list(SubjectVisit.objects.filter(subject_identifier="12345"))
+        with self.assertNumQueries(2):
+            previous_visits = get_previous_related_visits(related_visits, include_interim=True)
+        self.assertEqual(set(previous_visits), {obj.id for obj in related_visits})
+        self.assertEqual(
+            [obj.subject_identifier for obj in previous_visits.values() if obj],
+            ["12345"] * (len(related_visits) - 1),
+        )
+        self.assertEqual(get_previous_related_visits([]), {})
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase
+
+
+def get_dispatch_uids(signal) -> set[str]:
+    return {lookup_key[0] for lookup_key, *_ in signal.receivers}
+
+
+class TestSignals(TestCase):
+    def test_post_save_bound_to_visit_models(self):
+        dispatch_uids = get_dispatch_uids(post_save)
+        self.assertNotIn("visit_tracking_check_in_progress_on_post_save", dispatch_uids)
+        self.assertIn(
+            "visit_tracking_check_in_progress_on_post_save_edc_visit_tracking.subjectvisit",
+            dispatch_uids,
+        )
+        self.assertNotIn(
+            "visit_tracking_check_in_progress_on_post_save_edc_visit_tracking_app.crfone",
+            dispatch_uids,
+        )
+
+    def test_post_delete_bound_to_missed_visit_models(self):
+        dispatch_uids = get_dispatch_uids(post_delete)
+        self.assertNotIn("subject_visit_missed_on_post_delete", dispatch_uids)
+        self.assertIn(
+            "subject_visit_missed_on_post_delete_edc_visit_tracking.subjectvisitmissed",
+            dispatch_uids,
+        )
@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+from django.apps import apps as django_apps
+from django.test import TestCase, override_settings
+from edc_appointment.models import Appointment
+from edc_visit_tracking_app.models import CrfOne, CrfTwo
+
+from edc_visit_tracking.exceptions import RelatedVisitFieldError, RelatedVisitModelError
+from edc_visit_tracking.model_mixins import get_related_visit_model_attr
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.utils import get_related_visit_model_cls
+
+
+class TestUtils(TestCase):
+    def test_related_visit_model_cls_resolved_once(self):
+        self.assertEqual(get_related_visit_model_cls(), SubjectVisit)
+        with patch.object(django_apps, "get_model") as mock_get_model:
+            self.assertEqual(get_related_visit_model_cls(), SubjectVisit)
+        mock_get_model.assert_not_called()
+
+    def test_related_visit_model_cls_cleared_on_setting_changed(self):
+        self.assertEqual(get_related_visit_model_cls(), SubjectVisit)
+        with override_settings(SUBJECT_VISIT_MODEL="edc_visit_tracking_app.crftwo"):
+            self.assertEqual(get_related_visit_model_cls(), CrfTwo)
+        with override_settings(SUBJECT_VISIT_MODEL="edc_visit_tracking_app.subjectvisit2"):
+            self.assertRaises(RelatedVisitModelError, get_related_visit_model_cls)
+        self.assertEqual(get_related_visit_model_cls(), SubjectVisit)
+
+    def test_related_visit_model_attr_resolved_once(self):
+        self.assertEqual(get_related_visit_model_attr(CrfOne), "subject_visit")
+        with patch.object(CrfOne._meta, "get_fields") as mock_get_fields:
+            self.assertEqual(get_related_visit_model_attr(CrfOne), "subject_visit")
+        mock_get_fields.assert_not_called()
+
+    def test_related_visit_model_attr_cleared_on_setting_changed(self):
+        attr = get_related_visit_model_attr(Appointment)
+        with override_settings(SUBJECT_VISIT_MODEL="edc_visit_tracking_app.crftwo"):
+            self.assertRaises(
+                RelatedVisitFieldError, get_related_visit_model_attr, Appointment
+            )
+        self.assertEqual(get_related_visit_model_attr(Appointment), attr)
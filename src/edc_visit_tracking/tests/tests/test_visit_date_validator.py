@@ -3,13 +3,18 @@ from zoneinfo import ZoneInfo
 
 import time_machine
 from dateutil.relativedelta import relativedelta
-from django.test import TestCase
+from django.apps import apps as django_apps
+from django.test import TestCase, override_settings
 from edc_utils import get_utcnow
 
 from edc_visit_tracking.crf_date_validator import (
     CrfDateValidator,
     CrfReportDateAllowanceError,
+    CrfReportDateBeforeStudyStart,
     CrfReportDateIsFuture,
+    _engines,
+    get_crf_date_validator_engine,
+    is_future_datetime,
 )
 
 utc_tz = ZoneInfo("UTC")
@@ -65,3 +70,66 @@ class TestVisitDateValidator(TestCase):
             report_datetime=visit_report_datetime + relativedelta(days=4),
             visit_report_datetime=visit_report_datetime,
         )
+
+    def test_engine_is_cached(self):
+        self.assertIs(
+            get_crf_date_validator_engine(report_datetime_allowance=3),
+            get_crf_date_validator_engine(report_datetime_allowance=3),
+        )
+        self.assertIsNot(
+            get_crf_date_validator_engine(report_datetime_allowance=3),
+            get_crf_date_validator_engine(report_datetime_allowance=4),
+        )
+        self.assertEqual(get_crf_date_validator_engine().report_datetime_allowance, 30)
+
+    def test_engine_follows_app_config_allowance(self):
+        app_config = django_apps.get_app_config("edc_visit_tracking")
+        self.assertEqual(get_crf_date_validator_engine().report_datetime_allowance, 30)
+        app_config.report_datetime_allowance = 5
+        try:
+            self.assertEqual(get_crf_date_validator_engine().report_datetime_allowance, 5)
+        finally:
+            app_config.report_datetime_allowance = 30
+        self.assertEqual(get_crf_date_validator_engine().report_datetime_allowance, 30)
+
+    def test_engines_cleared_on_setting_changed(self):
+        get_crf_date_validator_engine(report_datetime_allowance=3)
+        with override_settings(SHORT_DATE_FORMAT="Y-m-d"):
+            self.assertTrue(_engines)
+        with override_settings(DEFAULT_REPORT_DATETIME_ALLOWANCE=5):
+            self.assertFalse(_engines)
+
+    def test_future_allowance_from_edc_model(self):
+        """Assert the not-future check agrees with edc_model's
+        `datetime_not_future`.
+        """
+        visit_report_datetime = get_utcnow()
+        for minutes in [9, 11]:
+            with self.subTest(minutes=minutes):
+                report_datetime = get_utcnow() + relativedelta(minutes=minutes)
+                self.assertEqual(is_future_datetime(report_datetime), minutes > 10)
+                errors = CrfDateValidator.validate_many(
+                    [(report_datetime, visit_report_datetime)]
+                )
+                self.assertEqual(
+                    [type(e) for e in errors.values()],
+                    [CrfReportDateIsFuture] if minutes > 10 else [],
+                )
+
+    def test_validate_many(self):
+        visit_report_datetime = get_utcnow() - relativedelta(days=10)
+        errors = CrfDateValidator.validate_many(
+            [
+                (visit_report_datetime, visit_report_datetime),
+                (visit_report_datetime - relativedelta(days=1), visit_report_datetime),
+                (visit_report_datetime + relativedelta(days=4), visit_report_datetime),
+                (visit_report_datetime + relativedelta(years=10), visit_report_datetime),
+                (visit_report_datetime - relativedelta(years=10), visit_report_datetime),
+            ],
+            report_datetime_allowance=3,
+        )
+        self.assertEqual(list(errors), [1, 2, 3, 4])
+        self.assertIsInstance(errors[1], CrfReportDateAllowanceError)
+        self.assertIsInstance(errors[2], CrfReportDateAllowanceError)
+        self.assertIsInstance(errors[3], CrfReportDateIsFuture)
+        self.assertIsInstance(errors[4], CrfReportDateBeforeStudyStart)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from unittest.mock import patch
 from zoneinfo import ZoneInfo
 
 import time_machine
@@ -18,7 +19,11 @@ from edc_visit_tracking_app.visit_schedule import visit_schedule1, visit_schedul
 from edc_visit_tracking.constants import SCHEDULED, UNSCHEDULED
 from edc_visit_tracking.model_mixins import PreviousVisitError
 from edc_visit_tracking.models import SubjectVisit
-from edc_visit_tracking.visit_sequence import VisitSequence, VisitSequenceError
+from edc_visit_tracking.visit_sequence import (
+    VisitSequence,
+    VisitSequenceError,
+    mark_visit_sequence_validated,
+)
 
 from ..helper import Helper
 
@@ -263,3 +268,38 @@ class TestPreviousVisit(TestCase):
             report_datetime=get_utcnow() - relativedelta(months=8),
             reason=SCHEDULED,
         )
+
+    def test_validated_sequence_not_enforced_again_on_save(self):
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        subject_visit = SubjectVisit(
+            appointment=appointments[0],
+            report_datetime=get_utcnow() - relativedelta(months=10),
+            reason=SCHEDULED,
+        )
+        mark_visit_sequence_validated(subject_visit, appointments[0])
+        with patch.object(VisitSequence, "enforce_sequence") as mock_enforce:
+            subject_visit.save()
+        mock_enforce.assert_not_called()
+        # once only
+        with patch.object(VisitSequence, "enforce_sequence") as mock_enforce:
+            subject_visit.save()
+        mock_enforce.assert_called_once()
+
+    def test_validated_sequence_enforced_if_appointment_changed(self):
+        appointment = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")[1]
+        subject_visit = SubjectVisit(
+            appointment=appointment,
+            report_datetime=get_utcnow() - relativedelta(months=10),
+            reason=SCHEDULED,
+        )
+        mark_visit_sequence_validated(subject_visit, appointment)
+        appointment.appt_datetime = appointment.appt_datetime + relativedelta(days=1)
+        self.assertRaises(PreviousVisitError, subject_visit.save)
+
+    def test_previous_appointment_does_not_enforce_twice(self):
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        visit_sequence = VisitSequence(appointment=appointments[0])
+        visit_sequence.enforce_sequence()
+        with patch.object(VisitSequence, "enforce_sequence") as mock_enforce:
+            self.assertIsNone(visit_sequence.previous_appointment)
+        mock_enforce.assert_not_called()
@@ -0,0 +1,94 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+import time_machine
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from edc_appointment.constants import INCOMPLETE_APPT, SKIPPED_APPT
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.visit_sequence_audit import iter_visit_sequence_violations
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+class TestVisitSequenceAudit(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.subject_visits = {}
+        for subject_identifier in ["12345", "67890"]:
+            helper = self.helper_cls(subject_identifier=subject_identifier)
+            helper.consent_and_put_on_schedule(
+                visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+            )
+            self.subject_visits[subject_identifier] = []
+            for appointment in Appointment.objects.filter(
+                subject_identifier=subject_identifier
+            ).order_by("timepoint")[0:3]:
+                self.subject_visits[subject_identifier].append(
+                    SubjectVisit.objects.create(
+                        appointment=appointment,
+                        report_datetime=appointment.appt_datetime,
+                        reason=SCHEDULED,
+                    )
+                )
+                appointment.appt_status = INCOMPLETE_APPT
+                appointment.save()
+        # visit report for 2000 removed, 3000 now out of sequence
+        subject_visit = self.subject_visits["12345"][1]
+        self.appointment_id = subject_visit.appointment_id
+        subject_visit.delete()
+
+    def test_violations(self):
+        with self.assertNumQueries(1):
+            rows = list(iter_visit_sequence_violations())
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["subject_identifier"], "12345")
+        self.assertEqual(rows[0]["related_visit_id"], self.subject_visits["12345"][2].id)
+        self.assertEqual(rows[0]["missing_before"], 1)
+
+    def test_skipped_appointment_ignored(self):
+        Appointment.objects.filter(id=self.appointment_id).update(appt_status=SKIPPED_APPT)
+        self.assertEqual(list(iter_visit_sequence_violations()), [])
+
+    def test_filters(self):
+        site_id = Appointment.objects.get(id=self.appointment_id).site_id
+        self.assertEqual(len(list(iter_visit_sequence_violations(site_ids=[site_id]))), 1)
+        self.assertEqual(list(iter_visit_sequence_violations(site_ids=[99])), [])
+        self.assertEqual(
+            list(iter_visit_sequence_violations(schedule_name="schedule2")),
+            [],
+        )
+
+    def test_command(self):
+        out = StringIO()
+        call_command("audit_visit_sequence", stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual([row["visit_code"] for row in rows], ["3000"])
+        out = StringIO()
+        call_command("audit_visit_sequence", format="json", stdout=out)
+        rows = json.loads(out.getvalue())
+        self.assertEqual([row["visit_code"] for row in rows], ["3000"])
@@ -0,0 +1,121 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings
+from edc_appointment.constants import INCOMPLETE_APPT
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_facility.import_holidays import import_holidays
+from edc_utils import get_utcnow
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.visit_schedule import visit_schedule1, visit_schedule2
+
+from edc_visit_tracking.constants import SCHEDULED, UNSCHEDULED
+from edc_visit_tracking.models import SubjectVisit
+from edc_visit_tracking.visit_sequence import VisitSequence, VisitSequenceError
+from edc_visit_tracking.visit_timeline import get_visit_timeline, visit_timeline_cache
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(SUBJECT_SCREENING_MODEL="edc_visit_tracking_app.subjectscreening")
+class TestVisitTimeline(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.subject_identifier = "12345"
+        self.helper = self.helper_cls(subject_identifier=self.subject_identifier)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        site_visit_schedules.register(visit_schedule=visit_schedule2)
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+
+    def add_visits_with_unscheduled(self):
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        for index, appointment in enumerate(appointments):
+            for _ in range(0, 2):
+                SubjectVisit.objects.create(
+                    appointment=appointment,
+                    report_datetime=get_utcnow() - relativedelta(months=10 - index),
+                    reason=SCHEDULED if appointment.visit_code_sequence == 0 else UNSCHEDULED,
+                )
+                appointment.appt_status = INCOMPLETE_APPT
+                appointment.save()
+                appointment = self.helper.create_unscheduled(appointment)
+
+    def test_appointments_loaded_in_one_query(self):
+        appointment = Appointment.objects.all().order_by("timepoint")[0]
+        visit_timeline = get_visit_timeline(appointment)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(visit_timeline.appointments), 4)
+            for obj in visit_timeline.appointments:
+                self.assertIsNone(visit_timeline.related_visit(obj))
+
+    def test_previous_appointment_matches_relative_previous(self):
+        self.add_visits_with_unscheduled()
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        visit_timeline = get_visit_timeline(appointments[0])
+        for appointment in appointments:
+            self.assertEqual(
+                visit_timeline.previous_appointment(appointment),
+                appointment.relative_previous,
+            )
+
+    def test_previous_visit(self):
+        self.add_visits_with_unscheduled()
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        visit_timeline = get_visit_timeline(appointments[0])
+        self.assertIsNone(visit_timeline.previous_visit(appointments[0]))
+        for index, appointment in enumerate(appointments[1:]):
+            if appointments[index].related_visit:
+                self.assertEqual(
+                    visit_timeline.previous_visit(appointment),
+                    appointments[index].related_visit,
+                )
+
+    def test_missing_related_visits(self):
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        visit_timeline = get_visit_timeline(appointments[2])
+        self.assertEqual(
+            visit_timeline.missing_related_visits(appointments[2]),
+            [appointments[0], appointments[1]],
+        )
+
+    def test_cached_within_block(self):
+        appointment = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")[0]
+        with visit_timeline_cache():
+            VisitSequence(appointment=appointment).enforce_sequence()
+            with self.assertNumQueries(0):
+                VisitSequence(appointment=appointment).enforce_sequence()
+                self.assertIsNone(VisitSequence(appointment=appointment).previous_visit)
+        self.assertIsNot(get_visit_timeline(appointment), get_visit_timeline(appointment))
+
+    def test_invalidated_on_visit_save(self):
+        appointments = Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        with visit_timeline_cache():
+            self.assertRaises(
+                VisitSequenceError, VisitSequence(appointment=appointments[1]).enforce_sequence
+            )
+            SubjectVisit.objects.create(
+                appointment=appointments[0],
+                report_datetime=appointments[0].appt_datetime,
+                reason=SCHEDULED,
+            )
+            try:
+                VisitSequence(appointment=appointments[1]).enforce_sequence()
+            except VisitSequenceError as e:
+                self.fail(f"VisitSequenceError unexpectedly raised. Got '{e}'")
@@ -0,0 +1,153 @@
+from datetime import datetime
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django import forms
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from edc_appointment.models import Appointment
+from edc_consent import site_consents
+from edc_constants.constants import ALIVE, YES
+from edc_facility.import_holidays import import_holidays
+from edc_visit_schedule.exceptions import ScheduledVisitWindowError
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_tracking_app.consents import consent_v1
+from edc_visit_tracking_app.visit_schedule import visit_schedule1
+
+from edc_visit_tracking.constants import SCHEDULED
+from edc_visit_tracking.form_validators import VisitFormValidator
+from edc_visit_tracking.models import SubjectVisit, VisitWindowPeriod
+from edc_visit_tracking.visit_window_table import (
+    get_visit_window_adherence_queryset,
+    get_window_period_bounds,
+)
+
+from ..helper import Helper
+
+utc_tz = ZoneInfo("UTC")
+
+
+@time_machine.travel(datetime(2019, 6, 11, 8, 00, tzinfo=utc_tz))
+@override_settings(EDC_VISIT_TRACKING_MATERIALIZE_WINDOW_PERIODS=True)
+class TestVisitWindowTable(TestCase):
+    helper_cls = Helper
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.helper = self.helper_cls(subject_identifier="12345")
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule=visit_schedule1)
+        self.helper.consent_and_put_on_schedule(
+            visit_schedule_name=visit_schedule1.name, schedule_name="schedule1"
+        )
+        self.appointments = list(
+            Appointment.objects.all().order_by("timepoint", "visit_code_sequence")
+        )
+
+    def in_window(self, appointment: Appointment, dt: datetime) -> bool:
+        try:
+            appointment.schedule.datetime_in_window(
+                timepoint_datetime=appointment.timepoint_datetime,
+                dt=dt,
+                visit_code=appointment.visit_code,
+                visit_code_sequence=appointment.visit_code_sequence,
+                baseline_timepoint_datetime=self.appointments[0].timepoint_datetime,
+            )
+        except ScheduledVisitWindowError:
+            return False
+        return True
+
+    def get_form_validator(self, appointment: Appointment, report_datetime: datetime):
+        return VisitFormValidator(
+            cleaned_data=dict(
+                appointment=appointment,
+                report_datetime=report_datetime,
+                reason=SCHEDULED,
+                is_present=YES,
+                survival_status=ALIVE,
+            ),
+            instance=SubjectVisit(appointment=appointment),
+            model=SubjectVisit,
+        )
+
+    def test_rows_for_scheduled_appointments(self):
+        self.assertEqual(
+            set(VisitWindowPeriod.objects.values_list("appointment_id", flat=True)),
+            {obj.id for obj in self.appointments},
+        )
+
+    @override_settings(EDC_VISIT_TRACKING_MATERIALIZE_WINDOW_PERIODS=False)
+    def test_not_maintained_by_default(self):
+        VisitWindowPeriod.objects.all().delete()
+        self.appointments[1].save()
+        self.assertFalse(VisitWindowPeriod.objects.exists())
+
+    def test_bounds_match_schedule(self):
+        for appointment in self.appointments:
+            obj = VisitWindowPeriod.objects.get(appointment_id=appointment.id)
+            for dt, expected in [
+                (obj.lower_datetime - relativedelta(seconds=1), False),
+                (obj.lower_datetime, True),
+                (obj.upper_datetime + relativedelta(seconds=59), True),
+                (obj.upper_datetime + relativedelta(minutes=1), False),
+            ]:
+                with self.subTest(visit_code=appointment.visit_code, dt=dt):
+                    self.assertEqual(self.in_window(appointment, dt), expected)
+
+    def test_row_updated_with_appointment(self):
+        appointment = self.appointments[1]
+        appointment.timepoint_datetime += relativedelta(days=1)
+        appointment.appt_datetime += relativedelta(days=1)
+        appointment.save()
+        obj = VisitWindowPeriod.objects.get(appointment_id=appointment.id)
+        self.assertEqual(obj.timepoint_datetime, appointment.timepoint_datetime)
+        self.assertEqual(
+            (obj.lower_datetime, obj.upper_datetime), get_window_period_bounds(appointment)
+        )
+
+    def test_form_validator_does_not_read_table(self):
+        appointment = self.appointments[1]
+        obj = VisitWindowPeriod.objects.get(appointment_id=appointment.id)
+        # stored bounds are stale, e.g. the visit schedule changed
+        VisitWindowPeriod.objects.filter(id=obj.id).update(
+            upper_datetime=obj.upper_datetime + relativedelta(days=10)
+        )
+        form_validator = self.get_form_validator(
+            appointment, obj.upper_datetime + relativedelta(days=1)
+        )
+        with self.assertRaises(forms.ValidationError) as cm:
+            form_validator.validate_visit_datetime_in_window_period()
+        self.assertIn("report_datetime", cm.exception.error_dict)
+
+    def test_adherence_queryset(self):
+        for appointment in self.appointments[0:2]:
+            SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                reason=SCHEDULED,
+            )
+        # as if imported, out of window
+        obj = VisitWindowPeriod.objects.get(appointment_id=self.appointments[1].id)
+        SubjectVisit.objects.filter(appointment=self.appointments[1]).update(
+            report_datetime=obj.upper_datetime + relativedelta(days=1)
+        )
+        with self.assertNumQueries(1):
+            rows = list(get_visit_window_adherence_queryset())
+        self.assertEqual(
+            [(row["visit_code"], row["in_window"]) for row in rows],
+            [("1000", True), ("2000", False), ("3000", None), ("4000", None)],
+        )
+
+    def test_rebuild_command(self):
+        VisitWindowPeriod.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_visit_window_periods", stdout=out)
+        self.assertIn("4 appointments", out.getvalue())
+        self.assertEqual(VisitWindowPeriod.objects.count(), 4)
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import warnings
-from typing import TYPE_CHECKING, Type, TypeVar
+from typing import TYPE_CHECKING, Iterable, Type, TypeVar
 
 from django.apps import apps as django_apps
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import Lag, Lead
 
 from .exceptions import RelatedVisitModelError
 
 if TYPE_CHECKING:
+    from uuid import UUID
+
     from edc_list_data.model_mixins import ListModelMixin
 
     from .models import SubjectVisit, SubjectVisitMissed
@@ -26,16 +30,38 @@ def get_related_visit_model() -> str:
     return getattr(settings, "SUBJECT_VISIT_MODEL", "edc_visit_tracking.subjectvisit")
 
 
+_related_visit_model_classes: dict[str, Type[SubjectVisit]] = {}
+
+
 def get_related_visit_model_cls() -> Type[SubjectVisit]:
-    model_cls = django_apps.get_model(get_related_visit_model())
+    """Returns the related visit model class.
+
+    Resolved once per value of settings.SUBJECT_VISIT_MODEL. See
+    `clear_related_visit_model_cls_cache`.
+    """
+    model = get_related_visit_model()
+    try:
+        return _related_visit_model_classes[model]
+    except KeyError:
+        pass
+    model_cls = django_apps.get_model(model)
     if model_cls._meta.proxy:
         # raise for now until we have a solution
         raise RelatedVisitModelError(
             f"Not allowed. Related visit model may not be a proxy model. Got {model_cls}. "
         )
+    _related_visit_model_classes[model] = model_cls
     return model_cls
 
 
+def clear_related_visit_model_cls_cache() -> None:
+    """Clears the cache used by `get_related_visit_model_cls`.
+
+    Called when settings change in tests. See signals.
+    """
+    _related_visit_model_classes.clear()
+
+
 def get_subject_visit_model() -> str:
     warnings.warn(
         "This func has been renamed to `get_related_visit_model`.",
@@ -75,6 +101,24 @@ def get_allow_missed_unscheduled_appts() -> bool:
     return getattr(settings, "EDC_VISIT_TRACKING_ALLOW_MISSED_UNSCHEDULED", False)
 
 
+def get_materialize_window_periods() -> bool:
+    """Returns value of settings attr or False.
+
+    If True, the VisitWindowPeriod table is maintained on
+    save/delete of appointments.
+    """
+    return getattr(settings, "EDC_VISIT_TRACKING_MATERIALIZE_WINDOW_PERIODS", False)
+
+
+def get_instrumentation_enabled() -> bool:
+    """Returns value of settings attr or False.
+
+    If True, timing and query counts are recorded for visit and
+    CRF operations. See `instrumentation`.
+    """
+    return getattr(settings, "EDC_VISIT_TRACKING_INSTRUMENTATION", False)
+
+
 def get_subject_visit_missed_model_cls() -> Type[SubjectVisitMissed]:
     return django_apps.get_model(get_subject_visit_missed_model())
 
@@ -101,3 +145,98 @@ def get_next_related_visit(
             next_appointment = related_visit.appointment.next
         return getattr(next_appointment, "related_visit", None)
     return None
+
+
+def get_previous_related_visits(
+    related_visits: QuerySet[SubjectVisit] | Iterable[SubjectVisit],
+    include_interim: bool | None = None,
+) -> dict[UUID, SubjectVisit | None]:
+    """Returns a dict of {related_visit.id: previous related visit
+    or None} for many related visits.
+
+    Same as `get_previous_related_visit` but uses a window function
+    (LAG) over appointments instead of queries per related visit.
+    """
+    return _get_adjacent_related_visits(related_visits, Lag, include_interim)
+
+
+def get_next_related_visits(
+    related_visits: QuerySet[SubjectVisit] | Iterable[SubjectVisit],
+    include_interim: bool | None = None,
+) -> dict[UUID, SubjectVisit | None]:
+    """Returns a dict of {related_visit.id: next related visit
+    or None} for many related visits.
+
+    Same as `get_next_related_visit` but uses a window function
+    (LEAD) over appointments instead of queries per related visit.
+    """
+    return _get_adjacent_related_visits(related_visits, Lead, include_interim)
+
+
+def _get_adjacent_related_visits(
+    related_visits: QuerySet[SubjectVisit] | Iterable[SubjectVisit],
+    window_func: Type[Lag | Lead],
+    include_interim: bool | None,
+    batch_size: int | None = None,
+) -> dict[UUID, SubjectVisit | None]:
+    """Returns a dict of {related_visit.id: adjacent related visit
+    or None}.
+
+    Appointments of the subjects are ordered by timepoint and
+    visit_code_sequence in a window partitioned by subject and
+    schedule. If not `include_interim`, the window is over
+    appointments where visit_code_sequence=0 and an interim visit
+    takes the value of the scheduled appointment with the same
+    visit_code. Same as `appointment.previous`/`next`.
+
+    One query for the window per `batch_size` subjects (default 500)
+    and one for the adjacent related visits.
+    """
+    batch_size = batch_size or 500
+    fields = [
+        "id",
+        "subject_identifier",
+        "visit_schedule_name",
+        "schedule_name",
+        "visit_code",
+        "visit_code_sequence",
+    ]
+    if isinstance(related_visits, QuerySet):
+        related_visit_model_cls = related_visits.model
+        rows = list(related_visits.values_list(*fields))
+    else:
+        related_visits = list(related_visits)
+        if not related_visits:
+            return {}
+        related_visit_model_cls = related_visits[0].__class__
+        rows = [tuple(getattr(obj, f) for f in fields) for obj in related_visits]
+    appointment_field = related_visit_model_cls._meta.get_field("appointment")
+    related_visit_id = f"{appointment_field.related_query_name()}__id"
+    qs = appointment_field.related_model.objects.all()
+    if not include_interim:
+        qs = qs.filter(visit_code_sequence=0)
+    qs = qs.annotate(
+        adjacent_id=Window(
+            window_func(related_visit_id),
+            partition_by=[
+                F("subject_identifier"),
+                F("visit_schedule_name"),
+                F("schedule_name"),
+            ],
+            order_by=[F("timepoint").asc(), F("visit_code_sequence").asc()],
+        )
+    ).values_list(*fields[1:], "adjacent_id")
+    subject_identifiers = sorted({row[1] for row in rows})
+    adjacent_ids = {}
+    for index in range(0, len(subject_identifiers), batch_size):
+        for *key, adjacent_id in qs.filter(
+            subject_identifier__in=subject_identifiers[index : index + batch_size]
+        ):
+            adjacent_ids[tuple(key if include_interim else key[:4])] = adjacent_id
+    adjacent_ids = {
+        row[0]: adjacent_ids.get(row[1:] if include_interim else row[1:5]) for row in rows
+    }
+    adjacent_visits = related_visit_model_cls.objects.in_bulk(
+        [pk for pk in adjacent_ids.values() if pk]
+    )
+    return {pk: adjacent_visits.get(adjacent_id) for pk, adjacent_id in adjacent_ids.items()}
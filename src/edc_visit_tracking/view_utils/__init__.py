@@ -1,3 +1,11 @@
-from .related_visit_button import RelatedVisitButton
+from .related_visit_button import (
+    PrecomputedRelatedVisitButton,
+    RelatedVisitButton,
+    get_related_visit_buttons,
+)
 
-__all__ = ["RelatedVisitButton"]
+__all__ = [
+    "PrecomputedRelatedVisitButton",
+    "RelatedVisitButton",
+    "get_related_visit_buttons",
+]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Type, TypeVar
+from typing import TYPE_CHECKING, Iterable, Type, TypeVar
 
 from django.utils.translation import gettext as _
 from edc_appointment.constants import (
@@ -13,16 +13,28 @@ from edc_appointment.constants import (
 )
 from edc_constants.constants import INCOMPLETE
 from edc_view_utils import ADD, CHANGE, VIEW, DashboardModelButton
+from edc_view_utils.perms import Perms
+
+from ..utils import get_related_visit_model_cls
 
 if TYPE_CHECKING:
+    from uuid import UUID
+
+    from django.contrib.auth.models import User
     from django.contrib.sites.models import Site
+    from django.core.handlers.wsgi import WSGIRequest
+    from django.db.models import QuerySet
     from edc_appointment.models import Appointment
 
     from edc_visit_tracking.model_mixins import VisitModelMixin
 
     RelatedVisitModel = TypeVar("RelatedVisitModel", bound=VisitModelMixin)
 
-__all__ = ["RelatedVisitButton"]
+__all__ = [
+    "PrecomputedRelatedVisitButton",
+    "RelatedVisitButton",
+    "get_related_visit_buttons",
+]
 
 
 @dataclass
@@ -97,3 +109,91 @@ class RelatedVisitButton(DashboardModelButton):
         if self.model_obj and self.model_obj.document_status == INCOMPLETE:
             title = _("Click to review before continuing to forms.")
         return title
+
+
+@dataclass
+class PrecomputedRelatedVisitButton(RelatedVisitButton):
+    """A RelatedVisitButton with `color`, `label`, `disabled` and
+    `title` computed once, on init.
+
+    Pass `shared_perms` to share one Perms instance across
+    buttons. See `get_related_visit_buttons`.
+    """
+
+    shared_perms: Perms | None = None
+    precomputed_color: str = field(default=None, init=False)
+    precomputed_label: str = field(default=None, init=False)
+    precomputed_disabled: str = field(default=None, init=False)
+    precomputed_title: str = field(default=None, init=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.precomputed_color = RelatedVisitButton.color(self)
+        self.precomputed_label = RelatedVisitButton.label.fget(self)
+        self.precomputed_disabled = RelatedVisitButton.disabled.fget(self)
+        self.precomputed_title = RelatedVisitButton.title.fget(self)
+
+    @property
+    def perms(self) -> Perms:
+        return self.shared_perms or super().perms
+
+    def color(self) -> str:
+        return self.precomputed_color
+
+    @property
+    def label(self) -> str:
+        return self.precomputed_label
+
+    @property
+    def disabled(self) -> str:
+        return self.precomputed_disabled
+
+    @property
+    def title(self) -> str:
+        return self.precomputed_title
+
+
+def get_related_visit_buttons(
+    appointments: QuerySet[Appointment] | Iterable[Appointment],
+    user: User = None,
+    current_site: Site = None,
+    request: WSGIRequest | None = None,
+    model_cls: Type[RelatedVisitModel] | None = None,
+    button_cls: Type[PrecomputedRelatedVisitButton] | None = None,
+) -> dict[UUID, PrecomputedRelatedVisitButton]:
+    """Returns a dict of {appointment.id: button} for a subject's
+    appointments.
+
+    Related visits are fetched in one query and permissions are
+    looked up once per site instead of once per button.
+    """
+    model_cls = model_cls or get_related_visit_model_cls()
+    button_cls = button_cls or PrecomputedRelatedVisitButton
+    if hasattr(appointments, "select_related"):
+        appointments = appointments.select_related("site")
+    appointments = list(appointments)
+    related_visits = {
+        obj.appointment_id: obj
+        for obj in model_cls.objects.filter(
+            appointment_id__in=[obj.id for obj in appointments]
+        ).select_related("site")
+    }
+    perms_by_site: dict[int, Perms] = {}
+    buttons = {}
+    for appointment in appointments:
+        related_visit = related_visits.get(appointment.id)
+        site = getattr(related_visit, "site", appointment.site)
+        if site.id not in perms_by_site:
+            perms_by_site[site.id] = Perms(
+                model_cls=model_cls, user=user, current_site=current_site, site=site
+            )
+        buttons[appointment.id] = button_cls(
+            model_obj=related_visit,
+            model_cls=model_cls,
+            appointment=appointment,
+            user=user,
+            current_site=current_site,
+            request=request,
+            shared_perms=perms_by_site[site.id],
+        )
+    return buttons
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from django.utils.translation import gettext_lazy as _
-from edc_appointment.constants import SKIPPED_APPT
+
+from .visit_timeline import get_visit_timeline
 
 
 class VisitSequenceError(Exception):
@@ -15,14 +16,58 @@ if TYPE_CHECKING:
 
     from edc_visit_tracking.model_mixins import VisitModelMixin
 
+    from .visit_timeline import VisitTimeline
+
+
+def get_visit_sequence_fingerprint(appointment: Appointment) -> tuple:
+    """Returns the appointment values a passed visit sequence
+    check is keyed to.
+    """
+    return (
+        appointment._meta.label_lower,
+        appointment.id,
+        appointment.appt_datetime,
+        appointment.appt_status,
+        appointment.visit_code,
+        appointment.visit_code_sequence,
+        getattr(appointment, "modified", None),
+    )
+
+
+def mark_visit_sequence_validated(obj: Any, appointment: Appointment) -> None:
+    """Marks a model instance as having passed the visit sequence
+    check for this appointment; for example, in form clean.
+
+    See `pop_visit_sequence_validated`.
+    """
+    obj._visit_sequence_fingerprint = get_visit_sequence_fingerprint(appointment)
+
+
+def pop_visit_sequence_validated(obj: Any, appointment: Appointment) -> bool:
+    """Returns True if the model instance was marked for this
+    appointment and the appointment has not changed since.
+
+    The mark is removed so the check is skipped once only; for
+    example, in the model save following form clean.
+    """
+    fingerprint = obj.__dict__.pop("_visit_sequence_fingerprint", None)
+    return fingerprint is not None and fingerprint == get_visit_sequence_fingerprint(
+        appointment
+    )
+
 
 class VisitSequence:
     """A class that calculates the previous_visit and can enforce
     that visits are filled in sequence.
+
+    Appointments and related visits are read from the subject's
+    VisitTimeline. See `visit_timeline_cache`.
     """
 
     def __init__(self, appointment: Appointment, skip_enforce: bool | None = None) -> None:
         self._previous_appointment = None
+        self._sequence_enforced = False
+        self._timeline = None
         self.appointment = appointment
         self.skip_enforce = skip_enforce  # for tests
         self.appointment_model_cls = self.appointment.__class__
@@ -46,29 +91,25 @@ class VisitSequence:
         Do not enforce for SKIPPED appointments.
         """
         document_type = document_type or _("report")
-        opts = dict(
-            subject_identifier=self.appointment.subject_identifier,
-            visit_schedule_name=self.appointment.visit_schedule_name,
-            schedule_name=self.appointment.schedule_name,
-            appt_datetime__lt=self.appointment.appt_datetime,
-        )
-        opts.update(**{f"{self.appointment.related_visit_model_attr()}__isnull": True})
-        if (
-            appointments := self.appointment.__class__.objects.filter(**opts)
-            .exclude(appt_status=SKIPPED_APPT)
-            .order_by("timepoint", "visit_code_sequence")
-        ):
+        if appointments := self.timeline.missing_related_visits(self.appointment):
             msg = _(
                 "Previous visit report required. Enter report for "
                 "'%(visit_code)s.%(visit_code_sequence)s' "
                 "before completing this %(document_type)s."
             ) % dict(
-                visit_code=appointments.first().visit_code,
-                visit_code_sequence=appointments.first().visit_code_sequence,
+                visit_code=appointments[0].visit_code,
+                visit_code_sequence=appointments[0].visit_code_sequence,
                 document_type=document_type,
                 appt=self.appointment,
             )
             raise VisitSequenceError(msg)
+        self._sequence_enforced = True
+
+    @property
+    def timeline(self) -> VisitTimeline:
+        if not self._timeline:
+            self._timeline = get_visit_timeline(self.appointment)
+        return self._timeline
 
     @property
     def previous_visit_code(self) -> str:
@@ -93,9 +134,9 @@ class VisitSequence:
         Considers interim appointments (relative_previous).
         """
         if not self._previous_appointment:
-            if not self.skip_enforce:
+            if not self.skip_enforce and not self._sequence_enforced:
                 self.enforce_sequence()
-            self._previous_appointment = self.appointment.relative_previous
+            self._previous_appointment = self.timeline.previous_appointment(self.appointment)
         return self._previous_appointment
 
     @property
@@ -106,7 +147,7 @@ class VisitSequence:
         A previous visit report must exist.
         """
         if self.previous_appointment:
-            return self.model_cls.objects.get(appointment=self.previous_appointment)
+            return self.timeline.previous_visit(self.appointment)
         return None
 
     def get_previous_visit(self) -> VisitModelMixin | None:
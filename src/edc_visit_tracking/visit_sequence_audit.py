@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Type
+
+from django.db.models import Case, F, IntegerField, Q, Sum, Value, When, Window
+from django.db.models.expressions import RowRange
+from edc_appointment.constants import SKIPPED_APPT
+from edc_appointment.utils import get_appointment_model_cls
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from edc_appointment.models import Appointment
+
+__all__ = [
+    "VISIT_SEQUENCE_AUDIT_FIELDS",
+    "get_visit_sequence_audit_queryset",
+    "iter_visit_sequence_violations",
+]
+
+VISIT_SEQUENCE_AUDIT_FIELDS = (
+    "subject_identifier",
+    "site_id",
+    "visit_schedule_name",
+    "schedule_name",
+    "visit_code",
+    "visit_code_sequence",
+    "appt_datetime",
+    "appointment_id",
+    "related_visit_id",
+    "missing_before",
+)
+
+
+def get_visit_sequence_audit_queryset(
+    site_ids: Iterable[int] | None = None,
+    visit_schedule_name: str | None = None,
+    schedule_name: str | None = None,
+    appointment_model_cls: Type[Appointment] | None = None,
+) -> QuerySet:
+    """Returns a values queryset of appointments that have a related
+    visit while an earlier, non-skipped appointment does not.
+
+    The cohort-wide equivalent of `VisitSequence.enforce_sequence`.
+    A window over each subject's schedule, ordered by appt_datetime,
+    keeps a running count of earlier appointments without a related
+    visit (`missing_before`). Evaluated in a single query.
+    """
+    appointment_model_cls = appointment_model_cls or get_appointment_model_cls()
+    related_visit_id = f"{appointment_model_cls.related_visit_model_attr()}__id"
+    qs = appointment_model_cls.objects.all()
+    if site_ids:
+        qs = qs.filter(site_id__in=site_ids)
+    if visit_schedule_name:
+        qs = qs.filter(visit_schedule_name=visit_schedule_name)
+    if schedule_name:
+        qs = qs.filter(schedule_name=schedule_name)
+    is_missing = Case(
+        When(
+            Q(**{f"{related_visit_id}__isnull": True}) & ~Q(appt_status=SKIPPED_APPT),
+            then=Value(1),
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    missing_before = Window(
+        Sum(is_missing),
+        partition_by=[F("subject_identifier"), F("visit_schedule_name"), F("schedule_name")],
+        order_by=[
+            F("appt_datetime").asc(),
+            F("timepoint").asc(),
+            F("visit_code_sequence").asc(),
+        ],
+        frame=RowRange(start=None, end=-1),
+    )
+    return (
+        qs.annotate(
+            appointment_id=F("id"),
+            related_visit_id=F(related_visit_id),
+            # the condition on the related visit must be inside the window
+            # expression or it is applied before the window is evaluated
+            missing_before=Case(
+                When(Q(**{f"{related_visit_id}__isnull": False}), then=missing_before),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+        .filter(missing_before__gt=0)
+        .values(*VISIT_SEQUENCE_AUDIT_FIELDS)
+        .order_by(
+            "subject_identifier", "visit_schedule_name", "schedule_name", "appt_datetime"
+        )
+    )
+
+
+def iter_visit_sequence_violations(
+    site_ids: Iterable[int] | None = None,
+    visit_schedule_name: str | None = None,
+    schedule_name: str | None = None,
+    chunk_size: int | None = None,
+) -> Iterator[dict]:
+    """Yields a dict per appointment keyed out of sequence.
+
+    See `get_visit_sequence_audit_queryset`.
+    """
+    yield from get_visit_sequence_audit_queryset(
+        site_ids=site_ids,
+        visit_schedule_name=visit_schedule_name,
+        schedule_name=schedule_name,
+    ).iterator(chunk_size=chunk_size or 2000)
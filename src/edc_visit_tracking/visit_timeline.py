@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Type
+
+from django.core.exceptions import ObjectDoesNotExist
+from edc_appointment.constants import SKIPPED_APPT
+
+if TYPE_CHECKING:
+    from edc_appointment.models import Appointment
+
+    from .model_mixins import VisitModelMixin
+
+__all__ = [
+    "VisitTimeline",
+    "clear_visit_timelines",
+    "get_visit_timeline",
+    "visit_timeline_cache",
+]
+
+_local = threading.local()
+
+
+class VisitTimeline:
+    """A per-subject, per-schedule view of appointments and their
+    related visits.
+
+    All appointments for the schedule are loaded, with their
+    related visits, in a single query. Questions about the
+    sequence of visits are then answered in memory.
+
+    Use `get_visit_timeline` instead of instantiating directly so
+    the instance may be reused within a `visit_timeline_cache`
+    block.
+    """
+
+    def __init__(
+        self,
+        appointment_model_cls: Type[Appointment] = None,
+        subject_identifier: str = None,
+        visit_schedule_name: str = None,
+        schedule_name: str = None,
+    ) -> None:
+        self._appointments: list[Appointment] | None = None
+        self.appointment_model_cls = appointment_model_cls
+        self.subject_identifier = subject_identifier
+        self.visit_schedule_name = visit_schedule_name
+        self.schedule_name = schedule_name
+        self.related_visit_model_attr = self.appointment_model_cls.related_visit_model_attr()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(subject_identifier={self.subject_identifier}, "
+            f"visit_schedule_name={self.visit_schedule_name}, "
+            f"schedule_name={self.schedule_name})"
+        )
+
+    @property
+    def appointments(self) -> list[Appointment]:
+        """Returns a list of appointments ordered by timepoint and
+        visit_code_sequence with the related visit selected.
+        """
+        if self._appointments is None:
+            self._appointments = list(
+                self.appointment_model_cls.objects.filter(
+                    subject_identifier=self.subject_identifier,
+                    visit_schedule_name=self.visit_schedule_name,
+                    schedule_name=self.schedule_name,
+                )
+                .select_related(self.related_visit_model_attr)
+                .order_by("timepoint", "visit_code_sequence")
+            )
+        return self._appointments
+
+    def related_visit(self, appointment: Appointment) -> VisitModelMixin | None:
+        """Returns the related visit for an appointment on this
+        timeline or None.
+        """
+        try:
+            return getattr(appointment, self.related_visit_model_attr)
+        except ObjectDoesNotExist:
+            return None
+
+    def missing_related_visits(self, appointment: Appointment) -> list[Appointment]:
+        """Returns a list of appointments, before the given
+        appointment, without a related visit.
+
+        SKIPPED appointments are ignored.
+        """
+        return [
+            obj
+            for obj in self.appointments
+            if obj.appt_datetime < appointment.appt_datetime
+            and obj.appt_status != SKIPPED_APPT
+            and not self.related_visit(obj)
+        ]
+
+    def previous_appointment(self, appointment: Appointment) -> Appointment | None:
+        """Returns the previous appointment or None.
+
+        Considers interim appointments. Same as
+        `appointment.relative_previous`.
+        """
+        if appointment.visit_code_sequence != 0:
+            appointments = [
+                obj
+                for obj in self.appointments
+                if obj.visit_code_sequence < appointment.visit_code_sequence
+                and obj.timepoint <= appointment.timepoint
+                and obj.id != appointment.id
+            ]
+        else:
+            appointments = [
+                obj
+                for obj in self.appointments
+                if obj.timepoint < appointment.timepoint and obj.id != appointment.id
+            ]
+        return appointments[-1] if appointments else None
+
+    def previous_visit(self, appointment: Appointment) -> VisitModelMixin | None:
+        """Returns the related visit of the previous appointment,
+        None if there is no previous appointment, or raises
+        ObjectDoesNotExist if the previous appointment does not
+        have a related visit.
+        """
+        if previous_appointment := self.previous_appointment(appointment):
+            return getattr(previous_appointment, self.related_visit_model_attr)
+        return None
+
+
+def _get_key(appointment: Appointment) -> tuple[str, str, str, str]:
+    return (
+        appointment._meta.label_lower,
+        appointment.subject_identifier,
+        appointment.visit_schedule_name,
+        appointment.schedule_name,
+    )
+
+
+def get_visit_timeline(appointment: Appointment) -> VisitTimeline:
+    """Returns a VisitTimeline for the subject and schedule of
+    this appointment.
+
+    Within a `visit_timeline_cache` block the same instance is
+    returned until invalidated.
+    """
+    cache = getattr(_local, "timelines", None)
+    key = _get_key(appointment)
+    if cache is not None and key in cache:
+        return cache[key]
+    visit_timeline = VisitTimeline(
+        appointment_model_cls=appointment.__class__,
+        subject_identifier=appointment.subject_identifier,
+        visit_schedule_name=appointment.visit_schedule_name,
+        schedule_name=appointment.schedule_name,
+    )
+    if cache is not None:
+        cache[key] = visit_timeline
+    return visit_timeline
+
+
+def clear_visit_timelines(subject_identifier: str | None = None) -> None:
+    """Removes cached timelines for a subject or, if
+    subject_identifier is None, all cached timelines.
+    """
+    cache = getattr(_local, "timelines", None)
+    if cache:
+        if subject_identifier is None:
+            cache.clear()
+        else:
+            for key in [k for k in cache if k[1] == subject_identifier]:
+                del cache[key]
+
+
+@contextmanager
+def visit_timeline_cache() -> Iterator[None]:
+    """Context manager to reuse VisitTimeline instances for the
+    duration of the block; for example, a request or a management
+    command.
+
+    Cached timelines for a subject are invalidated when an
+    appointment or related visit for the subject is saved or
+    deleted. See signals.
+
+    Blocks may be nested. The cache is cleared on exit of the
+    outermost block.
+    """
+    outermost = getattr(_local, "timelines", None) is None
+    if outermost:
+        _local.timelines = {}
+    try:
+        yield
+    finally:
+        if outermost:
+            _local.timelines = None
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Iterable, Type
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, OuterRef, Subquery, Value, When
+from edc_utils import floor_secs, to_utc
+
+from .utils import get_related_visit_model_cls
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from edc_appointment.models import Appointment
+
+    from .models import VisitWindowPeriod
+
+__all__ = [
+    "VISIT_WINDOW_ADHERENCE_FIELDS",
+    "WINDOW_PERIOD_FIELDS",
+    "get_visit_window_adherence_queryset",
+    "get_visit_window_period_model_cls",
+    "get_window_period_bounds",
+    "rebuild_visit_window_periods",
+    "update_visit_window_period",
+]
+
+# a save with update_fields not including any of these does not
+# change the window period
+WINDOW_PERIOD_FIELDS = (
+    "subject_identifier",
+    "site",
+    "visit_schedule_name",
+    "schedule_name",
+    "visit_code",
+    "visit_code_sequence",
+    "timepoint",
+    "timepoint_datetime",
+)
+
+VISIT_WINDOW_ADHERENCE_FIELDS = (
+    "subject_identifier",
+    "site_id",
+    "visit_schedule_name",
+    "schedule_name",
+    "visit_code",
+    "appointment_id",
+    "lower_datetime",
+    "upper_datetime",
+    "related_visit_id",
+    "report_datetime",
+    "in_window",
+)
+
+
+def get_visit_window_period_model_cls() -> Type[VisitWindowPeriod]:
+    return django_apps.get_model("edc_visit_tracking.visitwindowperiod")
+
+
+def get_window_period_bounds(appointment: Appointment) -> tuple[datetime, datetime]:
+    """Returns the lower and upper bounds, in UTC and floored to
+    the minute, of the window period of a scheduled appointment.
+
+    Same bounds as `Window.raise_for_scheduled_not_in_window`,
+    including the window gap added to the lower bound.
+    """
+    schedule = appointment.schedule
+    timepoint_datetime = to_utc(appointment.timepoint_datetime)
+    visit = schedule.visits.get(appointment.visit_code)
+    visit.timepoint_datetime = timepoint_datetime
+    next_visit = schedule.visits.next(appointment.visit_code)
+    gap_days = 0
+    if visit.add_window_gap_to_lower and next_visit:
+        gap_days = abs(
+            (timepoint_datetime + visit.rupper) - (timepoint_datetime - next_visit.rlower)
+        ).days
+    lower = floor_secs(to_utc(visit.dates.lower) - relativedelta(days=gap_days))
+    upper = floor_secs(to_utc(visit.dates.upper))
+    return lower, upper
+
+
+def get_visit_window_period(appointment: Appointment) -> VisitWindowPeriod:
+    lower, upper = get_window_period_bounds(appointment)
+    return get_visit_window_period_model_cls()(
+        id=uuid4(),
+        subject_identifier=appointment.subject_identifier,
+        site_id=appointment.site_id,
+        visit_schedule_name=appointment.visit_schedule_name,
+        schedule_name=appointment.schedule_name,
+        appointment_id=appointment.id,
+        visit_code=appointment.visit_code,
+        timepoint=appointment.timepoint,
+        timepoint_datetime=appointment.timepoint_datetime,
+        lower_datetime=lower,
+        upper_datetime=upper,
+    )
+
+
+def update_visit_window_period(appointment: Appointment, using: str | None = None) -> None:
+    """Replaces the VisitWindowPeriod row for an appointment.
+
+    Unscheduled appointments do not have a row; their window
+    depends on the next appointment and related visit.
+    """
+    model_cls = get_visit_window_period_model_cls()
+    with transaction.atomic(using=using):
+        model_cls.objects.using(using).filter(appointment_id=appointment.id).delete()
+        if appointment.visit_code_sequence == 0:
+            get_visit_window_period(appointment).save(using=using)
+
+
+def rebuild_visit_window_periods(
+    appointments: Iterable[Appointment], batch_size: int | None = None
+) -> int:
+    """Replaces the VisitWindowPeriod rows for the scheduled
+    appointments in `appointments` and returns the number of
+    rows created.
+    """
+    model_cls = get_visit_window_period_model_cls()
+    objs = [
+        get_visit_window_period(appointment)
+        for appointment in appointments
+        if appointment.visit_code_sequence == 0
+    ]
+    with transaction.atomic():
+        model_cls.objects.filter(
+            appointment_id__in=[obj.appointment_id for obj in objs]
+        ).delete()
+        model_cls.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs)
+
+
+def get_visit_window_adherence_queryset(
+    site_ids: Iterable[int] | None = None,
+    visit_schedule_name: str | None = None,
+    schedule_name: str | None = None,
+) -> QuerySet:
+    """Returns a values queryset of scheduled appointments with the
+    report_datetime of the related visit and whether it is within
+    the window period.
+
+    `in_window` is None if there is no related visit. Evaluated in
+    a single query. Bounds are as stored; rebuild the table after
+    changing the window periods of a visit schedule.
+    """
+    related_visits = get_related_visit_model_cls().objects.filter(
+        appointment_id=OuterRef("appointment_id")
+    )
+    qs = get_visit_window_period_model_cls().objects.all()
+    if site_ids:
+        qs = qs.filter(site_id__in=site_ids)
+    if visit_schedule_name:
+        qs = qs.filter(visit_schedule_name=visit_schedule_name)
+    if schedule_name:
+        qs = qs.filter(schedule_name=schedule_name)
+    return (
+        qs.annotate(
+            related_visit_id=Subquery(related_visits.values("id")[:1]),
+            report_datetime=Subquery(related_visits.values("report_datetime")[:1]),
+        )
+        .annotate(
+            # bounds are floored to the minute
+            in_window=Case(
+                When(report_datetime__isnull=True, then=Value(None)),
+                When(
+                    report_datetime__gte=F("lower_datetime"),
+                    report_datetime__lt=F("upper_datetime") + timedelta(minutes=1),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=BooleanField(null=True),
+            )
+        )
+        .values(*VISIT_WINDOW_ADHERENCE_FIELDS)
+        .order_by("subject_identifier", "visit_schedule_name", "schedule_name", "timepoint")
+    )